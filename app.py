@@ -3,13 +3,14 @@ Streamlit Dashboard for Churn Prediction
 Phase 5: Modern Yellow & Black Theme
 """
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import joblib
 import sys
 sys.path.append('src')
 from business import BusinessImpactCalculator
+from bundle import BundleNotFound, load_bundle, load_legacy_pickles
+from inference import predict_proba, score_frame
+from schema import read_customers
 
 # Page config
 st.set_page_config(
@@ -165,13 +166,15 @@ st.markdown("""
 @st.cache_resource
 def load_model():
     try:
-        model = joblib.load('models/best_model.pkl')
-        engineer = joblib.load('models/feature_engineer.pkl')
-        return model, engineer
-    except:
+        try:
+            bundle = load_bundle()
+        except BundleNotFound:
+            bundle = load_legacy_pickles()
+        return bundle.model, bundle.pipeline
+    except Exception:
         return None, None
 
-model, engineer = load_model()
+model, pipeline = load_model()
 business_calc = BusinessImpactCalculator()
 
 # Header with yellow and black theme
@@ -277,15 +280,11 @@ if mode == "🔍 Single Customer Prediction":
             'TotalCharges': total_charges
         }
         
-        df = pd.DataFrame([input_data])
-        
         # Feature engineering
-        df = engineer.create_business_features(df)
-        df = engineer.encode_features(df, fit=False)
-        X, _ = engineer.prepare_features(df, target_col=None, fit=False)
+        X = pipeline.transform_row(input_data)
         
         # Predict
-        churn_prob = model.predict_proba(X)[0][1]
+        churn_prob = predict_proba(model, X)[0]
         risk_score = business_calc.calculate_risk_score(churn_prob)
         risk_tier = business_calc.assign_risk_tier(churn_prob)
         customer_value = business_calc.calculate_customer_lifetime_value(monthly_charges, tenure)
@@ -390,7 +389,7 @@ else:
     uploaded_file = st.file_uploader("📁 Upload Customer Data (CSV)", type=['csv'])
     
     if uploaded_file is not None:
-        df = pd.read_csv(uploaded_file)
+        df = read_customers(uploaded_file, pipeline.vocabularies)
         st.success(f"✓ Loaded {len(df):,} customers")
         
         # Show sample
@@ -406,13 +405,8 @@ else:
                 # Store original
                 df_original = df.copy()
                 
-                # Feature engineering
-                df = engineer.create_business_features(df)
-                df = engineer.encode_features(df, fit=False)
-                X, _ = engineer.prepare_features(df, target_col=None, fit=False)
-                
-                # Predict
-                churn_probs = model.predict_proba(X)[:, 1]
+                # Feature engineering + predict
+                churn_probs = score_frame(pipeline, model, df)
                 df_original['churn_probability'] = churn_probs
                 
                 # Business report
@@ -0,0 +1,360 @@
+"""
+Inference Benchmark Script
+Compare latency of the scoring paths using the saved artifacts
+"""
+import sys
+sys.path.append('src')
+import contextlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+import warnings
+import joblib
+import mlflow
+import numpy as np
+import pandas as pd
+from inference import CompiledFeaturePipeline, predict_proba, score_frame
+from business import BusinessImpactCalculator
+from backends import BoosterScorer, TreeEnsembleScorer
+from bundle import load_bundle
+from model import ChurnModelTrainer
+from parallel import ParallelBulkScorer
+from resampling import SMOTECache
+from schema import BINARY_COLS, BINARY_MAP, MULTI_COLS, read_customers
+
+SAMPLE_CUSTOMER = {
+    "gender": "Male",
+    "SeniorCitizen": 0,
+    "Partner": "Yes",
+    "Dependents": "No",
+    "tenure": 12,
+    "PhoneService": "Yes",
+    "MultipleLines": "No",
+    "InternetService": "Fiber optic",
+    "OnlineSecurity": "No",
+    "OnlineBackup": "No",
+    "DeviceProtection": "No",
+    "TechSupport": "No",
+    "StreamingTV": "Yes",
+    "StreamingMovies": "Yes",
+    "Contract": "Month-to-month",
+    "PaperlessBilling": "Yes",
+    "PaymentMethod": "Electronic check",
+    "MonthlyCharges": 85.0,
+    "TotalCharges": 1020.0
+}
+
+
+def sample_frame(n_rows, seed=0):
+    """SAMPLE_CUSTOMER repeated with varied tenure and charges"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame([SAMPLE_CUSTOMER] * n_rows)
+    df['tenure'] = rng.integers(1, 73, n_rows)
+    df['MonthlyCharges'] = np.round(rng.uniform(18, 120, n_rows), 2)
+    df['TotalCharges'] = np.round(df['MonthlyCharges'] * df['tenure'], 2)
+    return df
+
+
+def time_call(fn, repeats=2000):
+    """Median and p99 latency of fn() in microseconds"""
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return np.median(timings), np.percentile(timings, 99)
+
+
+def report(name, timings):
+    median, p99 = timings
+    print(f"  {name:38s} median {median:9.1f} µs   p99 {p99:9.1f} µs")
+
+
+def benchmark_single_row(model, engineer):
+    """DataFrame pipeline vs compiled single-row pipeline"""
+    pipeline = CompiledFeaturePipeline.from_engineer(engineer)
+
+    def dataframe_features():
+        df = pd.DataFrame([SAMPLE_CUSTOMER])
+        df = engineer.create_business_features(df)
+        df = engineer.encode_features(df, fit=False)
+        X, _ = engineer.prepare_features(df, target_col=None, fit=False)
+        return X
+
+    def compiled_features():
+        return pipeline.transform_row(SAMPLE_CUSTOMER)
+
+    print("\nSingle-row feature engineering:")
+    report("DataFrame pipeline", time_call(dataframe_features))
+    report("Compiled pipeline", time_call(compiled_features))
+
+    print("\nSingle-row end-to-end (features + model):")
+    report("DataFrame pipeline", time_call(lambda: model.predict_proba(dataframe_features())[0][1]))
+    report("Compiled pipeline", time_call(lambda: predict_proba(model, compiled_features())[0]))
+
+
+def time_once(fn):
+    """Wall time of a single fn() call in seconds"""
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def benchmark_business(n_rows=1_000_000):
+    """Per-row apply vs vectorized business scoring"""
+    calc = BusinessImpactCalculator()
+    rng = np.random.default_rng(0)
+    probs = pd.Series(rng.random(n_rows))
+    tenure = rng.integers(0, 73, n_rows)
+    charges = rng.uniform(18, 120, n_rows)
+
+    def scalar():
+        probs.apply(calc.calculate_risk_score)
+        tiers = probs.apply(calc.assign_risk_tier)
+        values = [calc.calculate_customer_lifetime_value(m, t) for m, t in zip(charges, tenure)]
+        [calc.recommend_action(p, v) for p, v in zip(probs, values)]
+        return tiers
+
+    def vectorized():
+        calc.calculate_risk_scores(probs)
+        tiers = calc.assign_risk_tiers(probs)
+        values = calc.calculate_customer_lifetime_values(charges, tenure)
+        calc.recommend_actions(probs, values)
+        return tiers
+
+    df = pd.DataFrame({'churn_probability': probs, 'MonthlyCharges': charges, 'tenure': tenure})
+
+    def sorted_top_n(top_n=500):
+        return df.sort_values('churn_probability', ascending=False).head(top_n)['MonthlyCharges'].sum()
+
+    print(f"\nBusiness scoring ({n_rows:,} customers):")
+    print(f"  {'Per-row apply':32s} {time_once(scalar):9.3f} s")
+    print(f"  {'Vectorized':32s} {time_once(vectorized):9.3f} s")
+    print(f"  {'Top-500 ROI (full sort)':32s} {time_once(sorted_top_n):9.3f} s")
+    print(f"  {'Top-500 ROI (argpartition)':32s} {time_once(lambda: calc.calculate_intervention_roi(df, 500)):9.3f} s")
+    print(f"  {'generate_business_report':32s} {time_once(lambda: calc.generate_business_report(df)):9.3f} s")
+
+
+def benchmark_xgboost_backends(sizes=(1, 1000, 100_000), n_features=24):
+    """XGBClassifier.predict_proba on DataFrames vs Booster.inplace_predict"""
+    from xgboost import XGBClassifier
+
+    rng = np.random.default_rng(0)
+    columns = [f"f{i}" for i in range(n_features)]
+    X_train = pd.DataFrame(rng.normal(size=(20_000, n_features)), columns=columns)
+    y_train = (X_train['f0'] + rng.normal(size=len(X_train)) > 0).astype(int)
+    model = XGBClassifier(n_estimators=100, max_depth=6, learning_rate=0.1,
+                          eval_metric='logloss').fit(X_train, y_train)
+
+    print("\nXGBoost serving backends:")
+    for size in sizes:
+        X = rng.normal(size=(size, n_features))
+        X_df = pd.DataFrame(X, columns=columns)
+        repeats = 500 if size == 1 else 20
+        report(f"XGBClassifier (DataFrame), n={size:,}",
+               time_call(lambda: model.predict_proba(X_df), repeats))
+        for nthread in (1, 4):
+            scorer = BoosterScorer.from_classifier(model, nthread=nthread)
+            report(f"Booster nthread={nthread}, n={size:,}",
+                   time_call(lambda: scorer.predict_proba(X), repeats))
+
+
+def benchmark_tree_compiler(sizes=(1, 1000, 100_000), n_features=24):
+    """sklearn RandomForest/DecisionTree predict_proba vs compiled node arrays"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.tree import DecisionTreeClassifier
+
+    rng = np.random.default_rng(0)
+    X_train = rng.normal(size=(20_000, n_features))
+    y_train = (X_train[:, 0] + rng.normal(size=len(X_train)) > 0).astype(int)
+    models = {
+        'DecisionTree': DecisionTreeClassifier(max_depth=10, min_samples_split=20,
+                                               min_samples_leaf=10, random_state=42),
+        'RandomForest': RandomForestClassifier(n_estimators=100, max_depth=15,
+                                               min_samples_split=10, random_state=42)
+    }
+
+    print("\nTree ensemble compiler (rows/sec):")
+    for name, model in models.items():
+        model.fit(X_train, y_train)
+        compiled = TreeEnsembleScorer.from_model(model)
+        for size in sizes:
+            X = rng.normal(size=(size, n_features))
+            repeats = 200 if size == 1 else 5
+            sklearn_median, _ = time_call(lambda: model.predict_proba(X), repeats)
+            compiled_median, _ = time_call(lambda: compiled.predict_proba(X), repeats)
+            print(f"  {name} n={size:<8,} sklearn {size / sklearn_median * 1e6:12,.0f}"
+                  f"   compiled {size / compiled_median * 1e6:12,.0f}")
+
+
+def benchmark_parallel(n_rows=1_000_000, shard_size=100_000, workers=(1, 2, 4)):
+    """In-process bulk scoring vs the process pool at several worker counts"""
+    bundle = load_bundle()
+    calc = BusinessImpactCalculator()
+    df = sample_frame(n_rows)
+    shards = [df.iloc[start:start + shard_size] for start in range(0, n_rows, shard_size)]
+
+    def in_process():
+        probs = score_frame(bundle.pipeline, bundle.model, df)
+        return calc.generate_business_report(df.assign(churn_probability=probs))
+
+    print(f"\nParallel bulk scoring ({n_rows:,} rows, {len(shards)} shards):")
+    baseline = time_once(in_process)
+    print(f"  {'In-process':32s} {baseline:9.3f} s")
+    for n_workers in workers:
+        with ParallelBulkScorer(n_workers=n_workers, calculator=calc) as scorer:
+            scorer.score(shards[:1])  # start workers and load the model
+            elapsed = time_once(lambda: scorer.score(shards))
+        print(f"  {f'{n_workers} worker(s)':32s} {elapsed:9.3f} s   speedup {baseline / elapsed:5.2f}x")
+
+
+def benchmark_csv_ingestion(n_rows=1_000_000):
+    """Inferred-dtype read_csv vs the declared customer schema"""
+    bundle = load_bundle()
+    df = sample_frame(n_rows)
+    df.insert(0, 'customerID', [f"{i:07d}-BENCH" for i in range(n_rows)])
+    df['TotalCharges'] = df['TotalCharges'].astype(object)
+    df.loc[::1000, 'TotalCharges'] = ' '
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'customers.csv')
+        df.to_csv(path, index=False)
+
+        def inferred():
+            frame = pd.read_csv(path)
+            frame['TotalCharges'] = pd.to_numeric(frame['TotalCharges'], errors='coerce')
+            return frame
+
+        def declared():
+            return read_customers(path, bundle.pipeline.vocabularies)
+
+        print(f"\nCSV ingestion ({n_rows:,} rows):")
+        for name, read in [('Inferred dtypes + to_numeric', inferred), ('Declared schema', declared)]:
+            elapsed = time_once(read)
+            memory = read().memory_usage(deep=True).sum() / 1e6
+            print(f"  {name:32s} {elapsed:9.3f} s   {memory:8.1f} MB")
+
+
+def benchmark_encoding(n_rows=1_000_000):
+    """Per-column LabelEncoder loop vs one-pass category codes"""
+    engineer = joblib.load('models/feature_engineer.pkl')
+    raw = sample_frame(n_rows)
+    frames = {
+        'object columns': raw,
+        'declared schema': read_customers(io.StringIO(raw.to_csv(index=False)))
+    }
+
+    print(f"\nCategorical encoding ({n_rows:,} rows):")
+    for name, frame in frames.items():
+        df = engineer.create_business_features(frame)
+
+        def label_encoder_loop():
+            out = df.copy()
+            for col in BINARY_COLS:
+                out[col] = out[col].map(BINARY_MAP)
+            for col in MULTI_COLS:
+                out[col] = engineer.label_encoders[col].transform(out[col].astype(str))
+            return out
+
+        baseline = time_once(label_encoder_loop)
+        elapsed = time_once(lambda: engineer.encode_features(df, fit=False))
+        print(f"  {'LabelEncoder loop, ' + name:38s} {baseline:9.3f} s")
+        print(f"  {'Category codes, ' + name:38s} {elapsed:9.3f} s   speedup {baseline / elapsed:5.2f}x")
+
+
+def benchmark_fused_transform(n_rows=1_000_000):
+    """Three DataFrame stages vs the fused float32 transform"""
+    engineer = joblib.load('models/feature_engineer.pkl')
+    pipeline = CompiledFeaturePipeline.from_engineer(engineer)
+    df = sample_frame(n_rows)
+
+    def three_stage():
+        out = engineer.encode_features(engineer.create_business_features(df), fit=False)
+        X, _ = engineer.prepare_features(out, target_col=None, fit=False)
+        return X.to_numpy(dtype=np.float32)
+
+    print(f"\nFeature transform ({n_rows:,} rows):")
+    for name, transform in [('Three DataFrame stages', three_stage),
+                            ('Fused float32 transform', lambda: pipeline.transform_frame(df))]:
+        elapsed = time_once(transform)
+        tracemalloc.start()
+        transform()
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        print(f"  {name:32s} {elapsed:9.3f} s   peak {peak:8.1f} MB")
+
+
+def benchmark_smote(n_rows=200_000, n_features=24):
+    """Exact SMOTE vs batched neighbors vs a cache hit"""
+    rng = np.random.default_rng(0)
+    X = rng.random((n_rows, n_features)).astype(np.float32)
+    y = (rng.random(n_rows) < 0.27).astype(np.int64)
+
+    print(f"\nSMOTE resampling ({n_rows:,} rows):")
+    with tempfile.TemporaryDirectory() as tmp:
+        exact = SMOTECache(tmp, method='exact')
+        baseline = time_once(lambda: exact.fit_resample(X, y))
+        print(f"  {'Exact (imblearn)':32s} {baseline:9.3f} s")
+        batched = time_once(lambda: SMOTECache(None, method='batched').fit_resample(X, y))
+        print(f"  {'Batched neighbors':32s} {batched:9.3f} s   speedup {baseline / batched:5.2f}x")
+        hit = time_once(lambda: exact.fit_resample(X, y))
+        print(f"  {'Cache hit':32s} {hit:9.3f} s   speedup {baseline / hit:5.2f}x")
+
+
+def benchmark_mlflow_logging(n_rows=20_000, n_features=24):
+    """Five-experiment wall time with inline vs background MLflow logging"""
+    rng = np.random.default_rng(0)
+    X = rng.random((n_rows, n_features)).astype(np.float32)
+    y = (X[:, :4].sum(axis=1) + rng.normal(0, 0.5, n_rows) > 2.3).astype(np.int64)
+    split = int(n_rows * 0.8)
+
+    print(f"\nMLflow logging (5 experiments, {n_rows:,} rows, SQLite store):")
+    cwd, uri = os.getcwd(), mlflow.get_tracking_uri()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        mlflow.set_tracking_uri(f"sqlite:///{os.path.join(tmp, 'mlflow.db')}")
+        try:
+            baseline = None
+            for name, async_logging, log_models in [('Inline, every model', False, 'all'),
+                                                    ('Inline, best model only', False, 'best'),
+                                                    ('Background, best model only', True, 'best')]:
+                trainer = ChurnModelTrainer(experiment_name=name, smote_cache=SMOTECache(None),
+                                            async_logging=async_logging, log_models=log_models)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    elapsed = time_once(lambda: trainer.run_all_experiments(
+                        X[:split], y[:split], X[split:], y[split:]))
+                baseline = baseline or elapsed
+                print(f"  {name:32s} {elapsed:9.3f} s   speedup {baseline / elapsed:5.2f}x")
+        finally:
+            os.chdir(cwd)
+            mlflow.set_tracking_uri(uri)
+
+
+def main():
+    print("="*60)
+    print("INFERENCE BENCHMARK")
+    print("="*60)
+
+    warnings.filterwarnings('ignore', category=UserWarning)
+    model = joblib.load('models/best_model.pkl')
+    engineer = joblib.load('models/feature_engineer.pkl')
+    print(f"Model: {type(model).__name__}")
+
+    benchmark_single_row(model, engineer)
+    benchmark_business()
+    benchmark_xgboost_backends()
+    benchmark_tree_compiler()
+    benchmark_parallel()
+    benchmark_csv_ingestion()
+    benchmark_encoding()
+    benchmark_fused_transform()
+    benchmark_smote()
+    benchmark_mlflow_logging()
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
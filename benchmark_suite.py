@@ -0,0 +1,236 @@
+"""
+Performance Regression Suite
+Time every pipeline stage on synthetic Telco data and compare to JSON baselines
+"""
+import sys
+sys.path.append('src')
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timezone
+import joblib
+import numpy as np
+
+from bundle import BundleNotFound, load_bundle, load_legacy_pickles
+from business import BusinessImpactCalculator
+from inference import predict_proba
+from schema import read_customers
+from synthetic import TelcoGenerator
+
+SIZES = (1, 1_000, 100_000, 1_000_000)
+DEFAULT_BASELINE = 'benchmarks/baseline.json'
+DEFAULT_THRESHOLD = 1.5
+
+# Bulk API calls are skipped above this many rows (the upload alone dominates)
+API_MAX_ROWS = 100_000
+
+# Slowdowns smaller than this are timer noise, whatever the ratio
+MIN_REGRESSION_SECONDS = 0.002
+
+
+def telco_frame(n_rows, seed=0):
+    """Raw synthetic customers from the default TelcoGenerator parameters"""
+    return TelcoGenerator().sample(n_rows, seed=seed)
+
+
+def repeats_for(n_rows):
+    """More repeats for small inputs so the median is stable"""
+    if n_rows <= 1:
+        return 200
+    if n_rows <= 1_000:
+        return 20
+    return 1
+
+
+def measure(fn, repeats):
+    """Median wall time over repeats plus the peak traced allocation of one call"""
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': float(np.median(timings)), 'peak_mb': peak / 1e6}
+
+
+def load_serving_bundle():
+    try:
+        return load_bundle()
+    except BundleNotFound as e:
+        print(f"⚠ {e} - falling back to legacy pickles")
+        return load_legacy_pickles()
+
+
+def load_engineer():
+    return joblib.load('models/feature_engineer.pkl')
+
+
+def pipeline_stages(n_rows, bundle, engineer, calc):
+    """Stage name -> zero-argument callable, inputs prepared once up front"""
+    csv_bytes = telco_frame(n_rows).to_csv(index=False).encode('utf-8')
+    df = read_customers(io.BytesIO(csv_bytes), bundle.pipeline.vocabularies)
+    business = engineer.create_business_features(df)
+    encoded = engineer.encode_features(business, fit=False)
+    X = bundle.pipeline.transform_frame(df)
+    scored = df.assign(churn_probability=predict_proba(bundle.model, X))
+
+    return {
+        'read_csv': lambda: read_customers(io.BytesIO(csv_bytes), bundle.pipeline.vocabularies),
+        'business_features': lambda: engineer.create_business_features(df),
+        'encode_features': lambda: engineer.encode_features(business, fit=False),
+        'prepare_features': lambda: engineer.prepare_features(encoded, target_col=None, fit=False),
+        'fused_transform': lambda: bundle.pipeline.transform_frame(df),
+        'model_predict': lambda: predict_proba(bundle.model, X),
+        'business_report': lambda: calc.generate_business_report(scored)
+    }, csv_bytes
+
+
+def api_client():
+    """In-process TestClient for src/api.py, without job workers or the response cache"""
+    jobs_dir = tempfile.mkdtemp(prefix='churn-bench-jobs-')
+    os.environ.update({'CHURN_JOB_WORKERS': '0', 'CHURN_CACHE_SIZE': '0',
+                       'CHURN_JOBS_DIR': jobs_dir})
+    from fastapi.testclient import TestClient
+    import api
+    return TestClient(api.app)
+
+
+def api_stages(client, n_rows, csv_bytes):
+    customer = telco_frame(1).drop(columns=['customerID', 'Churn']).iloc[0].to_dict()
+
+    def post(path, **kwargs):
+        response = client.post(path, **kwargs)
+        response.raise_for_status()
+        return response
+
+    stages = {}
+    if n_rows == 1:
+        stages['api_predict'] = lambda: post('/predict', json=customer)
+    if n_rows <= API_MAX_ROWS:
+        stages['api_bulk'] = lambda: post('/predict/bulk',
+                                          files={'file': ('customers.csv', csv_bytes, 'text/csv')})
+    return stages
+
+
+def run_suite(sizes=SIZES, api=True):
+    """Timings and peak memory per stage per input size"""
+    warnings.filterwarnings('ignore', category=UserWarning)
+    bundle = load_serving_bundle()
+    engineer = load_engineer()
+    calc = BusinessImpactCalculator()
+
+    results = {}
+    with contextlib.ExitStack() as stack:
+        # Entering the client runs the API's startup (model load, executors)
+        client = stack.enter_context(api_client()) if api else None
+        for n_rows in sizes:
+            stages, csv_bytes = pipeline_stages(n_rows, bundle, engineer, calc)
+            if client is not None:
+                stages.update(api_stages(client, n_rows, csv_bytes))
+            results[str(n_rows)] = {name: measure(fn, repeats_for(n_rows))
+                                    for name, fn in stages.items()}
+            print_results(n_rows, results[str(n_rows)])
+
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'cpus': os.cpu_count()},
+        'model': {'type': type(bundle.model).__name__, 'version': bundle.version},
+        'results': results
+    }
+
+
+def find_regressions(results, baseline, threshold=DEFAULT_THRESHOLD,
+                     min_seconds=MIN_REGRESSION_SECONDS):
+    """Stages slower than threshold x their baseline (and by at least min_seconds)
+
+    Stages or sizes missing from either side are ignored.
+    """
+    regressions = []
+    for size, stages in results['results'].items():
+        for stage, current in stages.items():
+            base = baseline['results'].get(size, {}).get(stage)
+            if base is None:
+                continue
+            slowdown = current['seconds'] - base['seconds']
+            if current['seconds'] > threshold * base['seconds'] and slowdown > min_seconds:
+                regressions.append({'size': int(size), 'stage': stage,
+                                    'baseline_seconds': base['seconds'],
+                                    'seconds': current['seconds'],
+                                    'ratio': current['seconds'] / base['seconds']})
+    return regressions
+
+
+def print_results(n_rows, stages):
+    print(f"\n{n_rows:,} rows:")
+    for name, result in stages.items():
+        seconds = result['seconds']
+        timing = f"{seconds * 1e3:9.2f} ms" if seconds < 1 else f"{seconds:9.3f} s "
+        print(f"  {name:20s} {timing}   peak {result['peak_mb']:8.1f} MB")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages against baselines")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help="Row counts to run")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Write this run as the new baseline instead of comparing")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Fail when a stage takes more than this multiple of its baseline")
+    parser.add_argument('--output', help="Also write this run's results to a JSON file")
+    parser.add_argument('--no-api', action='store_true', help="Skip the in-process API latency stages")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("="*60)
+    print("PERFORMANCE REGRESSION SUITE")
+    print("="*60)
+
+    results = run_suite(args.sizes, api=not args.no_api)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    print("\n" + "="*60)
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Baseline written to: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠ No baseline at {args.baseline} - run with --update-baseline first")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = find_regressions(results, baseline, args.threshold)
+    for r in regressions:
+        print(f"⚠ {r['stage']} at {r['size']:,} rows: {r['seconds']:.4f} s vs "
+              f"baseline {r['baseline_seconds']:.4f} s ({r['ratio']:.2f}x)")
+    if regressions:
+        print(f"{len(regressions)} stage(s) regressed past {args.threshold}x")
+        return 1
+    print(f"✓ No stage regressed past {args.threshold}x of {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
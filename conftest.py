@@ -0,0 +1,68 @@
+"""
+Shared Test Helpers
+Telco-shaped customers, fitted feature engineers and trained models
+"""
+import sys
+sys.path.append('src')
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from features import ChurnFeatureEngineer
+
+SERVICE_CHOICES = ["Yes", "No", "No internet service"]
+
+
+def make_customers(n, seed=0):
+    """Random Telco-shaped raw customer records"""
+    rng = np.random.default_rng(seed)
+    tenure = rng.integers(0, 73, n)
+    monthly = np.round(rng.uniform(18, 120, n), 2)
+    return pd.DataFrame({
+        'customerID': [f"{i:04d}-TEST" for i in range(n)],
+        'gender': rng.choice(["Male", "Female"], n),
+        'SeniorCitizen': rng.integers(0, 2, n),
+        'Partner': rng.choice(["Yes", "No"], n),
+        'Dependents': rng.choice(["Yes", "No"], n),
+        'tenure': tenure,
+        'PhoneService': rng.choice(["Yes", "No"], n),
+        'MultipleLines': rng.choice(["Yes", "No", "No phone service"], n),
+        'InternetService': rng.choice(["DSL", "Fiber optic", "No"], n),
+        'OnlineSecurity': rng.choice(SERVICE_CHOICES, n),
+        'OnlineBackup': rng.choice(SERVICE_CHOICES, n),
+        'DeviceProtection': rng.choice(SERVICE_CHOICES, n),
+        'TechSupport': rng.choice(SERVICE_CHOICES, n),
+        'StreamingTV': rng.choice(SERVICE_CHOICES, n),
+        'StreamingMovies': rng.choice(SERVICE_CHOICES, n),
+        'Contract': rng.choice(["Month-to-month", "One year", "Two year"], n),
+        'PaperlessBilling': rng.choice(["Yes", "No"], n),
+        'PaymentMethod': rng.choice(["Electronic check", "Mailed check",
+                                     "Bank transfer (automatic)",
+                                     "Credit card (automatic)"], n),
+        'MonthlyCharges': monthly,
+        'TotalCharges': np.round(monthly * np.maximum(tenure, 1), 2),
+        'Churn': rng.integers(0, 2, n)
+    })
+
+
+def fit_engineer(df):
+    """Fit a ChurnFeatureEngineer the same way prepare_data_pipeline does"""
+    engineer = ChurnFeatureEngineer()
+    df = engineer.create_business_features(df)
+    df = engineer.encode_features(df, fit=True)
+    engineer.prepare_features(df, fit=True)
+    return engineer
+
+
+def training_data(engineer, customers):
+    """Scaled feature matrix and target through the fitted DataFrame pipeline"""
+    df = engineer.encode_features(engineer.create_business_features(customers), fit=False)
+    return engineer.prepare_features(df, fit=False)
+
+
+def train_model(customers, model=None):
+    """Fit an engineer and a model (LogisticRegression by default) on raw customers"""
+    engineer = fit_engineer(customers)
+    X, y = training_data(engineer, customers)
+    if model is None:
+        model = LogisticRegression(max_iter=1000)
+    return engineer, model.fit(X, y), X, y
@@ -0,0 +1,95 @@
+"""
+Offline Batch Scoring
+Score a full customer base from CSV/Parquet into Parquet/Arrow
+"""
+import sys
+sys.path.append('src')
+import argparse
+import os
+import time
+
+from bundle import (DEFAULT_BUNDLE_DIR, BundleError, BundleNotFound, load_bundle,
+                    load_legacy_pickles, read_manifest)
+from business import BusinessImpactCalculator, BusinessReportAccumulator
+from parallel import ParallelBulkScorer
+from scoring import ResultWriter, read_chunks, score_chunks
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Score a customer file in chunks")
+    parser.add_argument('input', help="Customer data (.csv or .parquet)")
+    parser.add_argument('-o', '--output', default='data/processed/churn_scores.parquet',
+                        help="Per-customer results (.parquet, or .arrow/.feather for Arrow IPC)")
+    parser.add_argument('--bundle', default=DEFAULT_BUNDLE_DIR, help="Model bundle directory")
+    parser.add_argument('--chunksize', type=int, default=100_000, help="Rows per chunk")
+    parser.add_argument('--workers', type=int, default=1, help="Scoring processes (1 = in-process)")
+    parser.add_argument('--top-n', type=int, default=500, help="Customers targeted in the ROI plan")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("="*60)
+    print("TELECOM CHURN PREDICTION - BATCH SCORING")
+    print("="*60)
+
+    calc = BusinessImpactCalculator()
+
+    if args.workers > 1:
+        try:
+            vocabularies = read_manifest(args.bundle)['vocabularies']
+        except BundleError:
+            vocabularies = None
+        scorer = ParallelBulkScorer(n_workers=args.workers, bundle_dir=args.bundle, calculator=calc)
+        chunks = read_chunks(args.input, args.chunksize, vocabularies)
+        scored = scorer.map_shards(chunks, top_n=args.top_n)
+        print(f"✓ Scoring with {args.workers} worker processes")
+    else:
+        scorer = None
+        try:
+            bundle = load_bundle(args.bundle)
+        except BundleNotFound as e:
+            print(f"⚠ {e} - falling back to legacy pickles")
+            bundle = load_legacy_pickles()
+        chunks = read_chunks(args.input, args.chunksize, bundle.pipeline.vocabularies)
+        scored = score_chunks(chunks, bundle.pipeline, bundle.model, calc, args.top_n)
+        print(f"✓ Model bundle {bundle.version} loaded ({bundle.backend} backend)")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    writer = ResultWriter(args.output)
+    report = BusinessReportAccumulator(calc, top_n=args.top_n)
+
+    start = time.perf_counter()
+    n_rows = 0
+    try:
+        for accumulator, results in scored:
+            report.merge(accumulator)
+            writer.write(results)
+            n_rows += len(results)
+            elapsed = time.perf_counter() - start
+            print(f"\r  Scored {n_rows:,} rows ({n_rows / elapsed:,.0f} rows/sec)", end='', flush=True)
+    finally:
+        writer.close()
+        if scorer is not None:
+            scorer.close()
+    elapsed = time.perf_counter() - start
+    print()
+
+    summary = report.result()
+    roi = summary['intervention_plan']
+    print("\n" + "="*60)
+    print("SCORING SUMMARY")
+    print("="*60)
+    print(f"Rows scored:      {n_rows:,}")
+    print(f"Wall time:        {elapsed:,.1f} s")
+    print(f"Throughput:       {n_rows / elapsed if elapsed else 0:,.0f} rows/sec")
+    print(f"High risk:        {summary['high_risk_customers']:,}")
+    print(f"Medium risk:      {summary['medium_risk_customers']:,}")
+    print(f"Revenue at risk:  ₹{summary['total_revenue_at_risk']:,.0f}")
+    print(f"Top {args.top_n} ROI:      {roi['roi_percentage']:.1f}% (net ₹{roi['net_benefit']:,.0f})")
+    print(f"\n✓ Results written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,38 +2,147 @@
 FastAPI Backend for Churn Prediction
 Phase 5: Deployment API
 """
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Header
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
 import pandas as pd
-import joblib
-import numpy as np
-from typing import List, Dict
+import asyncio
+import hmac
 import io
 import sys
 import os
+from contextlib import asynccontextmanager
 
 # Add src directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from business import BusinessImpactCalculator
+from business import BusinessImpactCalculator, BusinessReportAccumulator
+from inference import predict_proba, score_frame
+from bundle import BundleNotFound, load_bundle, load_legacy_pickles
+from cache import PredictionCache
+from serving import ModelServer, model_version
+from executor import BoundedExecutor, ExecutorSaturated
+from jobs import DEFAULT_JOBS_DIR, DEFAULT_LEASE_SECONDS, JobStore, JobWorker
+from schema import read_customers
 
-app = FastAPI(title="Telecom Churn Prediction API",
-             description="Predict customer churn with business impact analysis",
-             version="1.0.0")
-
-# Load model and feature engineer
-try:
-    model = joblib.load('models/best_model.pkl')
-    engineer = joblib.load('models/feature_engineer.pkl')
-    print("✓ Model and feature engineer loaded")
-except:
-    model = None
-    engineer = None
-    print("⚠ Model not found. Train model first using src/model.py")
+# Serving backend: 'auto' uses the raw XGBoost booster when the bundle has one
+MODEL_BACKEND = os.getenv('CHURN_MODEL_BACKEND', 'auto')
+XGB_NTHREAD = int(os.environ['CHURN_XGB_NTHREAD']) if os.getenv('CHURN_XGB_NTHREAD') else None
+
+def load_serving_bundle():
+    """Load the model bundle (the legacy pickle pair only when no bundle exists)
+    
+    A bundle that exists but fails to load raises, so a reload keeps
+    serving the current model instead of swapping in the old pickles.
+    """
+    try:
+        return load_bundle(backend=MODEL_BACKEND, nthread=XGB_NTHREAD)
+    except BundleNotFound as e:
+        print(f"⚠ {e} - falling back to legacy pickles")
+        return load_legacy_pickles()
+
+# Optional micro-batching of concurrent /predict calls
+MICROBATCH_ENABLED = os.getenv('CHURN_MICROBATCH', '0') == '1'
+MICROBATCH_MAX_SIZE = int(os.getenv('CHURN_MICROBATCH_MAX_SIZE', '32'))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv('CHURN_MICROBATCH_MAX_WAIT_MS', '5'))
 
 # Initialize business calculator
 business_calc = BusinessImpactCalculator()
 
+# Optional process pool for streamed bulk scoring
+BULK_WORKERS = int(os.getenv('CHURN_BULK_WORKERS', '0'))
+
+# In-process cache of /predict responses (CHURN_CACHE_SIZE=0 disables it)
+CACHE_SIZE = int(os.getenv('CHURN_CACHE_SIZE', '10000'))
+CACHE_TTL_SECONDS = float(os.getenv('CHURN_CACHE_TTL_SECONDS', '3600'))
+
+if CACHE_SIZE > 0:
+    prediction_cache = PredictionCache(maxsize=CACHE_SIZE, ttl_seconds=CACHE_TTL_SECONDS)
+else:
+    prediction_cache = None
+
+# Hot reload: poll the bundle manifest every N seconds, or POST /admin/reload
+# (only enabled when CHURN_ADMIN_TOKEN is set)
+RELOAD_POLL_SECONDS = float(os.getenv('CHURN_RELOAD_POLL_SECONDS', '0'))
+ADMIN_TOKEN = os.getenv('CHURN_ADMIN_TOKEN')
+
+server = ModelServer(
+    load_serving_bundle,
+    cache=prediction_cache,
+    microbatch={'max_batch_size': MICROBATCH_MAX_SIZE,
+                'max_wait_ms': MICROBATCH_MAX_WAIT_MS} if MICROBATCH_ENABLED else None,
+    bulk_workers=BULK_WORKERS,
+    calculator=business_calc,
+    backend=MODEL_BACKEND
+)
+
+# CPU work runs off the event loop on two bounded pools, so a big upload
+# cannot starve /predict; past max_pending, requests get a 429
+PREDICT_THREADS = int(os.getenv('CHURN_PREDICT_THREADS', '4'))
+PREDICT_MAX_PENDING = int(os.getenv('CHURN_PREDICT_MAX_PENDING', '256'))
+BULK_THREADS = int(os.getenv('CHURN_BULK_THREADS', '2'))
+BULK_MAX_PENDING = int(os.getenv('CHURN_BULK_MAX_PENDING', '4'))
+
+
+def saturated(e):
+    return HTTPException(status_code=429, detail=f"Server busy, retry later: {str(e)}",
+                         headers={"Retry-After": "1"})
+
+# Background bulk-scoring jobs (POST /jobs), queued in SQLite
+JOBS_DIR = os.getenv('CHURN_JOBS_DIR', DEFAULT_JOBS_DIR)
+JOB_WORKERS = int(os.getenv('CHURN_JOB_WORKERS', '1'))
+JOB_CHUNKSIZE = int(os.getenv('CHURN_JOB_CHUNKSIZE', '50000'))
+JOB_LEASE_SECONDS = float(os.getenv('CHURN_JOB_LEASE_SECONDS', str(DEFAULT_LEASE_SECONDS)))
+
+# Created at startup by lifespan(), not on import
+predict_executor = None
+bulk_executor = None
+job_store = None
+job_workers = []
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Load the model and start the executors and job workers; stop them on shutdown"""
+    global predict_executor, bulk_executor, job_store, job_workers
+    
+    try:
+        server.load()
+        bundle = server.state.bundle
+        print(f"✓ Model bundle {bundle.version} loaded ({bundle.manifest['model_type']}, {bundle.backend} backend)")
+    except Exception as e:
+        print(f"⚠ Model not loaded ({e}). Train model first using train_pipeline.py")
+    
+    if RELOAD_POLL_SECONDS > 0:
+        server.watch(poll_seconds=RELOAD_POLL_SECONDS)
+    
+    predict_executor = BoundedExecutor(max_workers=PREDICT_THREADS, max_pending=PREDICT_MAX_PENDING,
+                                       name='predict')
+    bulk_executor = BoundedExecutor(max_workers=BULK_THREADS, max_pending=BULK_MAX_PENDING,
+                                    name='bulk')
+    
+    # Only jobs whose worker stopped heartbeating; live workers elsewhere keep theirs
+    job_store = JobStore(JOBS_DIR, lease_seconds=JOB_LEASE_SECONDS)
+    job_store.requeue_stale()
+    job_workers = [JobWorker(job_store, server, business_calc, chunksize=JOB_CHUNKSIZE)
+                   for _ in range(JOB_WORKERS)]
+    for worker in job_workers:
+        worker.start()
+    
+    yield
+    
+    for worker in job_workers:
+        worker.close()
+    server.close()
+    predict_executor.close()
+    bulk_executor.close()
+
+
+app = FastAPI(title="Telecom Churn Prediction API",
+             description="Predict customer churn with business impact analysis",
+             version="1.0.0",
+             lifespan=lifespan)
+
 class CustomerInput(BaseModel):
     """Single customer input schema"""
     gender: str
@@ -66,106 +175,327 @@ class PredictionResponse(BaseModel):
     customer_value: float
 
 @app.get("/")
-def root():
+async def root():
     """API health check"""
     return {
         "message": "Telecom Churn Prediction API",
         "status": "active",
-        "model_loaded": model is not None
+        "model_loaded": server.state.model is not None
     }
 
 @app.post("/predict", response_model=PredictionResponse)
-def predict_single(customer: CustomerInput):
+async def predict_single(customer: CustomerInput):
     """Predict churn for a single customer"""
     
-    if model is None or engineer is None:
-        raise HTTPException(status_code=503, detail="Model not loaded")
-    
-    try:
-        # Convert to DataFrame
-        customer_dict = customer.dict()
-        df = pd.DataFrame([customer_dict])
+    with server.use() as state:
+        if state.model is None:
+            raise HTTPException(status_code=503, detail="Model not loaded")
         
-        # Feature engineering
-        df = engineer.create_business_features(df)
-        df = engineer.encode_features(df, fit=False)
-        X, _ = engineer.prepare_features(df, target_col=None, fit=False)
+        row = customer.dict()
+        version = model_version(state.bundle)
+        if prediction_cache is not None:
+            cached = prediction_cache.get(row, version)
+            if cached is not None:
+                return cached
         
-        # Predict
-        churn_prob = model.predict_proba(X)[0][1]
+        try:
+            if state.batcher is not None:
+                # Coalesced with concurrent requests into one model call
+                async with predict_executor.slot():
+                    churn_prob = await asyncio.wrap_future(state.batcher.submit(row))
+            else:
+                # Compiled single-row path, off the event loop
+                churn_prob = await predict_executor.run(score_customer, state, row)
+            
+            # Business metrics
+            risk_score = business_calc.calculate_risk_score(churn_prob)
+            risk_tier = business_calc.assign_risk_tier(churn_prob)
+            customer_value = business_calc.calculate_customer_lifetime_value(
+                customer.MonthlyCharges, customer.tenure
+            )
+            recommended_action = business_calc.recommend_action(churn_prob, customer_value)
+            
+            response = PredictionResponse(
+                churn_probability=float(churn_prob),
+                risk_score=risk_score,
+                risk_tier=risk_tier,
+                recommended_action=recommended_action,
+                customer_value=float(customer_value)
+            )
         
-        # Business metrics
-        risk_score = business_calc.calculate_risk_score(churn_prob)
-        risk_tier = business_calc.assign_risk_tier(churn_prob)
-        customer_value = business_calc.calculate_customer_lifetime_value(
-            customer.MonthlyCharges, customer.tenure
-        )
-        recommended_action = business_calc.recommend_action(churn_prob, customer_value)
+        except ExecutorSaturated as e:
+            raise saturated(e)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
         
-        return PredictionResponse(
-            churn_probability=float(churn_prob),
-            risk_score=risk_score,
-            risk_tier=risk_tier,
-            recommended_action=recommended_action,
-            customer_value=float(customer_value)
-        )
+        if prediction_cache is not None:
+            prediction_cache.put(row, response, version)
+        return response
+
+
+def score_customer(state, row):
+    """Churn probability for one raw customer dict (runs on the predict pool)"""
+    X = state.pipeline.transform_row(row)
+    return predict_proba(state.model, X)[0]
+
+
+PREVIEW_COLUMNS = ['churn_probability', 'risk_score', 'risk_tier']
+
+
+def format_bulk_report(report, predictions):
+    """Bulk response body from a business report and preview rows"""
+    return {
+        "total_customers": report['total_customers'],
+        "high_risk_customers": report['high_risk_customers'],
+        "medium_risk_customers": report['medium_risk_customers'],
+        "total_revenue_at_risk": f"₹{report['total_revenue_at_risk']:,.2f}",
+        "intervention_plan": {
+            "customers_targeted": report['intervention_plan']['customers_targeted'],
+            "intervention_cost": f"₹{report['intervention_plan']['intervention_cost']:,.2f}",
+            "expected_revenue_saved": f"₹{report['intervention_plan']['expected_revenue_saved']:,.2f}",
+            "net_benefit": f"₹{report['intervention_plan']['net_benefit']:,.2f}",
+            "roi_percentage": f"{report['intervention_plan']['roi_percentage']:.1f}%"
+        },
+        "predictions": predictions
+    }
+
+
+def predict_bulk_streaming(state, upload, chunksize, top_n=500):
+    """Score an upload chunk by chunk, keeping only running report aggregates"""
+    accumulator = BusinessReportAccumulator(business_calc, top_n=top_n)
+    preview = []
+    chunks = read_customers(upload, state.pipeline.vocabularies, chunksize=chunksize)
     
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
+    if state.bulk_scorer is not None:
+        # Chunks are scored in parallel worker processes
+        for shard_accumulator, shard_preview in state.bulk_scorer.map_shards(chunks, top_n=top_n, preview=10):
+            accumulator.merge(shard_accumulator)
+            preview.extend(shard_preview[PREVIEW_COLUMNS].to_dict('records')[:10 - len(preview)])
+        return format_bulk_report(accumulator.result(), preview)
+    
+    for chunk in chunks:
+        chunk['churn_probability'] = score_frame(state.pipeline, state.model, chunk)
+        accumulator.update(chunk)
+        
+        if len(preview) < 10:
+            chunk_segmented, _ = business_calc.segment_customers(chunk.head(10 - len(preview)))
+            preview.extend(chunk_segmented[PREVIEW_COLUMNS].to_dict('records'))
+    
+    return format_bulk_report(accumulator.result(), preview)
+
+
+def predict_bulk_in_memory(state, contents):
+    """Score a whole uploaded CSV at once"""
+    df = read_customers(io.BytesIO(contents), state.pipeline.vocabularies)
+    
+    # Store original data
+    df_original = df.copy()
+    
+    # Feature engineering + predict
+    churn_probs = score_frame(state.pipeline, state.model, df)
+    
+    # Add predictions to original data
+    df_original['churn_probability'] = churn_probs
+    
+    # Generate business report
+    report, df_segmented = business_calc.generate_business_report(df_original)
+    
+    return format_bulk_report(
+        report,
+        df_segmented[PREVIEW_COLUMNS].to_dict('records')[:10]
+    )
 
 
 @app.post("/predict/bulk")
-def predict_bulk(file: UploadFile = File(...)):
+async def predict_bulk(file: UploadFile = File(...),
+                       stream: bool = Query(False, description="Score the upload in fixed-size chunks"),
+                       chunksize: int = Query(50000, gt=0, description="Rows per chunk in streaming mode")):
     """Predict churn for multiple customers from CSV"""
     
-    if model is None or engineer is None:
-        raise HTTPException(status_code=503, detail="Model not loaded")
-    
-    try:
-        # Read CSV
-        contents = file.file.read()
-        df = pd.read_csv(io.BytesIO(contents))
-        
-        # Store original data
-        df_original = df.copy()
-        
-        # Feature engineering
-        df = engineer.create_business_features(df)
-        df = engineer.encode_features(df, fit=False)
-        X, _ = engineer.prepare_features(df, target_col=None, fit=False)
-        
-        # Predict
-        churn_probs = model.predict_proba(X)[:, 1]
+    with server.use() as state:
+        if state.model is None:
+            raise HTTPException(status_code=503, detail="Model not loaded")
         
-        # Add predictions to original data
-        df_original['churn_probability'] = churn_probs
+        try:
+            async with bulk_executor.slot():
+                if stream:
+                    # Bounded memory: never holds the whole file or frame
+                    return await bulk_executor.submit(predict_bulk_streaming, state, file.file, chunksize)
+                
+                contents = await file.read()
+                return await bulk_executor.submit(predict_bulk_in_memory, state, contents)
         
-        # Generate business report
-        report, df_segmented = business_calc.generate_business_report(df_original)
-        
-        return {
-            "total_customers": report['total_customers'],
-            "high_risk_customers": report['high_risk_customers'],
-            "medium_risk_customers": report['medium_risk_customers'],
-            "total_revenue_at_risk": f"₹{report['total_revenue_at_risk']:,.2f}",
-            "intervention_plan": {
-                "customers_targeted": report['intervention_plan']['customers_targeted'],
-                "intervention_cost": f"₹{report['intervention_plan']['intervention_cost']:,.2f}",
-                "expected_revenue_saved": f"₹{report['intervention_plan']['expected_revenue_saved']:,.2f}",
-                "net_benefit": f"₹{report['intervention_plan']['net_benefit']:,.2f}",
-                "roi_percentage": f"{report['intervention_plan']['roi_percentage']:.1f}%"
-            },
-            "predictions": df_segmented[['churn_probability', 'risk_score', 'risk_tier']].to_dict('records')[:10]
-        }
+        except ExecutorSaturated as e:
+            raise saturated(e)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Bulk prediction error: {str(e)}")
+
+
+RESULT_COLUMNS = ['customerID', 'churn_probability', 'risk_score', 'risk_tier', 'recommended_action']
+
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+
+def score_results(state, chunk, row_offset):
+    """Per-customer result rows for one raw chunk"""
+    chunk = chunk.assign(churn_probability=score_frame(state.pipeline, state.model, chunk))
+    return business_calc.customer_results(chunk, row_offset)[RESULT_COLUMNS]
+
+
+def serialize_results(results, fmt, header):
+    """Encode result rows as NDJSON lines or CSV text"""
+    if fmt == 'csv':
+        return results.to_csv(index=False, header=header)
+    return results.to_json(orient='records', lines=True, force_ascii=False)
+
+
+def next_results(state, chunks, row_offset, fmt):
+    """Read, score and serialize the next chunk, or None at end of file"""
+    chunk = next(chunks, None)
+    if chunk is None:
+        return None, 0
+    return serialize_results(score_results(state, chunk, row_offset), fmt, header=row_offset == 0), len(chunk)
+
+
+@app.post("/predict/bulk/download")
+async def predict_bulk_download(file: UploadFile = File(...),
+                                format: str = Query('ndjson', description="ndjson or csv"),
+                                chunksize: int = Query(50000, gt=0, description="Rows scored per chunk")):
+    """Stream per-customer predictions back as each chunk is scored"""
+    
+    if format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    
+    # Model state and a bulk slot are held until the response body finishes
+    if not bulk_executor.try_acquire():
+        raise saturated(ExecutorSaturated("bulk executor saturated"))
+    state = server.acquire()
     
+    def release():
+        server.release(state)
+        bulk_executor.release()
+    
+    try:
+        if state.model is None:
+            raise HTTPException(status_code=503, detail="Model not loaded")
+        
+        chunks = await bulk_executor.submit(
+            lambda: read_customers(file.file, state.pipeline.vocabularies, chunksize=chunksize))
+        # Score the first chunk up front so bad input still gets a 400
+        first, n_rows = await bulk_executor.submit(next_results, state, chunks, 0, format)
+    except HTTPException:
+        release()
+        raise
     except Exception as e:
+        release()
         raise HTTPException(status_code=400, detail=f"Bulk prediction error: {str(e)}")
+    
+    if first is None:
+        # Empty upload: header only
+        first = serialize_results(pd.DataFrame(columns=RESULT_COLUMNS), format, header=True)
+    
+    async def generate():
+        try:
+            yield first
+            row_offset = n_rows
+            while n_rows:
+                body, n = await bulk_executor.submit(next_results, state, chunks, row_offset, format)
+                if body is None:
+                    break
+                yield body
+                row_offset += n
+        finally:
+            release()
+    
+    return StreamingResponse(generate(), media_type=STREAM_FORMATS[format])
+
+@app.post("/jobs", status_code=202)
+async def submit_job(file: UploadFile = File(...)):
+    """Queue a CSV for background scoring and return its job ID right away"""
+    
+    job_id = await asyncio.to_thread(job_store.submit, file.file)
+    for worker in job_workers:
+        worker.notify()
+    
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/jobs/{job_id}",
+        "results_url": f"/jobs/{job_id}/results"
+    }
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Job status, progress (rows scored, rows/sec) and, once done, its summary"""
+    
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+@app.get("/jobs/{job_id}/results")
+async def job_results(job_id: str):
+    """Per-customer results of a finished job as a Parquet file"""
+    
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    if job['status'] != 'done':
+        return JSONResponse(status_code=409, content={"detail": f"Job is {job['status']}",
+                                                      "status": job['status']})
+    
+    return FileResponse(job_store.results_path(job_id), media_type="application/vnd.apache.parquet",
+                        filename=f"churn_scores_{job_id}.parquet")
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Detailed health check"""
+    bundle = server.state.bundle
     return {
         "status": "healthy",
-        "model_loaded": model is not None,
-        "engineer_loaded": engineer is not None
+        "model_loaded": bundle is not None,
+        "engineer_loaded": bundle is not None,
+        "bundle_version": bundle.version if bundle is not None else None,
+        "backend": bundle.backend if bundle is not None else None,
+        "schema_hash": bundle.schema_hash if bundle is not None else None,
+        "reloads": server.reloads
+    }
+
+@app.post("/admin/reload")
+async def admin_reload(x_admin_token: str = Header(None)):
+    """Load the current artifacts, warm them up and swap them in"""
+    
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (set CHURN_ADMIN_TOKEN)")
+    if not hmac.compare_digest((x_admin_token or '').encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    
+    previous = server.state.version
+    try:
+        # In-flight requests keep the old model until they finish
+        state = await asyncio.to_thread(server.reload)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, still serving {previous}: {str(e)}")
+    
+    return {
+        "previous_version": previous,
+        "bundle_version": state.version,
+        "backend": state.bundle.backend,
+        "schema_hash": state.bundle.schema_hash
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Serving metrics"""
+    state = server.state
+    return {
+        "microbatch": state.batcher.stats() if state.batcher is not None else {"enabled": False},
+        "cache": prediction_cache.stats() if prediction_cache is not None else {"enabled": False},
+        "executors": {
+            "predict": predict_executor.stats(),
+            "bulk": bulk_executor.stats()
+        }
     }
@@ -0,0 +1,181 @@
+"""
+Native Inference Backends
+Score exported models without their sklearn wrappers
+"""
+import numpy as np
+
+
+class BoosterScorer:
+    """XGBoost Booster served through inplace_predict
+
+    Exposes the predict_proba interface of XGBClassifier so it drops into
+    every scoring path, but skips the wrapper's DataFrame validation and
+    DMatrix construction.
+    """
+
+    def __init__(self, booster, nthread=None):
+        """
+        Args:
+            booster: Trained xgboost.Booster with a binary:logistic objective
+            nthread: Threads used per prediction call (None keeps xgboost's default)
+        """
+        self.booster = booster
+        self.n_features_in_ = booster.num_features()
+        if nthread is not None:
+            self.set_nthread(nthread)
+
+    @classmethod
+    def load(cls, path, nthread=None):
+        """Load a booster saved as UBJSON (.ubj) or JSON (.json)"""
+        import xgboost as xgb
+        return cls(xgb.Booster(model_file=path), nthread=nthread)
+
+    @classmethod
+    def from_classifier(cls, model, nthread=None):
+        """Wrap the booster inside a fitted XGBClassifier"""
+        return cls(model.get_booster(), nthread=nthread)
+
+    def set_nthread(self, nthread):
+        self.booster.set_param({'nthread': int(nthread)})
+
+    def predict_proba(self, X):
+        """(n, 2) class probabilities for a feature matrix"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        positive = self.booster.inplace_predict(X)
+        return np.column_stack([1 - positive, positive])
+
+
+def export_booster(model, path):
+    """Save the raw booster of an XGBClassifier (format from the file extension)"""
+    model.get_booster().save_model(path)
+    return path
+
+
+def is_xgboost_model(model):
+    """True for fitted XGBClassifier-like models that expose get_booster"""
+    return hasattr(model, 'get_booster')
+
+
+class TreeEnsembleScorer:
+    """Fitted sklearn trees packed into flat NumPy node arrays
+
+    Every tree of a DecisionTreeClassifier or RandomForestClassifier is
+    concatenated into one set of arrays (feature, threshold, left, right,
+    missing-goes-left, leaf value). Leaves point to themselves, so a batch
+    is scored by stepping every (row, tree) pair down max_depth levels with
+    fancy indexing and averaging the leaf values, like forest predict_proba.
+    """
+
+    def __init__(self, feature, threshold, left, right, missing_left, value, roots, max_depth,
+                 batch_size=2048):
+        """
+        Args:
+            feature: Split feature per node (0 at leaves)
+            threshold: Split threshold per node
+            left, right: Absolute child indices per node (self at leaves)
+            missing_left: Whether NaN goes to the left child, per node
+            value: Positive-class probability per node
+            roots: Root node index of each tree
+            max_depth: Deepest tree depth, i.e. number of traversal steps
+            batch_size: Rows traversed at once, bounds the (rows x trees) work arrays
+        """
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.missing_left = np.asarray(missing_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.batch_size = batch_size
+        self.n_nodes = len(self.feature)
+        self.children = np.concatenate([self.right, self.left])
+        self.n_features_in_ = int(self.feature.max()) + 1 if len(self.feature) else 0
+
+    @classmethod
+    def from_model(cls, model, **kwargs):
+        """Compile a fitted DecisionTreeClassifier or RandomForestClassifier"""
+        estimators = getattr(model, 'estimators_', [model])
+        if list(model.classes_) != [0, 1]:
+            raise ValueError(f"Only binary 0/1 classifiers are supported, got classes {model.classes_}")
+
+        features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+        offset, max_depth = 0, 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            is_leaf = tree.children_left < 0
+            node_ids = np.arange(tree.node_count) + offset
+
+            # Class fractions -> probability of churn at each node
+            counts = tree.value[:, 0, :]
+            values.append(counts[:, 1] / counts.sum(axis=1))
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            # Learned NaN direction (sklearn >= 1.3); older trees send NaN right
+            missing.append(getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=bool)))
+            roots.append(offset)
+
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        scorer = cls(np.concatenate(features), np.concatenate(thresholds),
+                     np.concatenate(lefts), np.concatenate(rights), np.concatenate(missing),
+                     np.concatenate(values), roots, max_depth, **kwargs)
+        scorer.n_features_in_ = model.n_features_in_
+        return scorer
+
+    def save(self, path):
+        """Write the packed node arrays to an .npz file"""
+        np.savez(path, feature=self.feature, threshold=self.threshold,
+                 left=self.left, right=self.right, missing_left=self.missing_left,
+                 value=self.value, roots=self.roots, max_depth=self.max_depth,
+                 n_features_in=self.n_features_in_)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Load packed node arrays written by save"""
+        with np.load(path) as arrays:
+            if 'missing_left' not in arrays.files:
+                raise ValueError(f"{path} predates NaN routing; re-export the bundle")
+            scorer = cls(arrays['feature'], arrays['threshold'], arrays['left'],
+                         arrays['right'], arrays['missing_left'], arrays['value'], arrays['roots'],
+                         int(arrays['max_depth']), **kwargs)
+            scorer.n_features_in_ = int(arrays['n_features_in'])
+        return scorer
+
+    def _positive_proba(self, X):
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offset = (np.arange(n_rows, dtype=np.intp) * n_features)[:, None]
+        has_nan = np.isnan(flat_X).any()
+        node = np.repeat(self.roots[None, :], n_rows, axis=0)
+        for _ in range(self.max_depth):
+            x = np.take(flat_X, row_offset + np.take(self.feature, node))
+            # children[:n_nodes] = right, children[n_nodes:] = left
+            go_left = x <= np.take(self.threshold, node)
+            if has_nan:
+                # NaN compares False; follow each split's learned missing direction
+                go_left = np.where(np.isnan(x), np.take(self.missing_left, node), go_left)
+            node = np.take(self.children, node + go_left * self.n_nodes)
+        return np.take(self.value, node).mean(axis=1)
+
+    def predict_proba(self, X):
+        """(n, 2) class probabilities, averaged over trees"""
+        # sklearn compares float32 features against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        positive = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), self.batch_size):
+            stop = start + self.batch_size
+            positive[start:stop] = self._positive_proba(X[start:stop])
+        return np.column_stack([1 - positive, positive])
+
+
+TREE_MODEL_TYPES = ('DecisionTreeClassifier', 'RandomForestClassifier', 'ExtraTreesClassifier')
+
+
+def is_tree_model(model):
+    """True for fitted sklearn tree classifiers TreeEnsembleScorer can compile"""
+    return type(model).__name__ in TREE_MODEL_TYPES
@@ -0,0 +1,167 @@
+"""
+Micro-batching Request Coalescer
+Groups concurrent single-customer predictions into one model call
+"""
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+
+from inference import predict_proba
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """Buffer single-row requests and score them together
+
+    A background thread waits for the first queued request, then keeps
+    collecting until max_batch_size rows are queued or max_wait_ms has
+    passed. The batch gets one feature pass and one predict_proba call,
+    and every caller receives its own probability.
+    """
+
+    def __init__(self, pipeline, model, max_batch_size=32, max_wait_ms=5.0):
+        """
+        Args:
+            pipeline: CompiledFeaturePipeline used to build feature rows
+            model: Fitted classifier exposing predict_proba
+            max_batch_size: Largest number of rows scored in one call
+            max_wait_ms: Longest time the first request waits for company
+        """
+        self.pipeline = pipeline
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.n_requests = 0
+        self.n_batches = 0
+        self.max_queue_depth = 0
+        self.batch_sizes = Counter()
+
+        self.worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self.worker.start()
+
+    def submit(self, customer):
+        """Queue one raw customer dict, returning a Future for its probability"""
+        future = Future()
+        self.queue.put((customer, future))
+        with self.lock:
+            self.n_requests += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return future
+
+    def predict(self, customer, timeout=None):
+        """Blocking churn probability for one customer"""
+        return self.submit(customer).result(timeout=timeout)
+
+    def close(self):
+        """Stop the worker once queued requests are drained"""
+        self.queue.put(_STOP)
+        self.worker.join()
+
+    def stats(self):
+        """Queue-depth and batch-size metrics"""
+        with self.lock:
+            n_batches = self.n_batches
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'queue_depth': self.queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'requests': self.n_requests,
+                'batches': n_batches,
+                'avg_batch_size': (sum(size * count for size, count in self.batch_sizes.items()) / n_batches
+                                   if n_batches else 0.0),
+                'batch_size_histogram': dict(sorted(self.batch_sizes.items()))
+            }
+
+    def _collect(self):
+        """Block for one request, then gather more until size or time limit"""
+        item = self.queue.get()
+        if item is _STOP:
+            return None
+
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Score what we have, then stop on the next collect
+                self.queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _features(self, customers):
+        """Feature matrix for the batch from one transform_frame pass
+
+        Rows the frame pass cannot vouch for (missing or blank fields, or a
+        frame that fails to build) are redone with transform_row, so a bad
+        row fails on its own with the single-customer error. Returns the
+        matrix and {row: exception}.
+        """
+        X = np.empty((len(customers), len(self.pipeline.feature_names)), dtype=self.pipeline.dtype)
+        try:
+            frame = pd.DataFrame.from_records(customers)
+            X[:] = self.pipeline.transform_frame(frame)
+            retry = np.flatnonzero(frame.isna().any(axis=1).to_numpy() | np.isnan(X).any(axis=1))
+        except Exception:
+            retry = range(len(customers))
+
+        errors = {}
+        for i in retry:
+            try:
+                X[i] = self.pipeline.transform_row(customers[i])[0]
+            except Exception as e:
+                errors[i] = e
+        return X, errors
+
+    def _score(self, batch):
+        """One feature pass and one model call for the whole batch"""
+        customers, pending = [], []
+        for customer, future in batch:
+            if future.set_running_or_notify_cancel():
+                customers.append(customer)
+                pending.append(future)
+        if not pending:
+            return
+
+        X, errors = self._features(customers)
+        for i, e in errors.items():
+            # Bad rows fail on their own without sinking the batch
+            pending[i].set_exception(e)
+        rows = [i for i in range(len(pending)) if i not in errors]
+        if not rows:
+            return
+
+        try:
+            probs = predict_proba(self.model, X[rows])
+        except Exception as e:
+            for i in rows:
+                pending[i].set_exception(e)
+            return
+
+        for i, prob in zip(rows, probs):
+            pending[i].set_result(float(prob))
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            with self.lock:
+                self.n_batches += 1
+                self.batch_sizes[len(batch)] += 1
+            self._score(batch)
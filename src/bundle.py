@@ -0,0 +1,283 @@
+"""
+Model Artifact Bundle
+Versioned model + feature schema without pickled sklearn transformers
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+import joblib
+
+from backends import (BoosterScorer, TreeEnsembleScorer, export_booster,
+                      is_tree_model, is_xgboost_model)
+from inference import CompiledFeaturePipeline
+from schema import NUM_COLS
+
+# 2: manifests carry unknown_codes (fallback codes for unseen labels)
+# 3: manifests carry fill_values (training medians for missing numerics)
+BUNDLE_FORMAT_VERSION = 3
+DEFAULT_BUNDLE_DIR = 'models/churn_bundle'
+MANIFEST_FILE = 'manifest.json'
+MODEL_FILE = 'model.joblib'
+BOOSTER_FILE = 'booster.ubj'
+TREES_FILE = 'trees.npz'
+
+# Native backends: manifest key of their file and how to load it
+NATIVE_BACKENDS = {
+    'booster': ('booster_file', lambda path, nthread: BoosterScorer.load(path, nthread=nthread)),
+    'trees': ('trees_file', lambda path, nthread: TreeEnsembleScorer.load(path))
+}
+
+
+class BundleError(Exception):
+    """Raised when a model bundle is missing, malformed or inconsistent"""
+
+
+class BundleNotFound(BundleError):
+    """Raised when there is no bundle manifest at all"""
+
+
+def schema_hash(feature_names, vocabularies, num_cols, unknown_codes, fill_values):
+    """Stable hash of everything the model input depends on"""
+    schema = {
+        'feature_names': list(feature_names),
+        'vocabularies': {col: list(labels) for col, labels in sorted(vocabularies.items())},
+        'num_cols': list(num_cols),
+        'unknown_codes': {col: int(code) for col, code in sorted(unknown_codes.items())},
+        'fill_values': {col: float(value) for col, value in sorted(fill_values.items())}
+    }
+    payload = json.dumps(schema, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ModelBundle:
+    """Loaded model and the inference pipeline rebuilt from plain arrays"""
+
+    def __init__(self, model, pipeline, manifest, backend='sklearn'):
+        self.model = model
+        self.pipeline = pipeline
+        self.manifest = manifest
+        self.backend = backend
+        self.version = manifest['bundle_version']
+        self.schema_hash = manifest['schema_hash']
+
+    def __repr__(self):
+        return (f"ModelBundle(version={self.version!r}, model={self.manifest['model_type']}, "
+                f"backend={self.backend}, schema={self.schema_hash[:12]})")
+
+
+def save_bundle(model, engineer, bundle_dir=DEFAULT_BUNDLE_DIR, bundle_version=None):
+    """Write model + encoder vocabularies + scaler statistics as one bundle
+
+    The files are written to a staging directory next to bundle_dir, which
+    then replaces bundle_dir whole, so a reader never sees a new model with
+    an old or half-written manifest. Anything else in bundle_dir is dropped.
+    """
+    pipeline = CompiledFeaturePipeline.from_engineer(engineer)
+    if not pipeline.unknown_codes:
+        raise BundleError("Feature engineer has no unknown_codes; refit it with train_pipeline.py "
+                          "or recover them with: python src/bundle.py --data <training csv>")
+    if not pipeline.fill_values:
+        raise BundleError("Feature engineer has no fill_values; refit it with train_pipeline.py "
+                          "or recover them with: python src/bundle.py --data <training csv>")
+    created_at = datetime.now(timezone.utc)
+
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'bundle_version': bundle_version or created_at.strftime('%Y%m%d%H%M%S'),
+        'created_at': created_at.isoformat(),
+        'model_type': type(model).__name__,
+        'model_file': MODEL_FILE,
+        'feature_names': pipeline.feature_names,
+        'vocabularies': pipeline.vocabularies,
+        'num_cols': list(NUM_COLS),
+        'scaler_mean': pipeline.mean.tolist(),
+        'scaler_scale': pipeline.scale.tolist(),
+        'unknown_codes': pipeline.unknown_codes,
+        'fill_values': pipeline.fill_values,
+        'schema_hash': schema_hash(pipeline.feature_names, pipeline.vocabularies, NUM_COLS,
+                                   pipeline.unknown_codes, pipeline.fill_values)
+    }
+
+    bundle_dir = os.path.normpath(os.fspath(bundle_dir))
+    parent, name = os.path.split(bundle_dir)
+    os.makedirs(parent or '.', exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f'.{name}.staging-', dir=parent or '.')
+    try:
+        joblib.dump(model, os.path.join(staging, MODEL_FILE))
+        
+        # XGBoost models also ship their raw booster for native serving
+        if is_xgboost_model(model):
+            export_booster(model, os.path.join(staging, BOOSTER_FILE))
+            manifest['booster_file'] = BOOSTER_FILE
+        
+        # sklearn tree models ship packed node arrays for the NumPy evaluator
+        if is_tree_model(model):
+            TreeEnsembleScorer.from_model(model).save(os.path.join(staging, TREES_FILE))
+            manifest['trees_file'] = TREES_FILE
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.chmod(staging, 0o755)
+        replace_dir(staging, bundle_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    return manifest
+
+
+def replace_dir(src, dst):
+    """Move directory src to dst, replacing any existing dst
+
+    rename() only replaces an empty directory, so an existing dst is first
+    renamed aside; readers can see no dst for that instant, never a mix.
+    """
+    try:
+        os.replace(src, dst)
+        return
+    except OSError:
+        if not os.path.isdir(dst):
+            raise
+    parent, name = os.path.split(dst)
+    old = tempfile.mkdtemp(prefix=f'.{name}.old-', dir=parent or '.')
+    os.replace(dst, os.path.join(old, name))
+    os.replace(src, dst)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def read_manifest(bundle_dir=DEFAULT_BUNDLE_DIR):
+    """Read and validate a bundle manifest"""
+    path = os.path.join(bundle_dir, MANIFEST_FILE)
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise BundleNotFound(f"No bundle manifest at {path}")
+    except json.JSONDecodeError as e:
+        raise BundleError(f"Corrupt bundle manifest {path}: {e}")
+
+    if manifest.get('format_version') == 1:
+        # Format 1 has no unknown_codes: unseen labels would silently encode as -1
+        raise BundleError(f"Bundle format 1 at {path} predates unknown_codes; "
+                          "rebuild it with python src/bundle.py or train_pipeline.py")
+    if manifest.get('format_version') == 2:
+        # Format 2 has no fill_values: blank TotalCharges would reach the model as NaN
+        raise BundleError(f"Bundle format 2 at {path} predates fill_values; "
+                          "rebuild it with python src/bundle.py or train_pipeline.py")
+    if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+        raise BundleError(f"Unsupported bundle format {manifest.get('format_version')!r} "
+                          f"(expected {BUNDLE_FORMAT_VERSION})")
+
+    if list(manifest['num_cols']) != list(NUM_COLS):
+        raise BundleError(f"Bundle scales {manifest['num_cols']}, this code expects {NUM_COLS}")
+
+    expected = schema_hash(manifest['feature_names'], manifest['vocabularies'], manifest['num_cols'],
+                           manifest['unknown_codes'], manifest['fill_values'])
+    if manifest['schema_hash'] != expected:
+        raise BundleError(f"Schema hash mismatch in {path}: manifest says "
+                          f"{manifest['schema_hash'][:12]}, contents hash to {expected[:12]}")
+
+    return manifest
+
+
+def load_model_file(bundle_dir, manifest, backend, nthread):
+    """The bundle's model for one backend ('auto' resolved); returns (model, backend)"""
+    if backend not in ('auto', 'sklearn', *NATIVE_BACKENDS):
+        raise BundleError(f"Unknown backend: {backend!r}")
+    
+    if backend == 'auto':
+        available = [name for name, (key, _) in NATIVE_BACKENDS.items() if key in manifest]
+        backend = available[0] if available else 'sklearn'
+    
+    if backend == 'sklearn':
+        model_path = os.path.join(bundle_dir, manifest['model_file'])
+        try:
+            return joblib.load(model_path), backend
+        except FileNotFoundError:
+            raise BundleError(f"Bundle model file missing: {model_path}")
+    
+    key, loader = NATIVE_BACKENDS[backend]
+    if key not in manifest:
+        raise BundleError(f"Bundle {manifest['bundle_version']} has no {backend} export")
+    model_path = os.path.join(bundle_dir, manifest[key])
+    if not os.path.exists(model_path):
+        raise BundleError(f"Bundle {backend} file missing: {model_path}")
+    return loader(model_path, nthread), backend
+
+
+def load_bundle(bundle_dir=DEFAULT_BUNDLE_DIR, backend='auto', nthread=None, attempts=3):
+    """Load a bundle and rebuild its inference pipeline
+    
+    Args:
+        bundle_dir: Directory written by save_bundle
+        backend: 'sklearn' for the pickled estimator, 'booster' for the raw
+            XGBoost booster, 'trees' for compiled sklearn trees, 'auto' to
+            prefer whichever native backend the bundle has
+        nthread: Prediction threads for the booster backend
+        attempts: Loads tried when save_bundle replaces the bundle meanwhile
+    """
+    for _ in range(attempts):
+        manifest = read_manifest(bundle_dir)
+        try:
+            model, loaded_backend = load_model_file(bundle_dir, manifest, backend, nthread)
+        except BundleError:
+            # A file missing because the bundle was replaced meanwhile is retried
+            if read_manifest(bundle_dir) == manifest:
+                raise
+            continue
+        # The model file must come from the same bundle as the manifest
+        if read_manifest(bundle_dir) == manifest:
+            break
+    else:
+        raise BundleError(f"Bundle at {bundle_dir} kept changing while it was loaded")
+
+    pipeline = CompiledFeaturePipeline(
+        feature_names=manifest['feature_names'],
+        vocabularies=manifest['vocabularies'],
+        scaler_mean=manifest['scaler_mean'],
+        scaler_scale=manifest['scaler_scale'],
+        unknown_codes=manifest['unknown_codes'],
+        fill_values=manifest['fill_values']
+    )
+    
+    n_features = getattr(model, 'n_features_in_', len(pipeline.feature_names))
+    if n_features != len(pipeline.feature_names):
+        raise BundleError(f"Model expects {n_features} features, "
+                          f"bundle schema has {len(pipeline.feature_names)}")
+
+    return ModelBundle(model, pipeline, manifest, backend=loaded_backend)
+
+
+def load_legacy_pickles(model_path='models/best_model.pkl',
+                        engineer_path='models/feature_engineer.pkl'):
+    """Build a ModelBundle from the older best_model.pkl + feature_engineer.pkl pair"""
+    model = joblib.load(model_path)
+    engineer = joblib.load(engineer_path)
+    pipeline = CompiledFeaturePipeline.from_engineer(engineer)
+    manifest = {
+        'bundle_version': 'legacy',
+        'model_type': type(model).__name__,
+        'schema_hash': schema_hash(pipeline.feature_names, pipeline.vocabularies, NUM_COLS,
+                                   pipeline.unknown_codes, pipeline.fill_values)
+    }
+    return ModelBundle(model, pipeline, manifest)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert the legacy pickles into a bundle")
+    parser.add_argument('--data', help="Training CSV, to recover unknown_codes and fill_values "
+                                       "for engineers pickled before they existed")
+    args = parser.parse_args()
+    
+    model = joblib.load('models/best_model.pkl')
+    engineer = joblib.load('models/feature_engineer.pkl')
+    if args.data:
+        df = engineer.create_business_features(engineer.load_data(args.data))
+        print(f"✓ Fallback codes recovered: {engineer.fit_unknown_codes(df)}")
+        print(f"✓ Fill values recovered: {engineer.fit_fill_values(df)}")
+    manifest = save_bundle(model, engineer)
+    print(f"✓ Bundle {manifest['bundle_version']} written to {DEFAULT_BUNDLE_DIR}")
+    print(f"  Schema hash: {manifest['schema_hash']}")
@@ -8,6 +8,13 @@ import numpy as np
 class BusinessImpactCalculator:
     """Calculate business metrics from churn predictions"""
     
+    # Label lookup tables for the vectorized methods (indexed by np.select codes)
+    RISK_TIERS = np.array(["Critical Risk", "Medium Risk", "Low Risk"], dtype=object)
+    ACTIONS = np.array(["Immediate personal outreach + premium retention offer",
+                        "Automated retention campaign + discount offer",
+                        "Proactive engagement + service upgrade offer",
+                        "Standard engagement + loyalty program"], dtype=object)
+    
     def __init__(self, avg_revenue_per_customer=70, 
                  retention_campaign_cost=10,
                  retention_success_rate=0.3):
@@ -41,6 +48,34 @@ class BusinessImpactCalculator:
         return monthly_charges * expected_remaining_months
 
     
+    def calculate_risk_scores(self, churn_probabilities):
+        """Vectorized calculate_risk_score over an array of probabilities"""
+        return (np.asarray(churn_probabilities, dtype=np.float64) * 100).astype(int)
+    
+    def assign_risk_tiers(self, churn_probabilities):
+        """Vectorized assign_risk_tier over an array of probabilities"""
+        probs = np.asarray(churn_probabilities, dtype=np.float64)
+        codes = np.select([probs >= 0.7, probs >= 0.4], [0, 1], default=2)
+        return self.RISK_TIERS[codes]
+    
+    def calculate_customer_lifetime_values(self, monthly_charges, tenure):
+        """Vectorized calculate_customer_lifetime_value over arrays"""
+        expected_remaining_months = np.maximum(24 - np.asarray(tenure), 12)
+        return np.asarray(monthly_charges) * expected_remaining_months
+    
+    def recommend_actions(self, churn_probabilities, customer_values=None):
+        """Vectorized recommend_action over arrays of probabilities and values"""
+        probs = np.asarray(churn_probabilities, dtype=np.float64)
+        critical = probs >= 0.7
+        if customer_values is None:
+            high_value = np.zeros(len(probs), dtype=bool)
+        else:
+            high_value = np.asarray(customer_values, dtype=np.float64) > 2000
+        
+        codes = np.select([critical & high_value, critical, probs >= 0.4], [0, 1, 2], default=3)
+        return self.ACTIONS[codes]
+
+    
     def calculate_revenue_at_risk(self, df_with_predictions):
         """Calculate total revenue at risk from predicted churners"""
         high_risk = df_with_predictions[df_with_predictions['churn_probability'] >= 0.5]
@@ -54,20 +89,13 @@ class BusinessImpactCalculator:
         
         return revenue_at_risk
     
-    def calculate_intervention_roi(self, df_with_predictions, top_n=None):
-        """Calculate ROI of retention intervention"""
-        
-        # Sort by churn probability
-        df_sorted = df_with_predictions.sort_values('churn_probability', ascending=False)
-        
-        if top_n:
-            df_sorted = df_sorted.head(top_n)
-        else:
-            # Target high-risk customers (probability >= 0.5)
-            df_sorted = df_sorted[df_sorted['churn_probability'] >= 0.5]
-        
-        n_customers = len(df_sorted)
+    def intervention_metrics(self, n_customers, monthly_charges_sum=None):
+        """ROI figures for a targeted set of n_customers
         
+        Args:
+            n_customers: Number of customers targeted
+            monthly_charges_sum: Their total MonthlyCharges, or None to use the average revenue
+        """
         if n_customers == 0:
             return {
                 'customers_targeted': 0,
@@ -80,8 +108,8 @@ class BusinessImpactCalculator:
         # Calculate costs and benefits
         intervention_cost = n_customers * self.campaign_cost
         
-        if 'MonthlyCharges' in df_sorted.columns:
-            potential_revenue = df_sorted['MonthlyCharges'].sum() * 12
+        if monthly_charges_sum is not None:
+            potential_revenue = monthly_charges_sum * 12
         else:
             potential_revenue = n_customers * self.avg_revenue * 12
         
@@ -96,13 +124,61 @@ class BusinessImpactCalculator:
             'net_benefit': net_benefit,
             'roi_percentage': roi_percentage
         }
+    
+    def calculate_intervention_roi(self, df_with_predictions, top_n=None):
+        """Calculate ROI of retention intervention"""
+        probs = df_with_predictions['churn_probability'].to_numpy()
+        
+        if top_n:
+            # Partial selection of the top_n probabilities, no full sort
+            if top_n < len(probs):
+                targeted = np.argpartition(-probs, top_n - 1)[:top_n]
+            else:
+                targeted = np.arange(len(probs))
+        else:
+            # Target high-risk customers (probability >= 0.5)
+            targeted = np.flatnonzero(probs >= 0.5)
+        
+        if 'MonthlyCharges' in df_with_predictions.columns:
+            # Blank charges add nothing, like pandas' Series.sum()
+            charges_sum = np.nansum(df_with_predictions['MonthlyCharges'].to_numpy(dtype=np.float64)[targeted])
+        else:
+            charges_sum = None
+        
+        return self.intervention_metrics(len(targeted), charges_sum)
 
     
+    def score_customers(self, df_with_predictions):
+        """Copy of the frame with risk_score and risk_tier columns"""
+        df = df_with_predictions.copy()
+        df['risk_score'] = self.calculate_risk_scores(df['churn_probability'])
+        df['risk_tier'] = self.assign_risk_tiers(df['churn_probability'])
+        return df
+    
+    def customer_results(self, df_with_predictions, row_offset=0):
+        """Per-customer scores, tiers and recommended actions
+        
+        Rows are identified by customerID, or by their position in the input
+        (starting at row_offset) when the frame has no customerID column.
+        """
+        df = df_with_predictions
+        probs = df['churn_probability'].to_numpy()
+        customer_values = self.calculate_customer_lifetime_values(
+            df['MonthlyCharges'].to_numpy(dtype=np.float64), df['tenure'].to_numpy(dtype=np.float64)
+        )
+        
+        return pd.DataFrame({
+            'customerID': (df['customerID'].to_numpy() if 'customerID' in df.columns
+                           else np.arange(row_offset, row_offset + len(df))),
+            'churn_probability': probs,
+            'risk_score': self.calculate_risk_scores(probs),
+            'risk_tier': self.assign_risk_tiers(probs),
+            'recommended_action': self.recommend_actions(probs, customer_values)
+        })
+    
     def segment_customers(self, df_with_predictions):
         """Segment customers by risk tier"""
-        df = df_with_predictions.copy()
-        df['risk_score'] = df['churn_probability'].apply(self.calculate_risk_score)
-        df['risk_tier'] = df['churn_probability'].apply(self.assign_risk_tier)
+        df = self.score_customers(df_with_predictions)
         
         # Summary by tier
         summary = df.groupby('risk_tier').agg({
@@ -129,23 +205,134 @@ class BusinessImpactCalculator:
     def generate_business_report(self, df_with_predictions, top_n=500):
         """Generate comprehensive business impact report"""
         
-        # Segment customers
-        df_segmented, tier_summary = self.segment_customers(df_with_predictions)
+        # Risk columns for every customer
+        df_segmented = self.score_customers(df_with_predictions)
+        
+        # Tier counts, revenue at risk and top-N ROI in one pass
+        accumulator = BusinessReportAccumulator(self, top_n=top_n)
+        accumulator.update(df_segmented)
+        report = accumulator.result()
+        
+        return report, df_segmented
+
+
+class BusinessReportAccumulator:
+    """Running aggregates for generate_business_report over streamed chunks
+
+    Memory stays bounded by top_n: only tier totals, revenue sums and the
+    current top-N candidates are kept between chunks.
+    """
+    
+    TIERS = ["Critical Risk", "Low Risk", "Medium Risk"]
+    
+    def __init__(self, calculator, top_n=500):
+        self.calc = calculator
+        self.top_n = top_n
+        self.total_customers = 0
+        self.has_charges = None
+        
+        # Per-tier count, probability sum and MonthlyCharges sum
+        self.tier_count = dict.fromkeys(self.TIERS, 0)
+        self.tier_prob_sum = dict.fromkeys(self.TIERS, 0.0)
+        self.tier_charges_sum = dict.fromkeys(self.TIERS, 0.0)
+        
+        # Customers with churn_probability >= 0.5
+        self.at_risk_count = 0
+        self.at_risk_charges = 0.0
+        
+        # Current top-N candidates by churn probability
+        self.top_probs = np.empty(0)
+        self.top_charges = np.empty(0)
+    
+    def update(self, df_with_predictions):
+        """Fold one scored chunk into the running totals"""
+        probs = df_with_predictions['churn_probability'].to_numpy(dtype=np.float64)
+        if self.has_charges is None:
+            self.has_charges = 'MonthlyCharges' in df_with_predictions.columns
+        if self.has_charges:
+            # Blank charges count as 0 in every sum, like pandas' Series.sum()
+            charges = np.nan_to_num(df_with_predictions['MonthlyCharges'].to_numpy(dtype=np.float64))
+        else:
+            charges = np.zeros(len(probs))
+        
+        self.total_customers += len(probs)
+        
+        # Tier codes: 0 = Low, 1 = Medium, 2 = Critical
+        codes = (probs >= 0.4).astype(np.intp) + (probs >= 0.7)
+        counts = np.bincount(codes, minlength=3)
+        prob_sums = np.bincount(codes, weights=probs, minlength=3)
+        charges_sums = np.bincount(codes, weights=charges, minlength=3)
+        for code, tier in enumerate(["Low Risk", "Medium Risk", "Critical Risk"]):
+            self.tier_count[tier] += int(counts[code])
+            self.tier_prob_sum[tier] += float(prob_sums[code])
+            self.tier_charges_sum[tier] += float(charges_sums[code])
+        
+        at_risk = probs >= 0.5
+        self.at_risk_count += int(at_risk.sum())
+        self.at_risk_charges += float(charges[at_risk].sum())
+        
+        if self.top_n:
+            self._keep_top(np.concatenate([self.top_probs, probs]),
+                           np.concatenate([self.top_charges, charges]))
+    
+    def merge(self, other):
+        """Fold another accumulator (e.g. from a parallel shard) into this one"""
+        if other.has_charges is None:
+            return self
+        if self.has_charges is None:
+            self.has_charges = other.has_charges
+        
+        self.total_customers += other.total_customers
+        for tier in self.TIERS:
+            self.tier_count[tier] += other.tier_count[tier]
+            self.tier_prob_sum[tier] += other.tier_prob_sum[tier]
+            self.tier_charges_sum[tier] += other.tier_charges_sum[tier]
+        self.at_risk_count += other.at_risk_count
+        self.at_risk_charges += other.at_risk_charges
+        
+        if self.top_n:
+            self._keep_top(np.concatenate([self.top_probs, other.top_probs]),
+                           np.concatenate([self.top_charges, other.top_charges]))
+        return self
+    
+    def _keep_top(self, probs, charges):
+        if len(probs) > self.top_n:
+            idx = np.argpartition(-probs, self.top_n - 1)[:self.top_n]
+            probs, charges = probs[idx], charges[idx]
+        self.top_probs, self.top_charges = probs, charges
+    
+    def tier_summary(self):
+        """Tier summary table shaped like segment_customers' groupby output"""
+        tiers = [tier for tier in self.TIERS if self.tier_count[tier] > 0]
+        data = {
+            ('churn_probability', 'count'): [self.tier_count[t] for t in tiers],
+            ('churn_probability', 'mean'): [self.tier_prob_sum[t] / self.tier_count[t] for t in tiers]
+        }
+        if self.has_charges:
+            data[('MonthlyCharges', 'sum')] = [self.tier_charges_sum[t] for t in tiers]
+        summary = pd.DataFrame(data, index=pd.Index(tiers, name='risk_tier'))
+        return summary.round(2)
+    
+    def result(self):
+        """Report dict with the same keys as generate_business_report"""
+        if self.has_charges:
+            total_revenue_at_risk = self.at_risk_charges * 12
+        else:
+            total_revenue_at_risk = self.at_risk_count * self.calc.avg_revenue * 12
         
-        # Calculate metrics
-        total_revenue_at_risk = self.calculate_revenue_at_risk(df_segmented)
-        roi_metrics = self.calculate_intervention_roi(df_segmented, top_n=top_n)
+        if self.top_n:
+            n_targeted, charges_sum = len(self.top_probs), np.nansum(self.top_charges)
+        else:
+            n_targeted, charges_sum = self.at_risk_count, self.at_risk_charges
+        roi_metrics = self.calc.intervention_metrics(
+            n_targeted, charges_sum if self.has_charges else None
+        )
         
-        report = {
-            'total_customers': len(df_segmented),
-            'high_risk_customers': len(df_segmented[df_segmented['churn_probability'] >= 0.7]),
-            'medium_risk_customers': len(df_segmented[
-                (df_segmented['churn_probability'] >= 0.4) & 
-                (df_segmented['churn_probability'] < 0.7)
-            ]),
+        return {
+            'total_customers': self.total_customers,
+            'high_risk_customers': self.tier_count["Critical Risk"],
+            'medium_risk_customers': self.tier_count["Medium Risk"],
             'total_revenue_at_risk': total_revenue_at_risk,
             'intervention_plan': roi_metrics,
-            'tier_summary': tier_summary
+            'tier_summary': self.tier_summary()
         }
-        
-        return report, df_segmented
@@ -0,0 +1,122 @@
+"""
+Prediction Result Cache
+In-process LRU/TTL cache for repeated single-customer predictions
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_customer(customer):
+    """Canonical form of a raw customer record for hashing
+
+    Only numeric spellings are folded; strings are kept verbatim because
+    the pipeline encodes them as-is (" Two year" is an unseen label).
+    """
+    normalized = {}
+    for key, value in customer.items():
+        if isinstance(value, bool):
+            value = int(value)
+        elif isinstance(value, (int, float)):
+            # 12 and 12.0 describe the same customer
+            value = float(value)
+        normalized[key] = value
+    return normalized
+
+
+def cache_key(customer, model_version):
+    """Stable hash of the normalized customer plus the model version"""
+    payload = json.dumps({'model': model_version, 'customer': normalize_customer(customer)},
+                         sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PredictionCache:
+    """Thread-safe LRU cache with per-entry time-to-live"""
+
+    def __init__(self, maxsize=10000, ttl_seconds=3600, model_version=None):
+        """
+        Args:
+            maxsize: Entries kept before the least recently used is evicted
+            ttl_seconds: Entry lifetime (None keeps entries until evicted)
+            model_version: Version the cached predictions belong to
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl_seconds
+        self.model_version = model_version
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def key(self, customer, model_version=None):
+        return cache_key(customer, model_version or self.model_version)
+
+    def get(self, customer, model_version=None):
+        """Cached prediction for a customer, or None"""
+        key = self.key(customer, model_version)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, customer, value, model_version=None):
+        """Store a prediction, evicting the least recently used entry if full
+
+        A prediction made by a model other than the current one (a request
+        that was in flight during a reload) is not stored.
+        """
+        key = self.key(customer, model_version)
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self.lock:
+            if model_version is not None and model_version != self.model_version:
+                return
+            self.entries[key] = (value, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def set_model_version(self, model_version):
+        """Drop every entry when the serving model changes"""
+        with self.lock:
+            if model_version != self.model_version:
+                self.model_version = model_version
+                self.entries.clear()
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop every entry (e.g. a reload that kept the same version string)"""
+        with self.lock:
+            self.entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        """Size, eviction and hit-rate metrics"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'model_version': self.model_version,
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
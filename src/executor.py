@@ -0,0 +1,87 @@
+"""
+Bounded CPU Executor
+Thread pool with admission control for async request handlers
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+
+class ExecutorSaturated(Exception):
+    """Raised when an executor already has max_pending jobs admitted"""
+
+
+class BoundedExecutor:
+    """Runs blocking work off the event loop, refusing work past a limit
+
+    Jobs are admitted up to max_pending (running plus queued); beyond that
+    callers get ExecutorSaturated immediately instead of queueing without
+    bound, which the API turns into a 429.
+    """
+
+    def __init__(self, max_workers, max_pending, name='cpu'):
+        """
+        Args:
+            max_workers: Threads doing the blocking work
+            max_pending: Jobs admitted at once (running + waiting for a thread)
+            name: Thread name prefix and label in stats
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.max_seen = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def try_acquire(self):
+        """Admit one job, or return False when saturated"""
+        with self.lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                return False
+            self.pending += 1
+            self.max_seen = max(self.max_seen, self.pending)
+            return True
+
+    def release(self):
+        with self.lock:
+            self.pending -= 1
+            self.completed += 1
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one admission slot, e.g. across a streamed response"""
+        if not self.try_acquire():
+            raise ExecutorSaturated(f"{self.name} executor saturated ({self.max_pending} jobs pending)")
+        try:
+            yield self
+        finally:
+            self.release()
+
+    async def submit(self, fn, *args):
+        """Run fn on the pool without admission control (caller holds a slot)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, fn, *args)
+
+    async def run(self, fn, *args):
+        """Admit, run fn on the pool and await its result"""
+        async with self.slot():
+            return await self.submit(fn, *args)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'pending': self.pending,
+                'max_pending_seen': self.max_seen,
+                'completed': self.completed,
+                'rejected': self.rejected
+            }
+
+    def close(self):
+        self.pool.shutdown(wait=True)
@@ -7,6 +7,17 @@ import numpy as np
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.model_selection import train_test_split
 
+from schema import (SERVICE_COLS, BINARY_COLS, MULTI_COLS, FILL_COLS,
+                    NUM_COLS, TENURE_BINS, TENURE_LABELS, read_customers)
+from inference import UNKNOWN_CODE, CompiledFeaturePipeline, binary_values, category_codes
+
+
+def most_frequent(codes):
+    """Most common non-negative code (fallback for unseen labels)"""
+    codes = codes[codes >= 0]
+    return int(np.bincount(codes).argmax()) if len(codes) else UNKNOWN_CODE
+
+
 class ChurnFeatureEngineer:
     """Feature engineering pipeline with business-driven features"""
     
@@ -17,14 +28,12 @@ class ChurnFeatureEngineer:
         
     def load_data(self, filepath):
         """Load and perform initial cleaning"""
-        df = pd.read_csv(filepath)
-        
-        # Handle TotalCharges - convert to numeric
-        df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce')
-        df['TotalCharges'].fillna(df['TotalCharges'].median(), inplace=True)
+        # Declared dtypes: blank TotalCharges are already parsed as NaN
+        df = read_customers(filepath)
+        df['TotalCharges'] = df['TotalCharges'].fillna(df['TotalCharges'].median())
         
         # Convert target to binary
-        df['Churn'] = df['Churn'].map({'Yes': 1, 'No': 0})
+        df['Churn'] = df['Churn'].astype(object).map({'Yes': 1, 'No': 0})
         
         return df
     
@@ -34,16 +43,12 @@ class ChurnFeatureEngineer:
         
         # 1. Tenure buckets - customer lifecycle stage
         df['tenure_bucket'] = pd.cut(df['tenure'], 
-                                      bins=[0, 12, 36, 72],
-                                      labels=['new', 'mid', 'loyal'])
+                                      bins=TENURE_BINS,
+                                      labels=TENURE_LABELS)
         
         # 2. Monthly charge per service ratio
-        service_cols = ['PhoneService', 'InternetService', 'OnlineSecurity', 
-                       'OnlineBackup', 'DeviceProtection', 'TechSupport', 
-                       'StreamingTV', 'StreamingMovies']
-        
         df['total_services'] = 0
-        for col in service_cols:
+        for col in SERVICE_COLS:
             if col in df.columns:
                 df['total_services'] += (df[col] == 'Yes').astype(int)
         
@@ -59,32 +64,67 @@ class ChurnFeatureEngineer:
         return df
     
     def encode_features(self, df, fit=True):
-        """Encode categorical variables"""
-        df = df.copy()
+        """Encode categorical variables
+        
+        Every categorical column is coded through a fixed vocabulary in one
+        vectorized pass (same codes as LabelEncoder on astype(str)). Labels
+        not seen during fit get the column's most frequent training code.
+        """
+        if fit:
+            self.unknown_codes = {}
+        unknown_codes = getattr(self, 'unknown_codes', {})
+        encoded = {}
         
         # Binary encoding
-        binary_cols = ['gender', 'Partner', 'Dependents', 'PhoneService', 
-                      'PaperlessBilling']
-        for col in binary_cols:
+        for col in BINARY_COLS:
             if col in df.columns:
-                df[col] = df[col].map({'Yes': 1, 'No': 0, 'Male': 1, 'Female': 0})
+                values = binary_values(df[col])
+                if fit:
+                    self.unknown_codes[col] = most_frequent(values)
+                encoded[col] = np.where(values >= 0, values,
+                                        unknown_codes.get(col, UNKNOWN_CODE))
         
         # Multi-class encoding
-        multi_cols = ['InternetService', 'Contract', 'PaymentMethod', 
-                     'OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
-                     'TechSupport', 'StreamingTV', 'StreamingMovies', 
-                     'MultipleLines', 'tenure_bucket']
-        
-        for col in multi_cols:
+        for col in MULTI_COLS:
             if col in df.columns:
                 if fit:
-                    self.label_encoders[col] = LabelEncoder()
-                    df[col] = self.label_encoders[col].fit_transform(df[col].astype(str))
-                else:
-                    df[col] = self.label_encoders[col].transform(df[col].astype(str))
+                    labels = sorted(pd.unique(df[col].astype(str)))
+                    self.label_encoders[col] = LabelEncoder().fit(labels)
+                labels = list(self.label_encoders[col].classes_)
+                codes = category_codes(df[col], labels, unknown_codes.get(col, UNKNOWN_CODE))
+                if fit:
+                    self.unknown_codes[col] = most_frequent(codes)
+                encoded[col] = codes
         
+        # Shallow copy: only the replaced columns get new arrays
+        df = df.copy(deep=False)
+        for col, values in encoded.items():
+            df[col] = values
         return df
     
+    def fit_unknown_codes(self, df):
+        """Fit only the fallback codes for unseen labels, keeping the vocabularies
+        
+        For engineers pickled before encode_features stored unknown_codes;
+        df is their training data after create_business_features.
+        """
+        self.unknown_codes = {}
+        encoded = self.encode_features(df, fit=False)
+        self.unknown_codes = {col: most_frequent(encoded[col].to_numpy())
+                              for col in BINARY_COLS + MULTI_COLS if col in encoded.columns}
+        return self.unknown_codes
+    
+    def fit_fill_values(self, df):
+        """Training medians that fill missing FILL_COLS values at serving time
+        
+        Called by prepare_features(fit=True); also recovers them for engineers
+        pickled before fill_values existed. Median filling in load_data leaves
+        the median unchanged, so df may be raw or already filled.
+        """
+        # Rounded to the column dtype, as fillna stores it in a float32 column
+        self.fill_values = {col: float(df[col].dtype.type(df[col].median())) for col in FILL_COLS}
+        return self.fill_values
+    
     def prepare_features(self, df, target_col='Churn', fit=True):
         """Complete feature preparation pipeline"""
         # Drop customerID
@@ -99,14 +139,17 @@ class ChurnFeatureEngineer:
             X = df
             y = None
         
-        # Scale numerical features
-        num_cols = ['tenure', 'MonthlyCharges', 'TotalCharges', 
-                   'total_services', 'charge_per_service', 'customer_value']
+        # Blank numerics get the training median, as load_data filled them
+        if fit:
+            self.fit_fill_values(X)
+        for col, value in getattr(self, 'fill_values', {}).items():
+            X[col] = X[col].fillna(value)
         
+        # Scale numerical features
         if fit:
-            X[num_cols] = self.scaler.fit_transform(X[num_cols])
+            X[NUM_COLS] = self.scaler.fit_transform(X[NUM_COLS])
         else:
-            X[num_cols] = self.scaler.transform(X[num_cols])
+            X[NUM_COLS] = self.scaler.transform(X[NUM_COLS])
         
         self.feature_names = X.columns.tolist()
         
@@ -128,20 +171,24 @@ def prepare_data_pipeline(filepath, test_size=0.2):
     engineer = ChurnFeatureEngineer()
     
     # Load data
-    df = engineer.load_data(filepath)
-    print(f"✓ Data loaded: {df.shape}")
+    raw = engineer.load_data(filepath)
+    print(f"✓ Data loaded: {raw.shape}")
     
     # Create business features
-    df = engineer.create_business_features(df)
+    df = engineer.create_business_features(raw)
     print(f"✓ Business features created")
     
-    # Encode features
+    # Encode features (fits the vocabularies)
     df = engineer.encode_features(df, fit=True)
     print(f"✓ Features encoded")
     
-    # Prepare features
-    X, y = engineer.prepare_features(df, fit=True)
-    print(f"✓ Features prepared: {X.shape}")
+    # Prepare features (fits the scaler)
+    engineer.prepare_features(df, fit=True)
+    
+    # Fused transform: raw columns -> one float32 matrix in model order
+    X = CompiledFeaturePipeline.from_engineer(engineer).transform_frame(raw)
+    y = raw['Churn']
+    print(f"✓ Features prepared: {X.shape} {X.dtype}")
     
     # Split data
     X_train, X_test, y_train, y_test = engineer.split_data(X, y, test_size)
@@ -0,0 +1,108 @@
+"""
+Incremental Retraining
+Add a new data extract to a trained model: continued training, online scaler update for linear models
+"""
+import copy
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from backends import is_xgboost_model
+from schema import NUM_COLS
+
+# Trees added per refresh
+DEFAULT_XGB_ROUNDS = 50
+DEFAULT_RF_TREES = 50
+
+# Largest AUC drop on the new extract's holdout that still replaces the model
+DEFAULT_MAX_AUC_DROP = 0.005
+
+
+def numeric_features(engineer, df):
+    """Raw (unscaled) NUM_COLS of a customer frame"""
+    return engineer.create_business_features(df)[NUM_COLS]
+
+
+def update_scaler(engineer, df):
+    """Copy of the engineer with its scaler statistics updated by df's numeric features
+
+    Vocabularies stay fixed: the model has no codes for labels it was
+    never trained on, which keep mapping to each column's fallback code.
+    """
+    engineer = copy.deepcopy(engineer)
+    engineer.scaler.partial_fit(numeric_features(engineer, df))
+    return engineer
+
+
+def scaling_shift(old_scaler, new_scaler, feature_names):
+    """Feature indices and (a, b) with old_scaled = a * new_scaled + b for NUM_COLS"""
+    index = [feature_names.index(col) for col in NUM_COLS]
+    a = new_scaler.scale_ / old_scaler.scale_
+    b = (new_scaler.mean_ - old_scaler.mean_) / old_scaler.scale_
+    return index, a, b
+
+
+def rescale_model(model, old_scaler, new_scaler, feature_names):
+    """Copy of a LogisticRegression for features scaled by new_scaler
+
+    The two scalings are an affine function of each other, so the
+    coefficients and intercept move exactly; predictions differ only by
+    the rounding of the float32 features (about 1e-7 relative).
+    """
+    if not isinstance(model, LogisticRegression):
+        raise ValueError(f"Only linear models are rescaled, not a {type(model).__name__}")
+    index, a, b = scaling_shift(old_scaler, new_scaler, feature_names)
+    model = copy.deepcopy(model)
+    model.intercept_ = model.intercept_ + model.coef_[:, index] @ b
+    model.coef_[:, index] *= a
+    return model
+
+
+def prepare_update(model, engineer, df):
+    """Copies of the model and engineer to train further on df
+
+    A LogisticRegression gets the scaler updated with df and its
+    coefficients moved to the new scaling. Tree splits do not depend on a
+    monotone rescaling, so tree models keep the scaler they were trained
+    with and their thresholds are left as they are.
+    """
+    if isinstance(model, LogisticRegression):
+        updated = update_scaler(engineer, df)
+        return rescale_model(model, engineer.scaler, updated.scaler, engineer.feature_names), updated
+    return copy.deepcopy(model), engineer
+
+
+def check_incremental(model):
+    """Raise ValueError unless continue_training can extend this model"""
+    if not (is_xgboost_model(model) or isinstance(model, (RandomForestClassifier, LogisticRegression))):
+        raise ValueError(f"{type(model).__name__} cannot be trained incrementally; "
+                         "run the full training pipeline")
+
+
+def continue_training(model, X, y, xgb_rounds=DEFAULT_XGB_ROUNDS, rf_trees=DEFAULT_RF_TREES):
+    """Train a model (from prepare_update) further on new rows
+
+    XGBoost adds xgb_rounds boosting rounds on top of the existing booster
+    and a RandomForest adds rf_trees trees fitted on the new rows;
+    LogisticRegression refits starting from its current coefficients.
+    Decision trees cannot be extended and need a full retrain.
+    """
+    check_incremental(model)
+    if is_xgboost_model(model):
+        booster = model.get_booster()
+        model.set_params(n_estimators=xgb_rounds)
+        return model.fit(X, y, xgb_model=booster, verbose=False)
+    if isinstance(model, RandomForestClassifier):
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + rf_trees)
+        return model.fit(X, y)
+    # LogisticRegression: refit from the current coefficients
+    model.set_params(warm_start=True)
+    return model.fit(X, y)
+
+
+def model_size(model):
+    """Boosting rounds or trees, for logging"""
+    if is_xgboost_model(model):
+        return model.get_booster().num_boosted_rounds()
+    if isinstance(model, RandomForestClassifier):
+        return len(model.estimators_)
+    return None
@@ -0,0 +1,281 @@
+"""
+Compiled Inference Path
+Pandas-free per-row feature transform for low-latency scoring
+"""
+import warnings
+import numpy as np
+import pandas as pd
+
+from schema import (BINARY_COLS, BINARY_MAP, NUM_COLS, SERVICE_COLS,
+                    TENURE_BINS, TENURE_LABELS)
+
+
+def tenure_bucket(tenure):
+    """Scalar equivalent of pd.cut(tenure, TENURE_BINS).astype(str)"""
+    for lower, upper, label in zip(TENURE_BINS[:-1], TENURE_BINS[1:], TENURE_LABELS):
+        if lower < tenure <= upper:
+            return label
+    return 'nan'
+
+
+def tenure_buckets(tenure):
+    """Vectorized tenure_bucket over an array of tenures"""
+    tenure = np.asarray(tenure, dtype=np.float64)
+    conditions = [(tenure > lower) & (tenure <= upper)
+                  for lower, upper in zip(TENURE_BINS[:-1], TENURE_BINS[1:])]
+    return np.select(conditions, TENURE_LABELS, default='nan').astype(object)
+
+
+# Rows per block written by CompiledFeaturePipeline.transform_frame
+FRAME_BLOCK_ROWS = 131072
+
+# Binary columns as one code table: code -> BINARY_MAP value
+BINARY_LABELS = list(BINARY_MAP)
+BINARY_VALUES = np.array(list(BINARY_MAP.values()), dtype=np.int64)
+
+# Code for unseen labels when no fitted fallback is known
+UNKNOWN_CODE = -1
+
+# Model input matrices: exact for tree models and XGBoost, which score in float32
+FEATURE_DTYPE = np.float32
+
+
+def category_codes(values, labels, unknown=UNKNOWN_CODE):
+    """Vectorized LabelEncoder.transform(values.astype(str)) over a fixed vocabulary
+
+    Labels outside the vocabulary get the `unknown` code instead of raising.
+    Missing values map to the 'nan' label when the vocabulary has one, as
+    astype(str) would, and to `unknown` otherwise.
+    """
+    values = values if isinstance(values, pd.Series) else pd.Series(values)
+    if not (values.dtype == object or isinstance(values.dtype, pd.CategoricalDtype)):
+        values = values.astype(str)
+    codes = pd.Categorical(values, categories=labels).codes.astype(np.int64)
+
+    missing = codes < 0
+    if missing.any():
+        if 'nan' in labels:
+            codes[missing & values.isna().to_numpy()] = labels.index('nan')
+        codes[codes < 0] = unknown
+    return codes
+
+
+def binary_values(values, unknown=UNKNOWN_CODE):
+    """Vectorized BINARY_MAP lookup with an `unknown` fallback"""
+    codes = category_codes(values, BINARY_LABELS)
+    return np.where(codes >= 0, BINARY_VALUES[codes], unknown)
+
+
+def predict_proba(model, X):
+    """Positive-class probabilities for a plain feature matrix"""
+    if len(X) == 0:
+        # sklearn refuses empty input; header-only uploads score to nothing
+        return np.empty(0, dtype=np.float64)
+    with warnings.catch_warnings():
+        # Models fitted on DataFrames warn when scored on bare arrays
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        return model.predict_proba(X)[:, 1]
+
+
+def score_frame(pipeline, model, df):
+    """Churn probabilities for a raw customer DataFrame"""
+    return predict_proba(model, pipeline.transform_frame(df))
+
+
+class CompiledFeaturePipeline:
+    """Feature transform compiled from a fitted ChurnFeatureEngineer
+
+    Fuses create_business_features, encode_features and prepare_features
+    into one pass that writes each feature straight into a single
+    contiguous matrix in model order, using only plain lookup tables and
+    scaler statistics. Values are computed in float64 and rounded once,
+    so the result equals the DataFrame pipeline's output cast to dtype.
+    """
+
+    def __init__(self, feature_names, vocabularies, scaler_mean, scaler_scale, unknown_codes=None,
+                 fill_values=None, dtype=FEATURE_DTYPE):
+        """
+        Args:
+            feature_names: Model input columns in order
+            vocabularies: {column: LabelEncoder.classes_} for each encoded column
+            scaler_mean: StandardScaler.mean_ in NUM_COLS order
+            scaler_scale: StandardScaler.scale_ in NUM_COLS order
+            unknown_codes: {column: code} used for unseen labels (default UNKNOWN_CODE)
+            fill_values: {column: training median} used for missing numerics
+            dtype: Output matrix dtype (float32, or float64 for the exact DataFrame values)
+        """
+        self.feature_names = list(feature_names)
+        self.vocabularies = {col: [str(label) for label in labels]
+                             for col, labels in vocabularies.items()}
+        self.unknown_codes = {col: int(code) for col, code in (unknown_codes or {}).items()}
+        self.fill_values = {col: float(value) for col, value in (fill_values or {}).items()}
+
+        # {label: code} lookup tables
+        self.code_tables = {
+            col: {label: code for code, label in enumerate(labels)}
+            for col, labels in self.vocabularies.items()
+        }
+
+        # Scaler statistics in feature order
+        self.num_idx = np.array([self.feature_names.index(col) for col in NUM_COLS])
+        self.mean = np.asarray(scaler_mean, dtype=np.float64)
+        self.scale = np.asarray(scaler_scale, dtype=np.float64)
+        self.scaling = {idx: (mean, scale)
+                        for idx, mean, scale in zip(self.num_idx, self.mean, self.scale)}
+        self.dtype = np.dtype(dtype)
+
+        # One (position, column, kind) step per output feature
+        self.steps = []
+        for idx, col in enumerate(self.feature_names):
+            if col in BINARY_COLS:
+                kind = 'binary'
+            elif col in self.code_tables:
+                kind = 'code'
+            else:
+                kind = 'raw'
+            self.steps.append((idx, col, kind))
+
+    @classmethod
+    def from_engineer(cls, engineer, dtype=FEATURE_DTYPE):
+        """Compile the lookup tables out of a fitted ChurnFeatureEngineer"""
+        return cls(
+            feature_names=engineer.get_feature_names(),
+            vocabularies={col: list(encoder.classes_)
+                          for col, encoder in engineer.label_encoders.items()},
+            scaler_mean=engineer.scaler.mean_,
+            scaler_scale=engineer.scaler.scale_,
+            # Engineers pickled before unseen-label fallbacks have none
+            unknown_codes=getattr(engineer, 'unknown_codes', None),
+            fill_values=getattr(engineer, 'fill_values', None),
+            dtype=dtype
+        )
+
+    def unknown_code(self, col):
+        return self.unknown_codes.get(col, UNKNOWN_CODE)
+
+    def encode(self, col, value):
+        """Look up the label code for one categorical value (fallback if unseen)"""
+        return self.code_tables[col].get(str(value), self.unknown_code(col))
+
+    def business_features(self, customer):
+        """Derived business features for one raw customer record"""
+        tenure = customer['tenure']
+        monthly_charges = customer['MonthlyCharges']
+        total_services = sum(customer.get(col) == 'Yes' for col in SERVICE_COLS)
+
+        return {
+            'tenure_bucket': tenure_bucket(tenure),
+            'total_services': total_services,
+            'charge_per_service': monthly_charges / (total_services + 1),
+            'customer_value': tenure * monthly_charges,
+            'has_premium': int(customer['OnlineSecurity'] == 'Yes' or
+                               customer['TechSupport'] == 'Yes')
+        }
+
+    def transform_row(self, customer):
+        """Turn one raw customer dict into a (1, n_features) feature vector"""
+        derived = self.business_features(customer)
+        row = np.empty(len(self.steps), dtype=np.float64)
+
+        for idx, col, kind in self.steps:
+            value = derived[col] if col in derived else customer[col]
+            if kind == 'binary':
+                value = BINARY_MAP.get(value, self.unknown_code(col))
+            elif kind == 'code':
+                value = self.encode(col, value)
+            elif col in self.fill_values and (value is None or value != value):
+                value = self.fill_values[col]
+            row[idx] = value
+
+        # Same operation order as StandardScaler.transform
+        row[self.num_idx] -= self.mean
+        row[self.num_idx] /= self.scale
+
+        return row.astype(self.dtype, copy=False).reshape(1, -1)
+
+    def labels(self, col):
+        return BINARY_LABELS if col in BINARY_COLS else self.vocabularies[col]
+
+    def frame_codes(self, df, col, cache):
+        """Raw label codes (-1 if unseen) for one column, hashed once per frame"""
+        if col not in cache:
+            cache[col] = category_codes(df[col], self.labels(col))
+        return cache[col]
+
+    def is_yes(self, df, col, cache):
+        """Vectorized df[col] == 'Yes' through the column's label codes"""
+        if col not in BINARY_COLS and col not in self.vocabularies:
+            return (df[col] == 'Yes').to_numpy()
+        labels = self.labels(col)
+        if 'Yes' not in labels:
+            return np.zeros(len(df), dtype=bool)
+        return self.frame_codes(df, col, cache) == labels.index('Yes')
+
+    def tenure_bucket_codes(self, tenure):
+        """Label codes of tenure_buckets(tenure) without building the strings"""
+        labels = self.vocabularies['tenure_bucket']
+        codes = [labels.index(label) if label in labels else -1 for label in TENURE_LABELS]
+        conditions = [(tenure > lower) & (tenure <= upper)
+                      for lower, upper in zip(TENURE_BINS[:-1], TENURE_BINS[1:])]
+        return np.select(conditions, codes, default=labels.index('nan') if 'nan' in labels else -1)
+
+    def business_feature_columns(self, df, cache):
+        """Vectorized business_features over a raw customer DataFrame"""
+        # float64 like the single-row path, whatever dtype the frame was read with
+        tenure = df['tenure'].to_numpy(dtype=np.float64)
+        monthly_charges = df['MonthlyCharges'].to_numpy(dtype=np.float64)
+        total_services = np.zeros(len(df), dtype=np.int64)
+        for col in SERVICE_COLS:
+            if col in df.columns:
+                total_services += self.is_yes(df, col, cache)
+
+        derived = {
+            'total_services': total_services,
+            'charge_per_service': monthly_charges / (total_services + 1),
+            'customer_value': tenure * monthly_charges,
+            'has_premium': (self.is_yes(df, 'OnlineSecurity', cache) |
+                            self.is_yes(df, 'TechSupport', cache)).astype(int)
+        }
+        if 'tenure_bucket' in self.vocabularies:
+            cache['tenure_bucket'] = self.tenure_bucket_codes(tenure)
+        else:
+            derived['tenure_bucket'] = tenure_buckets(tenure)
+        return derived
+
+    def fill_frame(self, df, out):
+        """Write the features of df into the preallocated rows of out"""
+        cache = {}
+        derived = self.business_feature_columns(df, cache)
+
+        for idx, col, kind in self.steps:
+            if kind == 'binary':
+                codes = self.frame_codes(df, col, cache)
+                values = np.where(codes >= 0, BINARY_VALUES[codes], self.unknown_code(col))
+            elif kind == 'code':
+                codes = self.frame_codes(df, col, cache)
+                values = np.where(codes >= 0, codes, self.unknown_code(col))
+            else:
+                values = derived[col] if col in derived else df[col]
+                if col in self.fill_values:
+                    values = np.asarray(values, dtype=np.float64)
+                    values = np.where(np.isnan(values), self.fill_values[col], values)
+                if idx in self.scaling:
+                    # Same operations as StandardScaler.transform, in float64
+                    mean, scale = self.scaling[idx]
+                    values = np.asarray(values, dtype=np.float64) - mean
+                    values /= scale
+            out[:, idx] = values
+
+    def transform_frame(self, df):
+        """Turn a raw customer DataFrame into one C-contiguous (n, n_features) matrix
+
+        Each categorical column is hashed once; the codes serve both the
+        derived service counts and the encoded feature. Rows are filled in
+        blocks so the strided column writes stay in cache and temporaries
+        stay block-sized.
+        """
+        X = np.empty((len(df), len(self.steps)), dtype=self.dtype)
+        for start in range(0, len(df), FRAME_BLOCK_ROWS):
+            stop = start + FRAME_BLOCK_ROWS
+            self.fill_frame(df.iloc[start:stop], X[start:stop])
+        return X
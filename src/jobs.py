@@ -0,0 +1,311 @@
+"""
+Bulk Scoring Jobs
+SQLite-backed job queue with background scoring workers
+"""
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime, timezone
+import numpy as np
+
+from business import BusinessReportAccumulator
+from scoring import ResultWriter, read_chunks, score_chunks
+
+DEFAULT_JOBS_DIR = 'data/jobs'
+INPUT_FILE = 'input.csv'
+RESULTS_FILE = 'results.parquet'
+
+# A running job whose worker has not renewed its lease for this long is requeued
+DEFAULT_LEASE_SECONDS = 300
+
+JOB_COLUMNS = ['job_id', 'status', 'created_at', 'started_at', 'finished_at',
+               'rows_scored', 'rows_per_sec', 'bundle_version', 'error', 'report']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    rows_scored INTEGER NOT NULL DEFAULT 0,
+    rows_per_sec REAL NOT NULL DEFAULT 0,
+    bundle_version TEXT,
+    error TEXT,
+    report TEXT,
+    worker_id TEXT,
+    heartbeat_at REAL
+)
+"""
+
+# Columns added after the first release, for jobs.db files created before them
+MIGRATIONS = {
+    'worker_id': "ALTER TABLE jobs ADD COLUMN worker_id TEXT",
+    'heartbeat_at': "ALTER TABLE jobs ADD COLUMN heartbeat_at REAL"
+}
+
+
+def utc_now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def report_to_json(report):
+    """JSON-safe job summary from a generate_business_report-style dict"""
+    summary = {key: value for key, value in report.items() if key != 'tier_summary'}
+    tiers = report['tier_summary']
+    summary['tier_summary'] = {
+        tier: {'_'.join(col): value for col, value in row.items()}
+        for tier, row in tiers.to_dict('index').items()
+    }
+
+    def plain(value):
+        if isinstance(value, np.generic):
+            return value.item()
+        raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+    return json.dumps(summary, default=plain)
+
+
+class LeaseLost(Exception):
+    """The job was requeued and possibly claimed by another worker"""
+    pass
+
+
+class JobStore:
+    """Job rows in SQLite plus one directory per job for its files
+
+    Every call opens its own connection, so the store can be shared by
+    request handlers and worker threads (and by separate processes).
+    A claimed job is leased to its worker, which renews the lease with
+    heartbeats; only jobs whose lease ran out are requeued.
+    """
+
+    def __init__(self, jobs_dir=DEFAULT_JOBS_DIR, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """
+        Args:
+            jobs_dir: Holds jobs.db and a <job_id>/ directory per job
+            lease_seconds: Heartbeat age after which a running job counts as abandoned
+        """
+        self.jobs_dir = jobs_dir
+        self.db_path = os.path.join(jobs_dir, 'jobs.db')
+        self.lease_seconds = lease_seconds
+        os.makedirs(jobs_dir, exist_ok=True)
+        with closing(self.connect()) as conn:
+            conn.execute(SCHEMA)
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, statement in MIGRATIONS.items():
+                if column not in columns:
+                    conn.execute(statement)
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def job_dir(self, job_id):
+        return os.path.join(self.jobs_dir, job_id)
+
+    def input_path(self, job_id):
+        return os.path.join(self.job_dir(job_id), INPUT_FILE)
+
+    def results_path(self, job_id):
+        return os.path.join(self.job_dir(job_id), RESULTS_FILE)
+
+    def submit(self, upload):
+        """Copy an uploaded file object to disk and queue it; returns the job ID"""
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.job_dir(job_id))
+        with open(self.input_path(job_id), 'wb') as f:
+            shutil.copyfileobj(upload, f, length=1 << 20)
+        with closing(self.connect()) as conn:
+            conn.execute("INSERT INTO jobs (job_id, status, created_at) VALUES (?, 'queued', ?)",
+                         (job_id, utc_now()))
+        return job_id
+
+    def claim(self, worker_id):
+        """Atomically lease the oldest queued job to worker_id; None if idle"""
+        with closing(self.connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT job_id FROM jobs WHERE status = 'queued' "
+                               "ORDER BY created_at LIMIT 1").fetchone()
+            if row is not None:
+                conn.execute("UPDATE jobs SET status = 'running', started_at = ?, worker_id = ?, "
+                             "heartbeat_at = ? WHERE job_id = ?",
+                             (utc_now(), worker_id, time.time(), row['job_id']))
+            conn.execute("COMMIT")
+            return row['job_id'] if row is not None else None
+
+    def update(self, job_id, worker_id=None, **fields):
+        """Set fields on a job; with worker_id, only while that worker holds its lease
+
+        Leased updates renew the heartbeat and raise LeaseLost once the job
+        has been requeued, so a stalled worker cannot overwrite a rerun.
+        """
+        where, params = "job_id = ?", [job_id]
+        if worker_id is not None:
+            fields['heartbeat_at'] = time.time()
+            where += " AND status = 'running' AND worker_id = ?"
+            params.append(worker_id)
+        assignments = ', '.join(f"{key} = ?" for key in fields)
+        with closing(self.connect()) as conn:
+            updated = conn.execute(f"UPDATE jobs SET {assignments} WHERE {where}",
+                                   (*fields.values(), *params)).rowcount
+        if worker_id is not None and not updated:
+            raise LeaseLost(f"Job {job_id} is no longer leased to {worker_id}")
+
+    def heartbeat(self, job_id, worker_id):
+        """Renew a running job's lease"""
+        self.update(job_id, worker_id=worker_id)
+
+    def get(self, job_id):
+        """Job row as a dict (report decoded), or None"""
+        with closing(self.connect()) as conn:
+            row = conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE job_id = ?",
+                               (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['report'] = json.loads(job['report']) if job['report'] else None
+        return job
+
+    def requeue_stale(self):
+        """Put running jobs whose lease ran out (their worker died) back in the queue"""
+        stale_before = time.time() - self.lease_seconds
+        with closing(self.connect()) as conn:
+            return conn.execute("UPDATE jobs SET status = 'queued', started_at = NULL, "
+                                "rows_scored = 0, rows_per_sec = 0, worker_id = NULL, "
+                                "heartbeat_at = NULL WHERE status = 'running' "
+                                "AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                                (stale_before,)).rowcount
+
+
+def new_worker_id():
+    """Unique across threads, processes and hosts sharing one jobs.db"""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class JobWorker:
+    """Background thread that scores queued jobs one at a time"""
+
+    def __init__(self, store, server, calculator, chunksize=50000, top_n=500, poll_seconds=1.0):
+        """
+        Args:
+            store: JobStore to claim jobs from
+            server: ModelServer; each job is pinned to the model live when it starts
+            calculator: BusinessImpactCalculator for reports and results
+            chunksize: Rows read and scored per chunk
+            top_n: Customers targeted in the job's ROI plan
+            poll_seconds: Idle wait between queue checks
+        """
+        self.store = store
+        self.server = server
+        self.calc = calculator
+        self.chunksize = chunksize
+        self.top_n = top_n
+        self.poll_seconds = poll_seconds
+        self.worker_id = new_worker_id()
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def run_job(self, job_id):
+        """Score one claimed job, recording progress, summary and results"""
+        with self.server.use() as state:
+            if state.model is None:
+                raise RuntimeError("Model not loaded")
+            self.store.update(job_id, worker_id=self.worker_id, bundle_version=state.version)
+
+            chunks = read_chunks(self.store.input_path(job_id), self.chunksize,
+                                 state.pipeline.vocabularies)
+            if state.bulk_scorer is not None:
+                scored = state.bulk_scorer.map_shards(chunks, top_n=self.top_n)
+            else:
+                scored = score_chunks(chunks, state.pipeline, state.model, self.calc, self.top_n)
+
+            # Written aside so a requeued rerun never shares a file with this one
+            results_path = self.store.results_path(job_id)
+            partial_path = f"{results_path}.{self.worker_id}.part"
+            report = BusinessReportAccumulator(self.calc, top_n=self.top_n)
+            writer = ResultWriter(partial_path)
+            start = time.perf_counter()
+            n_rows = 0
+            try:
+                try:
+                    for accumulator, results in scored:
+                        report.merge(accumulator)
+                        writer.write(results)
+                        n_rows += len(results)
+                        self.store.update(job_id, worker_id=self.worker_id, rows_scored=n_rows,
+                                          rows_per_sec=n_rows / (time.perf_counter() - start))
+                finally:
+                    writer.close()
+                self.store.heartbeat(job_id, self.worker_id)
+                os.replace(partial_path, results_path)
+            finally:
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+
+        self.store.update(job_id, worker_id=self.worker_id, status='done', finished_at=utc_now(),
+                          report=report_to_json(report.result()))
+
+    def keep_leased(self, job_id, finished):
+        """Renew the job's lease until finished is set or the lease is lost"""
+        while not finished.wait(self.store.lease_seconds / 3):
+            try:
+                self.store.heartbeat(job_id, self.worker_id)
+            except LeaseLost:
+                return
+
+    def run_once(self):
+        """Claim and score one job; returns its ID or None if the queue is empty"""
+        # Jobs abandoned by a dead worker (any process) go back in the queue first
+        self.store.requeue_stale()
+        job_id = self.store.claim(self.worker_id)
+        if job_id is None:
+            return None
+
+        finished = threading.Event()
+        heartbeat = threading.Thread(target=self.keep_leased, args=(job_id, finished),
+                                     name='job-heartbeat', daemon=True)
+        heartbeat.start()
+        try:
+            self.run_job(job_id)
+        except LeaseLost:
+            # Requeued while this worker stalled; the rerun owns the job now
+            pass
+        except Exception as e:
+            try:
+                self.store.update(job_id, worker_id=self.worker_id, status='failed',
+                                  finished_at=utc_now(), error=str(e))
+            except LeaseLost:
+                pass
+        finally:
+            finished.set()
+            heartbeat.join()
+        return job_id
+
+    def notify(self):
+        """Wake the worker after a submit instead of waiting for the next poll"""
+        self.wakeup.set()
+
+    def run(self):
+        while not self.stopped.is_set():
+            if self.run_once() is None:
+                self.wakeup.wait(self.poll_seconds)
+                self.wakeup.clear()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='job-worker', daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.stopped.set()
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join()
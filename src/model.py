@@ -2,24 +2,46 @@
 Model Training with MLflow Tracking
 Phase 3: MLOps with Experiment Tracking
 """
-import mlflow
-import mlflow.sklearn
 from sklearn.linear_model import LogisticRegression
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import RandomForestClassifier
 from xgboost import XGBClassifier
 from sklearn.metrics import (accuracy_score, precision_score, recall_score, 
                             f1_score, roc_auc_score, confusion_matrix)
-from imblearn.over_sampling import SMOTE
 import numpy as np
 import joblib
 import os
+import time
+
+from backends import export_booster, is_xgboost_model
+from incremental import (DEFAULT_MAX_AUC_DROP, DEFAULT_RF_TREES, DEFAULT_XGB_ROUNDS,
+                         check_incremental, continue_training, model_size, prepare_update)
+from inference import CompiledFeaturePipeline
+from outofcore import DEFAULT_CHUNKSIZE, XGB_PARAMS, fit_engineer, train_xgboost
+from resampling import SMOTECache
+from search import HyperparameterSearch, build_model, refit_params
+from tracking import RunLogger, now_ms
+
+BOOSTER_PATH = 'models/best_model.ubj'
+
 
 class ChurnModelTrainer:
     """Train and evaluate churn prediction models with MLflow"""
     
-    def __init__(self, experiment_name="telecom-churn-prediction"):
-        mlflow.set_experiment(experiment_name)
+    def __init__(self, experiment_name="telecom-churn-prediction", smote_cache=None,
+                 async_logging=True, log_models='best'):
+        """
+        Args:
+            experiment_name: MLflow experiment the runs are logged to
+            smote_cache: SMOTECache shared by every SMOTE run (default: on-disk
+                         cache under data/cache/smote)
+            async_logging: Write runs to MLflow on a background thread
+            log_models: 'best' (only the best run's model, logged at the end
+                        of the experiments) or 'all' (every run's model)
+        """
+        self.logger = RunLogger(experiment_name, synchronous=not async_logging,
+                                log_models=log_models)
+        self.smote = smote_cache or SMOTECache()
         self.best_model = None
         self.best_score = 0
         
@@ -39,52 +61,70 @@ class ChurnModelTrainer:
         return metrics, y_pred, y_pred_proba
 
     
+    def track_best(self, model, metrics):
+        """Save the model as models/best_model.pkl if it beats the best AUC so far
+        
+        Returns the files written, for logging with the run (empty if the
+        model is not the new best).
+        """
+        if metrics['roc_auc'] <= self.best_score:
+            return []
+        self.best_score = metrics['roc_auc']
+        self.best_model = model
+        return self.save_model(model)
+    
+    def save_model(self, model):
+        """Write models/best_model.pkl (plus the raw booster for XGBoost); returns the files"""
+        os.makedirs('models', exist_ok=True)
+        joblib.dump(model, 'models/best_model.pkl')
+        artifacts = ['models/best_model.pkl']
+        
+        # Raw booster for native XGBoost serving
+        if is_xgboost_model(model):
+            export_booster(model, BOOSTER_PATH)
+            artifacts.append(BOOSTER_PATH)
+        elif os.path.exists(BOOSTER_PATH):
+            os.remove(BOOSTER_PATH)
+        return artifacts
+
+    
     def train_with_mlflow(self, model, model_name, params, X_train, y_train, 
                          X_test, y_test, use_smote=False):
-        """Train model and log to MLflow"""
-        
-        with mlflow.start_run(run_name=model_name):
-            # Apply SMOTE if requested
-            if use_smote:
-                smote = SMOTE(random_state=42)
-                X_train_resampled, y_train_resampled = smote.fit_resample(X_train, y_train)
-                mlflow.log_param("resampling", "SMOTE")
-            else:
-                X_train_resampled, y_train_resampled = X_train, y_train
-                mlflow.log_param("resampling", "None")
-            
-            # Log parameters
-            for param, value in params.items():
-                mlflow.log_param(param, value)
-            
-            # Train model
-            model.fit(X_train_resampled, y_train_resampled)
-            
-            # Evaluate
-            metrics, y_pred, y_pred_proba = self.evaluate_model(model, X_test, y_test)
-            
-            # Log metrics
-            for metric_name, metric_value in metrics.items():
-                mlflow.log_metric(metric_name, metric_value)
-            
-            # Log model
-            mlflow.sklearn.log_model(model, "model")
-            
-            # Track best model
-            if metrics['roc_auc'] > self.best_score:
-                self.best_score = metrics['roc_auc']
-                self.best_model = model
-                
-                # Save best model locally
-                os.makedirs('models', exist_ok=True)
-                joblib.dump(model, 'models/best_model.pkl')
-                mlflow.log_artifact('models/best_model.pkl')
-            
-            print(f"\n{model_name} Results:")
-            for metric, value in metrics.items():
-                print(f"  {metric}: {value:.4f}")
-            
-            return metrics
+        """Train model and queue its MLflow run (params, metrics and the model if best)"""
+        start_time = now_ms()
+        
+        # Apply SMOTE if requested
+        if use_smote:
+            # Reused from disk when this training set was resampled before
+            X_train_resampled, y_train_resampled = self.smote.fit_resample(X_train, y_train)
+            logged_params = {'resampling': 'SMOTE',
+                             'smote_method': self.smote.resolve_method(y_train)}
+        else:
+            X_train_resampled, y_train_resampled = X_train, y_train
+            logged_params = {'resampling': 'None'}
+        logged_params.update(params)
+        
+        # Train model
+        start = time.perf_counter()
+        model.fit(X_train_resampled, y_train_resampled)
+        fit_seconds = time.perf_counter() - start
+        
+        # Evaluate
+        metrics, y_pred, y_pred_proba = self.evaluate_model(model, X_test, y_test)
+        
+        # Params and metrics in one batch on the logging thread
+        run = self.logger.log_run(model_name, logged_params,
+                                  {**metrics, 'fit_seconds': fit_seconds}, start_time)
+        
+        # Track best model; its model and files are logged with its run
+        artifacts = self.track_best(model, metrics)
+        self.logger.log_model(run, model, artifacts, best=bool(artifacts))
+        
+        print(f"\n{model_name} Results:")
+        for metric, value in metrics.items():
+            print(f"  {metric}: {value:.4f}")
+        
+        return metrics
 
     
     def run_all_experiments(self, X_train, y_train, X_test, y_test):
@@ -135,6 +175,7 @@ class ChurnModelTrainer:
             "XGBoost + SMOTE", xgb_params,
             X_train, y_train, X_test, y_test, use_smote=True
         )
+        self.logger.flush()
         
         print("\n" + "="*60)
         print("All Experiments Completed!")
@@ -143,6 +184,160 @@ class ChurnModelTrainer:
         
         return results
 
+    
+    def run_search(self, X_train, y_train, X_test, y_test, mode='random', n_trials=20,
+                   n_workers=None, target_auc=None, families=None):
+        """Search each model family, then refit and evaluate its best configuration
+        
+        Trials run in a process pool and are scored on a validation fold
+        split off the training data; every trial is logged to MLflow. The
+        winners go through train_with_mlflow like the fixed experiments.
+        """
+        
+        print("="*60)
+        print(f"Starting Hyperparameter Search ({mode})")
+        print("="*60)
+        
+        search = HyperparameterSearch(mode=mode, n_trials=n_trials, n_workers=n_workers,
+                                      target_auc=target_auc, smote=self.smote)
+        best_trials = search.run(X_train, y_train, families)
+        self.search_summary = search.summary()
+        
+        results = {}
+        for family, trial in best_trials.items():
+            params = refit_params(trial)
+            results[family] = self.train_with_mlflow(
+                build_model(family, params), f"{family} (search)",
+                {key: value for key, value in params.items() if key != 'smote'},
+                X_train, y_train, X_test, y_test, use_smote=params.get('smote', False)
+            )
+        self.logger.flush()
+        
+        summary = self.search_summary
+        print("\n" + "="*60)
+        print(f"Search Completed: {summary['n_trials']} trials on {summary['n_workers']} workers "
+              f"in {summary['search_seconds']:.1f}s")
+        if target_auc is not None:
+            if summary['time_to_target_auc'] is None:
+                print(f"Target validation AUC {target_auc:.4f} not reached")
+            else:
+                print(f"Target validation AUC {target_auc:.4f} reached after "
+                      f"{summary['time_to_target_auc']:.1f}s")
+        print(f"Best Model AUC: {self.best_score:.4f}")
+        print("="*60)
+        
+        return results
+
+    
+    def train_out_of_core(self, path, chunksize=DEFAULT_CHUNKSIZE, cache_dir=None,
+                          test_size=0.2, seed=42):
+        """Fit the feature engineer and XGBoost over a file streamed in chunks
+        
+        Pass 1 fits the encoders and scaler chunk by chunk; XGBoost then
+        trains through a data iterator (external memory with cache_dir), so
+        the full feature matrix is never held in memory. Held-out rows are
+        drawn per chunk. Returns (metrics, engineer).
+        """
+        
+        print("="*60)
+        print("Starting Out-of-Core Training")
+        print("="*60)
+        
+        start_time = now_ms()
+        start = time.perf_counter()
+        engineer, fitter = fit_engineer(path, chunksize, seed)
+        fit_seconds = time.perf_counter() - start
+        print(f"✓ Feature engineer fitted on {fitter.n_rows} rows "
+              f"({fitter.n_positive} churners) in {fit_seconds:.1f}s")
+        
+        model, metrics = train_xgboost(path, engineer, fitter.fill_value, chunksize,
+                                       test_size, seed, cache_dir=cache_dir)
+        train_seconds = time.perf_counter() - start - fit_seconds
+        
+        params = {**XGB_PARAMS, 'resampling': 'None', 'out_of_core': True, 'chunksize': chunksize,
+                  'external_memory': cache_dir is not None, 'n_rows': fitter.n_rows}
+        run = self.logger.log_run("XGBoost (out-of-core)", params,
+                                  {**metrics, 'engineer_fit_seconds': fit_seconds,
+                                   'train_seconds': train_seconds}, start_time)
+        artifacts = self.track_best(model, metrics)
+        self.logger.log_model(run, model, artifacts, best=bool(artifacts))
+        self.logger.flush()
+        
+        print(f"\nXGBoost (out-of-core) Results:")
+        for metric, value in metrics.items():
+            print(f"  {metric}: {value:.4f}")
+        
+        return metrics, engineer
+
+    
+    def train_incremental(self, model, engineer, path, xgb_rounds=DEFAULT_XGB_ROUNDS,
+                          rf_trees=DEFAULT_RF_TREES, max_auc_drop=DEFAULT_MAX_AUC_DROP,
+                          test_size=0.2):
+        """Add a new data extract to a trained model, kept only if its AUC holds up
+        
+        The extract is split into training and holdout rows and a copy of
+        the model is trained further on the training rows (more XGBoost
+        rounds, more RandomForest trees, a warm-started LogisticRegression
+        on a scaler updated online; see prepare_update). Only if its
+        holdout AUC is at most max_auc_drop below the current model's is it
+        written to models/best_model.pkl; nothing is written otherwise.
+        Returns (metrics, engineer, accepted), with the engineer to save
+        alongside the updated model.
+        """
+        
+        print("="*60)
+        print("Starting Incremental Retraining")
+        print("="*60)
+        
+        # Checked up front, before the extract is loaded and scored
+        check_incremental(model)
+        for attr in ('unknown_codes', 'fill_values'):
+            if not getattr(engineer, attr, None):
+                # Checked up front: the bundle could not be written after training
+                raise ValueError(f"Feature engineer has no {attr}; recover them with "
+                                 "python src/bundle.py --data <training csv> first")
+        
+        start_time = now_ms()
+        df = engineer.load_data(path)
+        train, test, y_train, y_test = engineer.split_data(df, df['Churn'], test_size)
+        print(f"✓ New data loaded: {len(train)} training, {len(test)} holdout rows")
+        
+        # Current model on the new holdout, as it is served today
+        X_test = CompiledFeaturePipeline.from_engineer(engineer).transform_frame(test)
+        previous, _, _ = self.evaluate_model(model, X_test, y_test)
+        
+        start = time.perf_counter()
+        updated, updated_engineer = prepare_update(model, engineer, train)
+        pipeline = CompiledFeaturePipeline.from_engineer(updated_engineer)
+        continue_training(updated, pipeline.transform_frame(train), y_train, xgb_rounds, rf_trees)
+        fit_seconds = time.perf_counter() - start
+        
+        metrics, _, _ = self.evaluate_model(updated, pipeline.transform_frame(test), y_test)
+        accepted = bool(metrics['roc_auc'] >= previous['roc_auc'] - max_auc_drop)
+        
+        model_name = f"{type(model).__name__} (incremental)"
+        params = {'model': type(model).__name__, 'n_rows': len(train), 'xgb_rounds': xgb_rounds,
+                  'rf_trees': rf_trees, 'max_auc_drop': max_auc_drop,
+                  'model_size': model_size(updated), 'accepted': accepted}
+        run = self.logger.log_run(model_name, params,
+                                  {**metrics, 'previous_roc_auc': previous['roc_auc'],
+                                   'fit_seconds': fit_seconds}, start_time)
+        if accepted:
+            # The gate decides on the new holdout; best_score (other data) is left alone
+            self.best_model = updated
+            self.logger.log_model(run, updated, self.save_model(updated), best=True)
+        self.logger.flush()
+        
+        print(f"\n{model_name} Results ({fit_seconds:.1f}s):")
+        for metric, value in metrics.items():
+            print(f"  {metric}: {value:.4f} (previous {previous[metric]:.4f})")
+        if accepted:
+            print("✓ Regression gate passed: model updated")
+        else:
+            print(f"⚠ Regression gate failed: AUC dropped by more than {max_auc_drop}, "
+                  f"keeping the current model")
+        
+        return metrics, updated_engineer, accepted
 
 if __name__ == "__main__":
     from features import prepare_data_pipeline
@@ -0,0 +1,309 @@
+"""
+Out-of-Core Training
+Fit the feature engineer and an XGBoost model over data streamed in chunks
+"""
+import os
+import numpy as np
+import xgboost as xgb
+from sklearn.preprocessing import LabelEncoder
+from xgboost import XGBClassifier
+
+from features import ChurnFeatureEngineer
+from inference import UNKNOWN_CODE, CompiledFeaturePipeline
+from schema import BINARY_COLS, BINARY_MAP, MULTI_COLS, NUM_COLS
+from scoring import read_chunks
+
+DEFAULT_CHUNKSIZE = 250_000
+
+# TotalCharges values kept to estimate the median that fills blanks
+MEDIAN_SAMPLE_SIZE = 100_000
+
+# Probability bins of the streamed ROC AUC histograms
+AUC_BINS = 1 << 16
+
+# Same configuration as the fixed XGBoost experiment in ChurnModelTrainer
+XGB_PARAMS = {'n_estimators': 100, 'max_depth': 6, 'learning_rate': 0.1, 'scale_pos_weight': 3}
+
+
+def holdout_mask(n_rows, chunk_index, test_size=0.2, seed=42):
+    """Rows of one chunk held out for evaluation (the same on every pass)"""
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index,)))
+    return rng.random(n_rows) < test_size
+
+
+def churn_labels(chunk):
+    return (chunk['Churn'].astype(object) == 'Yes').to_numpy(dtype=np.int8)
+
+
+class StreamingFeatureFitter:
+    """Fits a ChurnFeatureEngineer one chunk at a time
+
+    Keeps only what the in-memory fit derives from the full frame: label
+    counts per categorical column (the vocabulary union and the fallback
+    codes for unseen labels), running mean/variance of the numeric features
+    (StandardScaler.partial_fit) and a reservoir sample of TotalCharges for
+    the median that fills blanks. With at most MEDIAN_SAMPLE_SIZE non-blank
+    TotalCharges the median, and so the engineer, matches the in-memory fit.
+    """
+
+    def __init__(self, median_sample_size=MEDIAN_SAMPLE_SIZE, seed=42):
+        """
+        Args:
+            median_sample_size: Reservoir size for the TotalCharges median
+            seed: Seed for the reservoir sample
+        """
+        self.engineer = ChurnFeatureEngineer()
+        self.label_counts = {}
+        self.sample = np.empty(median_sample_size, dtype=np.float64)
+        self.n_seen = 0
+        self.n_missing = 0
+        self.n_rows = 0
+        self.n_positive = 0
+        self.first_row = None
+        self.rng = np.random.default_rng(seed)
+
+    def update_median_sample(self, values):
+        """Vectorized reservoir sampling (Algorithm R) over one chunk"""
+        size = len(self.sample)
+        fill = min(max(size - self.n_seen, 0), len(values))
+        self.sample[self.n_seen:self.n_seen + fill] = values[:fill]
+        rest = values[fill:]
+        if len(rest):
+            seen = self.n_seen + fill + np.arange(len(rest))
+            slots = (self.rng.random(len(rest)) * (seen + 1)).astype(np.int64)
+            keep = slots < size
+            # Later rows win duplicate slots, as in the sequential algorithm
+            self.sample[slots[keep]] = rest[keep]
+        self.n_seen += len(values)
+
+    def partial_fit(self, chunk):
+        """Accumulate the statistics of one raw chunk"""
+        total_charges = chunk['TotalCharges'].to_numpy(dtype=np.float64)
+        missing = np.isnan(total_charges)
+        self.update_median_sample(total_charges[~missing])
+        self.n_missing += int(missing.sum())
+        self.n_rows += len(chunk)
+        self.n_positive += int(churn_labels(chunk).sum())
+
+        df = self.engineer.create_business_features(chunk)
+        for col in BINARY_COLS + MULTI_COLS:
+            if col in df.columns:
+                counts = df[col].astype(str).value_counts()
+                self.label_counts[col] = self.label_counts[col].add(counts, fill_value=0) \
+                    if col in self.label_counts else counts
+        # NaN TotalCharges are skipped here and added back as the median in finalize
+        self.engineer.scaler.partial_fit(df[NUM_COLS])
+        if self.first_row is None:
+            self.first_row = chunk.head(1)
+        return self
+
+    @property
+    def fill_value(self):
+        """Median of the non-blank TotalCharges (float32, as load_data fills it)"""
+        n_sampled = min(self.n_seen, len(self.sample))
+        return np.float32(np.median(self.sample[:n_sampled])) if n_sampled else np.float32(0)
+
+    def fill_scaler_blanks(self):
+        """Merge the filled-in medians into the TotalCharges mean and variance"""
+        scaler = self.engineer.scaler
+        col = NUM_COLS.index('TotalCharges')
+        seen = np.broadcast_to(scaler.n_samples_seen_, (len(NUM_COLS),)).astype(np.int64)
+        k = self.n_missing
+        if k:
+            n, mean, var = seen[col], scaler.mean_[col], scaler.var_[col]
+            median = float(self.fill_value)
+            total = n + k
+            scaler.mean_[col] = (n * mean + k * median) / total
+            scaler.var_[col] = (n * var + n * k / total * (mean - median) ** 2) / total
+            scaler.scale_[col] = np.sqrt(scaler.var_[col]) or 1.0
+            seen = seen.copy()
+            seen[col] = total
+        scaler.n_samples_seen_ = seen[0] if (seen == seen[0]).all() else seen
+
+    def finalize(self):
+        """The fitted engineer, as encode_features/prepare_features(fit=True) leave it"""
+        engineer = self.engineer
+        engineer.unknown_codes = {}
+        for col in BINARY_COLS:
+            if col in self.label_counts:
+                counts = {}
+                for label, count in self.label_counts[col].items():
+                    if label in BINARY_MAP:
+                        counts[BINARY_MAP[label]] = counts.get(BINARY_MAP[label], 0) + count
+                # Ties go to the smaller value, like np.bincount().argmax()
+                engineer.unknown_codes[col] = (max(sorted(counts), key=lambda v: counts[v])
+                                               if counts else UNKNOWN_CODE)
+        for col in MULTI_COLS:
+            if col in self.label_counts:
+                counts = self.label_counts[col]
+                labels = sorted(counts.index)
+                engineer.label_encoders[col] = LabelEncoder().fit(labels)
+                engineer.unknown_codes[col] = int(np.argmax([counts[label] for label in labels]))
+        self.fill_scaler_blanks()
+        engineer.fill_values = {'TotalCharges': float(self.fill_value)}
+
+        # Column order of the in-memory path, from one transformed row
+        row = self.first_row.assign(TotalCharges=self.first_row['TotalCharges'].fillna(self.fill_value))
+        row = row.assign(Churn=churn_labels(row))
+        df = engineer.encode_features(engineer.create_business_features(row), fit=False)
+        engineer.prepare_features(df, fit=False)
+        return engineer
+
+
+def fit_engineer(path, chunksize=DEFAULT_CHUNKSIZE, seed=42):
+    """Pass 1: fit the feature engineer over every chunk of a CSV/Parquet file"""
+    fitter = StreamingFeatureFitter(seed=seed)
+    for chunk in read_chunks(path, chunksize):
+        fitter.partial_fit(chunk)
+    return fitter.finalize(), fitter
+
+
+def transform_chunk(chunk, pipeline, fill_value):
+    """Float32 features and churn labels for one raw chunk"""
+    chunk = chunk.assign(TotalCharges=chunk['TotalCharges'].fillna(fill_value))
+    return pipeline.transform_frame(chunk), churn_labels(chunk)
+
+
+class ChunkIter(xgb.DataIter):
+    """Feeds XGBoost the training rows of each chunk, re-reading the file per pass"""
+
+    def __init__(self, path, pipeline, fill_value, chunksize=DEFAULT_CHUNKSIZE,
+                 test_size=0.2, seed=42, cache_prefix=None):
+        """
+        Args:
+            path: CSV or Parquet customer file
+            pipeline: CompiledFeaturePipeline from the streamed engineer fit
+            fill_value: Value for blank TotalCharges
+            chunksize: Rows read per chunk
+            test_size: Share of each chunk held out (see holdout_mask)
+            seed: Seed for the held-out rows
+            cache_prefix: Path prefix for XGBoost's external-memory pages
+        """
+        super().__init__(cache_prefix=cache_prefix)
+        self.path = path
+        self.pipeline = pipeline
+        self.fill_value = fill_value
+        self.chunksize = chunksize
+        self.test_size = test_size
+        self.seed = seed
+        self.chunks = None
+        self.index = 0
+
+    def reset(self):
+        self.chunks = None
+        self.index = 0
+
+    def next(self, input_data):
+        if self.chunks is None:
+            self.chunks = read_chunks(self.path, self.chunksize)
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            return 0
+        X, y = transform_chunk(chunk, self.pipeline, self.fill_value)
+        train = ~holdout_mask(len(chunk), self.index, self.test_size, self.seed)
+        input_data(data=X[train], label=y[train])
+        self.index += 1
+        return 1
+
+
+class StreamingMetrics:
+    """Holdout metrics folded in one scored chunk at a time, in fixed memory
+
+    Accuracy, precision, recall and F1 come from running confusion counts.
+    ROC AUC comes from per-class histograms of the probabilities over
+    n_bins equal bins, with pairs in the same bin counted as ties; it is
+    off from the exact AUC by at most half the share of positive/negative
+    pairs that share a bin.
+    """
+
+    def __init__(self, threshold=0.5, n_bins=AUC_BINS):
+        """
+        Args:
+            threshold: Probability above which a row is predicted to churn
+            n_bins: Histogram bins over [0, 1] for ROC AUC
+        """
+        self.threshold = threshold
+        self.n_bins = n_bins
+        self.positives = np.zeros(n_bins, dtype=np.int64)
+        self.negatives = np.zeros(n_bins, dtype=np.int64)
+        self.tp = self.fp = self.tn = self.fn = 0
+
+    def update(self, y, proba):
+        """Add the labels and positive-class probabilities of one chunk"""
+        y = np.asarray(y).astype(bool)
+        proba = np.asarray(proba, dtype=np.float64)
+        y_pred = proba > self.threshold
+        self.tp += int((y_pred & y).sum())
+        self.fp += int((y_pred & ~y).sum())
+        self.fn += int((~y_pred & y).sum())
+        self.tn += int((~y_pred & ~y).sum())
+
+        bins = np.clip((proba * self.n_bins).astype(np.int64), 0, self.n_bins - 1)
+        self.positives += np.bincount(bins[y], minlength=self.n_bins)
+        self.negatives += np.bincount(bins[~y], minlength=self.n_bins)
+        return self
+
+    def roc_auc(self):
+        n_pos, n_neg = self.positives.sum(), self.negatives.sum()
+        if not n_pos or not n_neg:
+            raise ValueError("ROC AUC needs both classes in the holdout")
+        negatives = self.negatives.astype(np.float64)
+        # Negatives ranked below each bin, plus half of those tied in it
+        below = np.cumsum(negatives) - negatives
+        return float(np.dot(self.positives, below + 0.5 * negatives) / (n_pos * n_neg))
+
+    def result(self):
+        """Metrics with the same keys as ChurnModelTrainer.evaluate_model"""
+        tp, fp, fn = self.tp, self.fp, self.fn
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        return {
+            'accuracy': (tp + self.tn) / (tp + fp + fn + self.tn),
+            'precision': precision,
+            'recall': recall,
+            'f1_score': 2 * tp / (2 * tp + fp + fn) if tp else 0.0,
+            'roc_auc': self.roc_auc()
+        }
+
+
+def evaluate_streaming(booster, path, pipeline, fill_value, chunksize=DEFAULT_CHUNKSIZE,
+                       test_size=0.2, seed=42):
+    """Metrics on the held-out rows, scored chunk by chunk (see StreamingMetrics)"""
+    metrics = StreamingMetrics()
+    for index, chunk in enumerate(read_chunks(path, chunksize)):
+        X, y = transform_chunk(chunk, pipeline, fill_value)
+        test = holdout_mask(len(chunk), index, test_size, seed)
+        metrics.update(y[test], booster.inplace_predict(X[test]))
+    return metrics.result()
+
+
+def train_xgboost(path, engineer, fill_value, chunksize=DEFAULT_CHUNKSIZE, test_size=0.2,
+                  seed=42, params=None, cache_dir=None):
+    """Pass 2: boost over the streamed training rows; returns an XGBClassifier
+
+    Without cache_dir the chunks are quantized into a QuantileDMatrix (one
+    byte per feature per row in memory); with it XGBoost pages the data to
+    cache_dir and trains from external memory.
+    """
+    params = params or XGB_PARAMS
+    pipeline = CompiledFeaturePipeline.from_engineer(engineer)
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        data = ChunkIter(path, pipeline, fill_value, chunksize, test_size, seed,
+                         cache_prefix=os.path.join(cache_dir, 'xgb'))
+        dtrain = xgb.DMatrix(data)
+    else:
+        dtrain = xgb.QuantileDMatrix(ChunkIter(path, pipeline, fill_value, chunksize,
+                                               test_size, seed))
+
+    booster = xgb.train({'objective': 'binary:logistic', 'tree_method': 'hist',
+                         'max_depth': params['max_depth'], 'eta': params['learning_rate'],
+                         'scale_pos_weight': params['scale_pos_weight'],
+                         'eval_metric': 'logloss', 'seed': seed},
+                        dtrain, num_boost_round=params['n_estimators'])
+
+    # Same artifact type as the in-memory XGBoost experiment
+    model = XGBClassifier(**params, random_state=seed, eval_metric='logloss')
+    model.load_model(booster.save_raw('json'))
+    metrics = evaluate_streaming(booster, path, pipeline, fill_value, chunksize, test_size, seed)
+    return model, metrics
@@ -0,0 +1,95 @@
+"""
+Parallel Bulk Scoring
+Shard large customer files across a process pool
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from bundle import DEFAULT_BUNDLE_DIR, BundleNotFound, load_bundle, load_legacy_pickles
+from business import BusinessImpactCalculator, BusinessReportAccumulator
+from inference import score_frame
+from schema import read_customers
+
+# Loaded once per worker process by _init_worker
+_worker_bundle = None
+
+
+def _init_worker(bundle_dir, backend):
+    """Load the model bundle once when a worker process starts"""
+    global _worker_bundle
+    try:
+        # One thread per process: parallelism comes from the pool
+        _worker_bundle = load_bundle(bundle_dir, backend=backend, nthread=1)
+    except BundleNotFound:
+        _worker_bundle = load_legacy_pickles()
+
+
+def _score_shard(shard, row_offset, calculator, top_n, preview):
+    """Score one shard inside a worker
+
+    Returns the shard's report accumulator plus its per-customer results,
+    or only the first `preview` result rows when preview is not None.
+    """
+    shard = shard.assign(churn_probability=score_frame(_worker_bundle.pipeline,
+                                                       _worker_bundle.model, shard))
+    accumulator = BusinessReportAccumulator(calculator, top_n=top_n)
+    accumulator.update(shard)
+
+    if preview is not None:
+        shard = shard.head(preview)
+    return accumulator, calculator.customer_results(shard, row_offset)
+
+
+class ParallelBulkScorer:
+    """Score DataFrame shards in a ProcessPoolExecutor and merge their reports"""
+
+    def __init__(self, n_workers=None, bundle_dir=DEFAULT_BUNDLE_DIR, backend='auto',
+                 calculator=None, max_pending=None):
+        """
+        Args:
+            n_workers: Worker processes (defaults to the CPU count)
+            bundle_dir: Model bundle each worker loads at startup
+            backend: Bundle backend passed to load_bundle
+            calculator: BusinessImpactCalculator used for reports
+            max_pending: Shards in flight at once, bounds parent memory
+        """
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.calculator = calculator or BusinessImpactCalculator()
+        self.max_pending = max_pending or 2 * self.n_workers
+        self.executor = ProcessPoolExecutor(max_workers=self.n_workers,
+                                            initializer=_init_worker,
+                                            initargs=(bundle_dir, backend))
+
+    def map_shards(self, shards, top_n=500, preview=None):
+        """Yield (accumulator, results) per shard, in input order"""
+        pending = deque()
+        row_offset = 0
+        for shard in shards:
+            if len(pending) >= self.max_pending:
+                yield pending.popleft().result()
+            pending.append(self.executor.submit(_score_shard, shard, row_offset,
+                                                self.calculator, top_n, preview))
+            row_offset += len(shard)
+        while pending:
+            yield pending.popleft().result()
+
+    def score(self, shards, top_n=500):
+        """Merged generate_business_report-style report for all shards"""
+        report = BusinessReportAccumulator(self.calculator, top_n=top_n)
+        for accumulator, _ in self.map_shards(shards, top_n=top_n, preview=0):
+            report.merge(accumulator)
+        return report.result()
+
+    def score_csv(self, filepath, shard_size=100_000, top_n=500):
+        """Read a CSV in shards and score them across the pool"""
+        return self.score(read_customers(filepath, chunksize=shard_size), top_n=top_n)
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
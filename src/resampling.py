@@ -0,0 +1,164 @@
+"""
+SMOTE Resampling
+Disk-cached SMOTE plus a batched approximate-neighbor mode for large data
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from imblearn.over_sampling import SMOTE
+from sklearn.neighbors import NearestNeighbors
+
+DEFAULT_CACHE_DIR = 'data/cache/smote'
+
+# Bump when the cached arrays would change for the same inputs
+CACHE_FORMAT = 1
+
+# 'auto' switches to batched SMOTE once a class has this many samples
+BATCHED_MIN_ROWS = 100_000
+
+# Minority samples per neighbor search in batched mode
+DEFAULT_BATCH_SIZE = 10_000
+
+
+def batched_smote(X, y, k_neighbors=5, batch_size=DEFAULT_BATCH_SIZE, random_state=42):
+    """SMOTE with neighbors searched inside random batches of each minority class
+
+    Every class but the largest is oversampled up to its size, as SMOTE's
+    'auto' strategy does. Neighbors come from a random batch of at most
+    batch_size samples of the same class rather than the whole class, so
+    the search cost and memory are bounded by the batch, at the price of
+    slightly more distant neighbors. Returns the original rows followed by
+    the synthetic ones.
+    """
+    rng = np.random.default_rng(random_state)
+    classes, counts = np.unique(y, return_counts=True)
+    n_target = counts.max()
+
+    X_parts, y_parts = [X], [y]
+    for label, count in zip(classes, counts):
+        n_new = n_target - count
+        if n_new == 0:
+            continue
+        samples = X[y == label]
+        order = rng.permutation(count)
+        batches = np.array_split(order, max(1, -(-count // batch_size)))
+        # Synthetic samples per batch in proportion to its size
+        per_batch = rng.multinomial(n_new, [len(b) / count for b in batches])
+
+        for batch, n_batch in zip(batches, per_batch):
+            if n_batch == 0:
+                continue
+            B = samples[batch]
+            k = min(k_neighbors, len(B) - 1)
+            if k < 1:
+                X_parts.append(np.repeat(B, n_batch, axis=0))
+                y_parts.append(np.full(n_batch, label, dtype=y.dtype))
+                continue
+            _, neighbors = NearestNeighbors(n_neighbors=k + 1).fit(B).kneighbors(B)
+            rows = rng.integers(0, len(B), n_batch)
+            # Column 0 is the sample itself
+            picked = neighbors[rows, rng.integers(1, k + 1, n_batch)]
+            gap = rng.random(n_batch).astype(B.dtype)[:, None]
+            X_parts.append(B[rows] + gap * (B[picked] - B[rows]))
+            y_parts.append(np.full(n_batch, label, dtype=y.dtype))
+
+    return np.concatenate(X_parts), np.concatenate(y_parts)
+
+
+def array_digest(hasher, array):
+    array = np.ascontiguousarray(array)
+    hasher.update(f"{array.dtype.str}{array.shape}".encode())
+    hasher.update(memoryview(array).cast('B'))
+
+
+class SMOTECache:
+    """fit_resample results stored on disk, keyed by the data and the parameters
+
+    Every experiment or rerun that resamples the same training set with the
+    same parameters loads the stored arrays instead of running SMOTE again.
+    Entries are written atomically, so processes can share one directory.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, method='auto', k_neighbors=5,
+                 batch_size=DEFAULT_BATCH_SIZE, random_state=42):
+        """
+        Args:
+            cache_dir: Directory holding one <key>/ entry per resampled set
+                       (None disables the cache)
+            method: 'exact' (imblearn SMOTE), 'batched' (batched_smote), or
+                    'auto' (batched once a class has BATCHED_MIN_ROWS samples)
+            k_neighbors: Neighbors interpolated towards
+            batch_size: Samples per neighbor search in batched mode
+            random_state: Default seed for fit_resample
+        """
+        if method not in ('auto', 'exact', 'batched'):
+            raise ValueError(f"Unknown SMOTE method: {method}")
+        self.cache_dir = cache_dir
+        self.method = method
+        self.k_neighbors = k_neighbors
+        self.batch_size = batch_size
+        self.random_state = random_state
+        self.hits = 0
+        self.misses = 0
+
+    def resolve_method(self, y):
+        if self.method != 'auto':
+            return self.method
+        return 'batched' if np.unique(y, return_counts=True)[1].max() >= BATCHED_MIN_ROWS else 'exact'
+
+    def params(self, method, random_state):
+        params = {'method': method, 'k_neighbors': self.k_neighbors, 'random_state': random_state,
+                  'format': CACHE_FORMAT}
+        if method == 'batched':
+            params['batch_size'] = self.batch_size
+        return params
+
+    def key(self, X, y, params):
+        """Hash of the training arrays and the resampling parameters"""
+        hasher = hashlib.sha256()
+        array_digest(hasher, X)
+        array_digest(hasher, y)
+        hasher.update(json.dumps(params, sort_keys=True).encode())
+        return hasher.hexdigest()
+
+    def resample(self, X, y, params):
+        if params['method'] == 'batched':
+            return batched_smote(X, y, self.k_neighbors, self.batch_size, params['random_state'])
+        smote = SMOTE(k_neighbors=self.k_neighbors, random_state=params['random_state'])
+        X_res, y_res = smote.fit_resample(X, y)
+        return np.asarray(X_res), np.asarray(y_res)
+
+    def fit_resample(self, X, y, random_state=None):
+        """Resampled (X, y) as arrays, from the cache when this input was seen before"""
+        X, y = np.asarray(X), np.asarray(y)
+        seed = self.random_state if random_state is None else random_state
+        params = self.params(self.resolve_method(y), seed)
+        if self.cache_dir is None:
+            self.misses += 1
+            return self.resample(X, y, params)
+
+        entry = os.path.join(self.cache_dir, self.key(X, y, params))
+        if os.path.isdir(entry):
+            self.hits += 1
+            return np.load(os.path.join(entry, 'X.npy')), np.load(os.path.join(entry, 'y.npy'))
+
+        self.misses += 1
+        X_res, y_res = self.resample(X, y, params)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-')
+        try:
+            np.save(os.path.join(staging, 'X.npy'), X_res)
+            np.save(os.path.join(staging, 'y.npy'), y_res)
+            with open(os.path.join(staging, 'params.json'), 'w') as f:
+                json.dump(params, f)
+            os.rename(staging, entry)
+        except OSError:
+            # Another process stored the same entry first
+            shutil.rmtree(staging, ignore_errors=True)
+        return X_res, y_res
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,82 @@
+"""
+Telco Input Schema
+Column groups shared by training, serving and the artifact bundle
+"""
+import pandas as pd
+
+SERVICE_COLS = ['PhoneService', 'InternetService', 'OnlineSecurity', 
+                'OnlineBackup', 'DeviceProtection', 'TechSupport', 
+                'StreamingTV', 'StreamingMovies']
+
+BINARY_COLS = ['gender', 'Partner', 'Dependents', 'PhoneService', 
+               'PaperlessBilling']
+
+BINARY_MAP = {'Yes': 1, 'No': 0, 'Male': 1, 'Female': 0}
+
+MULTI_COLS = ['InternetService', 'Contract', 'PaymentMethod', 
+              'OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
+              'TechSupport', 'StreamingTV', 'StreamingMovies', 
+              'MultipleLines', 'tenure_bucket']
+
+NUM_COLS = ['tenure', 'MonthlyCharges', 'TotalCharges', 
+            'total_services', 'charge_per_service', 'customer_value']
+
+TENURE_BINS = [0, 12, 36, 72]
+TENURE_LABELS = ['new', 'mid', 'loyal']
+
+# Declared raw input schema for CSV ingestion
+CATEGORY_LABELS = {
+    'gender': ['Female', 'Male'],
+    'Partner': ['No', 'Yes'],
+    'Dependents': ['No', 'Yes'],
+    'PhoneService': ['No', 'Yes'],
+    'MultipleLines': ['No', 'No phone service', 'Yes'],
+    'InternetService': ['DSL', 'Fiber optic', 'No'],
+    'OnlineSecurity': ['No', 'No internet service', 'Yes'],
+    'OnlineBackup': ['No', 'No internet service', 'Yes'],
+    'DeviceProtection': ['No', 'No internet service', 'Yes'],
+    'TechSupport': ['No', 'No internet service', 'Yes'],
+    'StreamingTV': ['No', 'No internet service', 'Yes'],
+    'StreamingMovies': ['No', 'No internet service', 'Yes'],
+    'Contract': ['Month-to-month', 'One year', 'Two year'],
+    'PaperlessBilling': ['No', 'Yes'],
+    'PaymentMethod': ['Bank transfer (automatic)', 'Credit card (automatic)',
+                      'Electronic check', 'Mailed check'],
+    'Churn': ['No', 'Yes']
+}
+
+RAW_NUM_COLS = ['SeniorCitizen', 'tenure', 'MonthlyCharges', 'TotalCharges']
+
+# Blank TotalCharges (new customers) are read as missing
+NA_VALUES = ['', ' ']
+
+# Numeric columns whose missing values are filled with the training median
+FILL_COLS = ['TotalCharges']
+
+
+def customer_dtypes(vocabularies=None):
+    """Pinned read_csv dtypes: categoricals over the fitted vocabularies, float32 numerics
+
+    Values outside a column's vocabulary are read as missing (NaN).
+    """
+    labels = dict(CATEGORY_LABELS)
+    for col, vocabulary in (vocabularies or {}).items():
+        if col in labels:
+            labels[col] = list(vocabulary)
+
+    dtypes = {'customerID': str}
+    dtypes.update({col: pd.CategoricalDtype(values) for col, values in labels.items()})
+    dtypes.update({col: 'float32' for col in RAW_NUM_COLS})
+    return dtypes
+
+
+def read_customers(source, vocabularies=None, **kwargs):
+    """pd.read_csv with the declared schema (pass chunksize to stream)"""
+    return pd.read_csv(source, dtype=customer_dtypes(vocabularies), na_values=NA_VALUES,
+                       **kwargs)
+
+
+def cast_customers(df, vocabularies=None):
+    """Apply the declared schema to an already loaded frame (e.g. from Parquet)"""
+    dtypes = customer_dtypes(vocabularies)
+    return df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns})
@@ -0,0 +1,74 @@
+"""
+Chunked Scoring I/O
+Read customer files in chunks and write per-customer results incrementally
+"""
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from business import BusinessReportAccumulator
+from inference import score_frame
+from schema import cast_customers, read_customers
+
+# Written as-is when there are no rows, so empty input still leaves a readable file
+RESULT_SCHEMA = pa.schema([
+    ('customerID', pa.string()),
+    ('churn_probability', pa.float64()),
+    ('risk_score', pa.int64()),
+    ('risk_tier', pa.string()),
+    ('recommended_action', pa.string())
+])
+
+
+def read_chunks(path, chunksize, vocabularies=None):
+    """Yield DataFrame chunks from a CSV or Parquet file with the declared dtypes"""
+    if path.endswith('.parquet'):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield cast_customers(batch.to_pandas(), vocabularies)
+    else:
+        try:
+            chunks = read_customers(path, vocabularies, chunksize=chunksize)
+        except pd.errors.EmptyDataError:
+            # A 0-byte file has no header and no rows
+            return
+        yield from chunks
+
+
+class ResultWriter:
+    """Incremental Parquet or Arrow IPC writer for result chunks"""
+
+    def __init__(self, path):
+        self.path = path
+        self.arrow = path.endswith(('.arrow', '.feather'))
+        self.writer = None
+
+    def open(self, schema):
+        if self.arrow:
+            self.writer = pa.ipc.new_file(self.path, schema)
+        else:
+            self.writer = pq.ParquetWriter(self.path, schema)
+
+    def write(self, results):
+        # Empty chunks carry null-typed columns that would fix the file schema
+        if len(results) == 0:
+            return
+        table = pa.Table.from_pandas(results, preserve_index=False)
+        if self.writer is None:
+            self.open(table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is None:
+            self.open(RESULT_SCHEMA)
+        self.writer.close()
+
+
+def score_chunks(chunks, pipeline, model, calc, top_n=500):
+    """Yield (accumulator, results) per chunk in this process"""
+    row_offset = 0
+    for chunk in chunks:
+        chunk = chunk.assign(churn_probability=score_frame(pipeline, model, chunk))
+        accumulator = BusinessReportAccumulator(calc, top_n=top_n)
+        accumulator.update(chunk)
+        yield accumulator, calc.customer_results(chunk, row_offset)
+        row_offset += len(chunk)
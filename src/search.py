@@ -0,0 +1,253 @@
+"""
+Hyperparameter Search
+Randomized and successive-halving search over each model family in a process pool
+"""
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import mlflow
+import numpy as np
+from scipy.stats import loguniform, randint, uniform
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import ParameterSampler, train_test_split
+from sklearn.tree import DecisionTreeClassifier
+from xgboost import XGBClassifier
+
+from resampling import SMOTECache
+
+# Boosting rounds are capped here and cut by early stopping on the validation fold
+XGB_MAX_ROUNDS = 1000
+XGB_EARLY_STOPPING_ROUNDS = 30
+
+SEARCH_SPACES = {
+    'Logistic Regression': {
+        'C': loguniform(1e-3, 1e2),
+        'class_weight': [None, 'balanced']
+    },
+    'Decision Tree': {
+        'max_depth': randint(3, 20),
+        'min_samples_split': randint(2, 60),
+        'min_samples_leaf': randint(1, 40)
+    },
+    'Random Forest': {
+        'n_estimators': randint(100, 400),
+        'max_depth': randint(5, 25),
+        'min_samples_split': randint(2, 30),
+        'max_features': ['sqrt', 'log2', 0.5]
+    },
+    'XGBoost': {
+        'max_depth': randint(2, 10),
+        'learning_rate': loguniform(0.01, 0.3),
+        'subsample': uniform(0.6, 0.4),
+        'colsample_bytree': uniform(0.5, 0.5),
+        'min_child_weight': randint(1, 10),
+        'scale_pos_weight': uniform(1, 3),
+        'smote': [False, True]
+    }
+}
+
+
+def build_model(family, params, seed=42):
+    """Unfitted single-threaded estimator; params may include 'smote'"""
+    params = {key: value for key, value in params.items() if key != 'smote'}
+    if family == 'Logistic Regression':
+        return LogisticRegression(**params, max_iter=1000, solver='lbfgs', random_state=seed)
+    if family == 'Decision Tree':
+        return DecisionTreeClassifier(**params, random_state=seed)
+    if family == 'Random Forest':
+        return RandomForestClassifier(**params, n_jobs=1, random_state=seed)
+    if family == 'XGBoost':
+        params.setdefault('n_estimators', XGB_MAX_ROUNDS)
+        return XGBClassifier(**params, n_jobs=1, random_state=seed, eval_metric='auc')
+    raise ValueError(f"Unknown model family: {family}")
+
+
+def plain(value):
+    """NumPy scalars from the samplers as plain Python values (for MLflow and JSON)"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+# Training and validation folds plus the SMOTE cache, set once per worker process
+WORKER_DATA = {}
+
+
+def init_worker(X_train, y_train, X_val, y_val, smote):
+    WORKER_DATA.update(X_train=X_train, y_train=y_train, X_val=X_val, y_val=y_val, smote=smote)
+
+
+def run_trial(family, params, n_samples=None, seed=42):
+    """Fit one configuration on the first n_samples training rows; AUC on the validation fold"""
+    X, y = WORKER_DATA['X_train'], WORKER_DATA['y_train']
+    X_val, y_val = WORKER_DATA['X_val'], WORKER_DATA['y_val']
+    if n_samples is not None:
+        X, y = X[:n_samples], y[:n_samples]
+
+    start = time.perf_counter()
+    if params.get('smote'):
+        # Trials on the same rung share one cached resampled set
+        X, y = WORKER_DATA['smote'].fit_resample(X, y, random_state=seed)
+    model = build_model(family, params, seed)
+    best_iteration = None
+    if family == 'XGBoost':
+        model.set_params(early_stopping_rounds=XGB_EARLY_STOPPING_ROUNDS)
+        model.fit(X, y, eval_set=[(X_val, y_val)], verbose=False)
+        best_iteration = int(model.best_iteration)
+    else:
+        model.fit(X, y)
+    fit_seconds = time.perf_counter() - start
+
+    return {
+        'family': family,
+        'params': params,
+        'n_samples': len(X) if n_samples is None else n_samples,
+        'val_auc': float(roc_auc_score(y_val, model.predict_proba(X_val)[:, 1])),
+        'fit_seconds': fit_seconds,
+        'best_iteration': best_iteration
+    }
+
+
+class HyperparameterSearch:
+    """Runs trials for each model family on a worker pool and logs them to MLflow
+
+    Trials are scored on a stratified validation fold split off the training
+    data, so the test set stays untouched until the winners are refit.
+    """
+
+    def __init__(self, mode='random', n_trials=20, n_workers=None, target_auc=None,
+                 eta=3, min_samples=500, val_size=0.2, seed=42, smote=None):
+        """
+        Args:
+            mode: 'random' (n_trials at full data) or 'halving' (successive halving)
+            n_trials: Configurations sampled per model family
+            n_workers: Trial processes (default: one per CPU)
+            target_auc: Validation AUC whose time-to-reach is reported
+            eta: Halving rate: each rung keeps 1/eta of the configurations
+                 on eta times the training rows
+            min_samples: Training rows per configuration in the first rung
+            val_size: Share of the training data held out for trial scoring
+            seed: Seed for the samplers, the validation split and the models
+            smote: SMOTECache for trials that resample (default: on-disk cache)
+        """
+        if mode not in ('random', 'halving'):
+            raise ValueError(f"Unknown search mode: {mode}")
+        self.mode = mode
+        self.n_trials = n_trials
+        self.n_workers = n_workers or os.cpu_count()
+        self.target_auc = target_auc
+        self.eta = eta
+        self.min_samples = min_samples
+        self.val_size = val_size
+        self.seed = seed
+        self.smote = smote or SMOTECache()
+        self.trials = []
+        self.start = None
+        self.elapsed = None
+        self.time_to_target = None
+
+    def sample_params(self, family):
+        sampler = ParameterSampler(SEARCH_SPACES[family], n_iter=self.n_trials,
+                                   random_state=self.seed)
+        return [{key: plain(value) for key, value in params.items()} for params in sampler]
+
+    def rungs(self, n_rows):
+        """(configurations kept after the rung, training rows) per successive-halving rung"""
+        if self.mode == 'random':
+            return [(self.n_trials, n_rows)]
+        n_rungs = max(1, 1 + int(math.log(n_rows / self.min_samples, self.eta)))
+        return [(max(1, self.n_trials // self.eta ** (r + 1)),
+                 min(n_rows, int(n_rows / self.eta ** (n_rungs - 1 - r))))
+                for r in range(n_rungs)]
+
+    def record(self, trial, family_start):
+        """Log one finished trial as a nested MLflow run"""
+        trial['elapsed'] = time.perf_counter() - self.start
+        self.trials.append(trial)
+        if (self.target_auc is not None and self.time_to_target is None and
+                trial['val_auc'] >= self.target_auc):
+            self.time_to_target = trial['elapsed']
+
+        with mlflow.start_run(run_name=f"{trial['family']} trial", nested=True):
+            params = {key: value for key, value in trial['params'].items() if key != 'smote'}
+            mlflow.log_params(params)
+            mlflow.log_param('resampling', 'SMOTE' if trial['params'].get('smote') else 'None')
+            mlflow.log_param('n_samples', trial['n_samples'])
+            metrics = {'val_auc': trial['val_auc'], 'fit_seconds': trial['fit_seconds'],
+                       'elapsed_seconds': trial['elapsed'],
+                       'family_elapsed_seconds': time.perf_counter() - family_start}
+            if trial['best_iteration'] is not None:
+                metrics['best_iteration'] = trial['best_iteration']
+            mlflow.log_metrics(metrics)
+
+    def search_family(self, pool, family, n_rows):
+        """Best trial of one family after all rungs"""
+        family_start = time.perf_counter()
+        candidates = self.sample_params(family)
+        best = None
+        with mlflow.start_run(run_name=f"{family} search", nested=True):
+            mlflow.log_params({'family': family, 'mode': self.mode, 'n_trials': self.n_trials})
+            for n_keep, n_samples in self.rungs(n_rows):
+                futures = [pool.submit(run_trial, family, params, n_samples, self.seed)
+                           for params in candidates]
+                results = []
+                for future in as_completed(futures):
+                    trial = future.result()
+                    self.record(trial, family_start)
+                    results.append(trial)
+                results.sort(key=lambda t: t['val_auc'], reverse=True)
+                candidates = [t['params'] for t in results[:n_keep]]
+                best = results[0]
+            mlflow.log_metrics({'best_val_auc': best['val_auc'],
+                                'search_seconds': time.perf_counter() - family_start})
+        return best
+
+    def run(self, X_train, y_train, families=None):
+        """Best trial per family; trials are kept in self.trials"""
+        families = families or list(SEARCH_SPACES)
+        y_train = np.asarray(y_train)
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=self.val_size, random_state=self.seed, stratify=y_train
+        )
+
+        self.trials = []
+        self.time_to_target = None
+        self.start = time.perf_counter()
+        best = {}
+        with mlflow.start_run(run_name=f"Hyperparameter search ({self.mode})"):
+            mlflow.log_params({'mode': self.mode, 'n_trials': self.n_trials,
+                               'n_workers': self.n_workers, 'target_auc': self.target_auc})
+            with ProcessPoolExecutor(max_workers=self.n_workers, initializer=init_worker,
+                                     initargs=(X_fit, y_fit, X_val, y_val, self.smote)) as pool:
+                for family in families:
+                    best[family] = self.search_family(pool, family, len(X_fit))
+                    print(f"  {family:20s} best val AUC {best[family]['val_auc']:.4f}")
+            self.elapsed = time.perf_counter() - self.start
+            mlflow.log_metric('search_seconds', self.elapsed)
+            if self.time_to_target is not None:
+                mlflow.log_metric('time_to_target_auc', self.time_to_target)
+        return best
+
+    def summary(self):
+        return {
+            'mode': self.mode,
+            'n_trials': len(self.trials),
+            'n_workers': self.n_workers,
+            'search_seconds': self.elapsed,
+            'target_auc': self.target_auc,
+            'time_to_target_auc': self.time_to_target,
+            'best_val_auc': max((t['val_auc'] for t in self.trials), default=None)
+        }
+
+
+def refit_params(trial):
+    """Winning trial's params for a refit on the full training data
+
+    XGBoost keeps the number of rounds early stopping settled on, since the
+    refit has no validation fold to stop on.
+    """
+    params = dict(trial['params'])
+    if trial['best_iteration'] is not None:
+        params['n_estimators'] = trial['best_iteration'] + 1
+    return params
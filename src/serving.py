@@ -0,0 +1,223 @@
+"""
+Model Serving State
+Hot-swappable model bundle with its batcher and bulk worker pool
+"""
+import os
+import threading
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+from bundle import DEFAULT_BUNDLE_DIR, MANIFEST_FILE
+from batching import MicroBatcher
+from inference import predict_proba
+from parallel import ParallelBulkScorer
+from schema import BINARY_COLS
+
+
+def synthetic_customers(pipeline, n_rows=64):
+    """Raw customer frame cycling through every label the pipeline knows"""
+    rows = np.arange(n_rows)
+    tenure = rows % 72 + 1
+    monthly = 20.0 + (rows * 7.3) % 100
+    df = pd.DataFrame({
+        'customerID': [f'warmup-{i}' for i in rows],
+        'SeniorCitizen': rows % 2,
+        'tenure': tenure,
+        'MonthlyCharges': monthly,
+        'TotalCharges': tenure * monthly
+    })
+    for col in BINARY_COLS:
+        labels = ['Female', 'Male'] if col == 'gender' else ['No', 'Yes']
+        df[col] = np.take(labels, rows % 2)
+    for col, labels in pipeline.vocabularies.items():
+        if col != 'tenure_bucket':
+            df[col] = np.take(labels, rows % len(labels))
+    return df
+
+
+class ServingState:
+    """One loaded model bundle plus the workers built around it
+
+    Requests hold a reference for their whole lifetime (see ModelServer.use),
+    so a state replaced by a reload keeps serving them and is only closed
+    once the last one finishes.
+    """
+
+    def __init__(self, bundle, batcher=None, bulk_scorer=None):
+        self.bundle = bundle
+        self.model = bundle.model if bundle is not None else None
+        self.pipeline = bundle.pipeline if bundle is not None else None
+        self.batcher = batcher
+        self.bulk_scorer = bulk_scorer
+        self.active = 0
+        self.retired = False
+
+    @property
+    def version(self):
+        return self.bundle.version if self.bundle is not None else None
+
+    def warm_up(self, n_rows=64):
+        """Run a synthetic batch through the frame and single-row paths"""
+        df = synthetic_customers(self.pipeline, n_rows)
+        predict_proba(self.model, self.pipeline.transform_frame(df))
+        predict_proba(self.model, self.pipeline.transform_row(df.iloc[0].to_dict()))
+        if self.batcher is not None:
+            self.batcher.predict(df.iloc[0].to_dict())
+        if self.bulk_scorer is not None:
+            # Forces every worker process to start and load the bundle
+            shards = [df] * self.bulk_scorer.n_workers
+            for _ in self.bulk_scorer.map_shards(shards, preview=0):
+                pass
+
+    def close(self):
+        """Stop the batcher thread and bulk worker processes"""
+        if self.batcher is not None:
+            self.batcher.close()
+        if self.bulk_scorer is not None:
+            self.bulk_scorer.close()
+
+
+class ModelServer:
+    """Holds the live ServingState and swaps in reloaded bundles atomically"""
+
+    def __init__(self, load_bundle_fn, bundle_dir=DEFAULT_BUNDLE_DIR, cache=None,
+                 microbatch=None, bulk_workers=0, calculator=None, backend='auto'):
+        """
+        Args:
+            load_bundle_fn: Zero-argument callable returning a ModelBundle
+            bundle_dir: Bundle directory the bulk worker processes load
+            cache: PredictionCache invalidated whenever the model changes
+            microbatch: MicroBatcher keyword arguments, None disables batching
+            bulk_workers: Bulk scoring processes, 0 disables the pool
+            calculator: BusinessImpactCalculator shared with the bulk pool
+            backend: Bundle backend the bulk worker processes load
+        """
+        self.load_bundle_fn = load_bundle_fn
+        self.bundle_dir = bundle_dir
+        self.cache = cache
+        self.microbatch = microbatch
+        self.bulk_workers = bulk_workers
+        self.calculator = calculator
+        self.backend = backend
+        self.lock = threading.Lock()
+        self.reload_lock = threading.Lock()
+        self.reloads = 0
+        self.state = ServingState(None)
+        self.watcher = None
+        self.stop_watching = threading.Event()
+
+    def build_state(self):
+        """Load a bundle and start its workers (not yet serving)"""
+        bundle = self.load_bundle_fn()
+        batcher = bulk_scorer = None
+        if self.microbatch is not None:
+            batcher = MicroBatcher(bundle.pipeline, bundle.model, **self.microbatch)
+        if self.bulk_workers > 0:
+            bulk_scorer = ParallelBulkScorer(n_workers=self.bulk_workers, bundle_dir=self.bundle_dir,
+                                             backend=self.backend, calculator=self.calculator)
+        return ServingState(bundle, batcher, bulk_scorer)
+
+    def load(self):
+        """Initial load; leaves an empty state if no model is available"""
+        self.swap(self.build_state())
+
+    def reload(self):
+        """Load, warm and swap in the current bundle; the old one serves until then"""
+        with self.reload_lock:
+            state = self.build_state()
+            try:
+                state.warm_up()
+            except Exception:
+                state.close()
+                raise
+            self.swap(state)
+            self.reloads += 1
+            return state
+
+    def swap(self, state):
+        with self.lock:
+            old, self.state = self.state, state
+            old.retired = True
+            close_old = old.active == 0
+        if self.cache is not None:
+            version = model_version(state.bundle)
+            if version == self.cache.model_version:
+                self.cache.clear()
+            else:
+                self.cache.set_model_version(version)
+        if close_old:
+            old.close()
+
+    def acquire(self):
+        with self.lock:
+            state = self.state
+            state.active += 1
+            return state
+
+    def release(self, state):
+        with self.lock:
+            state.active -= 1
+            close = state.retired and state.active == 0
+        if close:
+            state.close()
+
+    @contextmanager
+    def use(self):
+        """Pin the current state for the duration of one request"""
+        state = self.acquire()
+        try:
+            yield state
+        finally:
+            self.release(state)
+
+    def manifest_signature(self):
+        """Identity of the bundle manifest on disk (None while there is none)"""
+        try:
+            st = os.stat(os.path.join(self.bundle_dir, MANIFEST_FILE))
+        except FileNotFoundError:
+            return None
+        # save_bundle swaps in a new directory, so the inode changes too
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def watch(self, poll_seconds=5.0):
+        """Reload in a background thread whenever a new bundle is written
+        
+        Only the manifest is watched: save_bundle swaps it in last, with the
+        files it lists, while best_model.pkl is rewritten during training
+        before any bundle exists. A change is acted on once it has stayed
+        the same for one more poll.
+        """
+        def poll():
+            seen = pending = self.manifest_signature()
+            while not self.stop_watching.wait(poll_seconds):
+                signature = self.manifest_signature()
+                if signature == seen or signature is None:
+                    pending = signature
+                    continue
+                if signature != pending:
+                    # Debounce: wait for the next poll to confirm it settled
+                    pending = signature
+                    continue
+                seen = signature
+                try:
+                    state = self.reload()
+                    print(f"✓ Reloaded model bundle {state.version}")
+                except Exception as e:
+                    print(f"⚠ Model reload failed ({e}) - still serving {self.state.version}")
+
+        self.watcher = threading.Thread(target=poll, name='model-watcher', daemon=True)
+        self.watcher.start()
+
+    def close(self):
+        self.stop_watching.set()
+        with self.lock:
+            self.state.retired = True
+            close = self.state.active == 0
+        if close:
+            self.state.close()
+
+
+def model_version(bundle):
+    """Cache namespace: cached predictions are only valid for this model"""
+    return f"{bundle.version}:{bundle.schema_hash}" if bundle is not None else None
@@ -0,0 +1,357 @@
+"""
+Synthetic Telco Customers
+Vectorized, seeded generator of Telco-schema data for scale and load testing
+"""
+import argparse
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pcsv
+import pyarrow.parquet as pq
+
+from schema import CATEGORY_LABELS, read_customers
+
+CONTRACTS = CATEGORY_LABELS['Contract']
+INTERNET = CATEGORY_LABELS['InternetService']
+PAYMENTS = CATEGORY_LABELS['PaymentMethod']
+
+ADDON_COLS = ['OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport',
+              'StreamingTV', 'StreamingMovies']
+
+# Tenure buckets for churn rates: 0 (new, no bill yet), 1-12, 13-36, 37+
+CHURN_TENURE_EDGES = [0, 12, 36]
+
+TENURE_QUANTILES = np.linspace(0, 1, 21)
+
+COLUMNS = ['customerID', 'gender', 'SeniorCitizen', 'Partner', 'Dependents', 'tenure',
+           'PhoneService', 'MultipleLines', 'InternetService', *ADDON_COLS, 'Contract',
+           'PaperlessBilling', 'PaymentMethod', 'MonthlyCharges', 'TotalCharges', 'Churn']
+
+
+def default_params():
+    """Approximation of the public Telco export (7,043 customers, 26.5% churn)
+
+    Used when the original CSV is not available to fit from.
+    """
+    # Customers per (Contract, InternetService) in the original data
+    counts = {('Month-to-month', 'DSL'): 1223, ('Month-to-month', 'Fiber optic'): 2128,
+              ('Month-to-month', 'No'): 524, ('One year', 'DSL'): 570,
+              ('One year', 'Fiber optic'): 539, ('One year', 'No'): 364,
+              ('Two year', 'DSL'): 628, ('Two year', 'Fiber optic'): 429,
+              ('Two year', 'No'): 638}
+    churn = {('Month-to-month', 'DSL'): 0.32, ('Month-to-month', 'Fiber optic'): 0.55,
+             ('Month-to-month', 'No'): 0.19, ('One year', 'DSL'): 0.09,
+             ('One year', 'Fiber optic'): 0.19, ('One year', 'No'): 0.02,
+             ('Two year', 'DSL'): 0.02, ('Two year', 'Fiber optic'): 0.07,
+             ('Two year', 'No'): 0.01}
+    tenure = {
+        'Month-to-month': [1, 1, 2, 3, 4, 5, 7, 8, 10, 12, 13, 16, 19, 22, 25, 29, 34, 40, 47, 56, 72],
+        'One year': [1, 7, 13, 18, 23, 27, 31, 35, 38, 41, 44, 47, 50, 53, 56, 59, 62, 65, 68, 70, 72],
+        'Two year': [1, 15, 25, 33, 40, 45, 49, 53, 56, 59, 62, 64, 66, 67, 69, 70, 71, 71, 72, 72, 72]
+    }
+    addons = {
+        'DSL': [0.49, 0.45, 0.41, 0.48, 0.33, 0.34],
+        'Fiber optic': [0.26, 0.40, 0.45, 0.27, 0.56, 0.58],
+        'No': [0.0] * len(ADDON_COLS)
+    }
+    # Longer contracts go with more add-on services
+    addon_scale = {'Month-to-month': 0.8, 'One year': 1.2, 'Two year': 1.35}
+    # Bank transfer, credit card, electronic check, mailed check
+    payment = {'Month-to-month': [0.14, 0.14, 0.49, 0.23], 'One year': [0.28, 0.28, 0.24, 0.20],
+               'Two year': [0.32, 0.32, 0.10, 0.26]}
+    phone = {'DSL': 0.71, 'Fiber optic': 1.0, 'No': 1.0}
+    multiple_lines = {'DSL': 0.36, 'Fiber optic': 0.61, 'No': 0.22}
+    paperless = {'DSL': 0.53, 'Fiber optic': 0.77, 'No': 0.29}
+    # Churn rate multiplier per tenure bucket (0, 1-12, 13-36, 37+)
+    churn_tenure = [1.42, 1.42, 0.8, 0.49]
+
+    total = sum(counts.values())
+    segments = []
+    for (contract, internet), count in counts.items():
+        segments.append({
+            'contract': contract,
+            'internet': internet,
+            'p': count / total,
+            'tenure_quantiles': tenure[contract],
+            'phone': phone[internet],
+            'multiple_lines': multiple_lines[internet],
+            'addons': [min(p * addon_scale[contract], 0.95) for p in addons[internet]],
+            'paperless': paperless[internet],
+            'payment': payment[contract],
+            'churn': [min(churn[contract, internet] * m, 0.95) for m in churn_tenure]
+        })
+
+    return {
+        'segments': segments,
+        'male': 0.505,
+        'senior': 0.162,
+        'partner': 0.483,
+        'dependents': [0.10, 0.52],  # without / with partner
+        'charges': {
+            'base': {'DSL': 25.0, 'Fiber optic': 50.0, 'No': 0.0},
+            'phone': 20.0,
+            'multiple_lines': 5.0,
+            'addons': [5.0, 5.0, 5.0, 5.0, 10.0, 10.0],
+            'noise': 1.0,
+            'min': 18.25,
+            'max': 118.75
+        },
+        'total_charges_noise': 0.03
+    }
+
+
+def rate(mask, default=0.0):
+    """Share of True values, or default for an empty selection"""
+    return float(mask.mean()) if len(mask) else default
+
+
+def fit_params(df):
+    """Generator parameters fitted from a raw Telco frame (e.g. the Kaggle CSV)
+
+    Customers are split into (Contract, InternetService) segments; each
+    segment gets its own tenure distribution, service, billing and payment
+    rates and churn rate per tenure bucket. Monthly charges are a least
+    squares fit on the subscribed services.
+    """
+    df = df.copy()
+    for col in CATEGORY_LABELS:
+        if col in df.columns:
+            df[col] = df[col].astype(str)
+    tenure = df['tenure'].to_numpy(dtype=np.float64)
+    monthly = df['MonthlyCharges'].to_numpy(dtype=np.float64)
+    total_charges = pd.to_numeric(df['TotalCharges'], errors='coerce').to_numpy(dtype=np.float64)
+    tenure_bucket = np.digitize(tenure, CHURN_TENURE_EDGES, right=True)
+    churned = (df['Churn'] == 'Yes').to_numpy() if 'Churn' in df.columns else np.zeros(len(df), bool)
+    overall_churn = rate(churned)
+
+    segments = []
+    for contract in CONTRACTS:
+        for internet in INTERNET:
+            mask = ((df['Contract'] == contract) & (df['InternetService'] == internet)).to_numpy()
+            if not mask.any():
+                continue
+            seg = df[mask]
+            phone = (seg['PhoneService'] == 'Yes').to_numpy()
+            segment_churn = rate(churned[mask], overall_churn)
+            segments.append({
+                'contract': contract,
+                'internet': internet,
+                'p': float(mask.mean()),
+                'tenure_quantiles': np.quantile(tenure[mask], TENURE_QUANTILES).tolist(),
+                'phone': rate(phone),
+                'multiple_lines': rate((seg['MultipleLines'] == 'Yes').to_numpy()[phone]),
+                'addons': [rate((seg[col] == 'Yes').to_numpy()) for col in ADDON_COLS],
+                'paperless': rate((seg['PaperlessBilling'] == 'Yes').to_numpy()),
+                'payment': [rate((seg['PaymentMethod'] == method).to_numpy()) for method in PAYMENTS],
+                # Sparse buckets fall back to the segment's churn rate
+                'churn': [rate(churned[mask & (tenure_bucket == b)], segment_churn)
+                          for b in range(len(CHURN_TENURE_EDGES) + 1)]
+            })
+
+    # MonthlyCharges ~ base[internet] + phone + multiple lines + add-ons
+    design = np.column_stack(
+        [(df['InternetService'] == internet).to_numpy() for internet in INTERNET] +
+        [(df['PhoneService'] == 'Yes').to_numpy(), (df['MultipleLines'] == 'Yes').to_numpy()] +
+        [(df[col] == 'Yes').to_numpy() for col in ADDON_COLS]
+    ).astype(np.float64)
+    coef, *_ = np.linalg.lstsq(design, monthly, rcond=None)
+    residuals = monthly - design @ coef
+
+    has_total = (tenure > 0) & ~np.isnan(total_charges)
+    ratio = total_charges[has_total] / (tenure[has_total] * monthly[has_total])
+    partner = (df['Partner'] == 'Yes').to_numpy()
+    dependents = (df['Dependents'] == 'Yes').to_numpy()
+
+    return {
+        'segments': segments,
+        'male': rate((df['gender'] == 'Male').to_numpy()),
+        'senior': rate(df['SeniorCitizen'].to_numpy(dtype=np.float64) > 0),
+        'partner': rate(partner),
+        'dependents': [rate(dependents[~partner]), rate(dependents[partner])],
+        'charges': {
+            'base': {internet: float(c) for internet, c in zip(INTERNET, coef[:len(INTERNET)])},
+            'phone': float(coef[len(INTERNET)]),
+            'multiple_lines': float(coef[len(INTERNET) + 1]),
+            'addons': coef[len(INTERNET) + 2:].tolist(),
+            'noise': float(residuals.std()),
+            'min': float(monthly.min()),
+            'max': float(monthly.max())
+        },
+        'total_charges_noise': float(np.std(ratio - 1)) if len(ratio) else 0.0
+    }
+
+
+def categorical(codes, col):
+    """Codes over the declared schema labels as a pandas Categorical"""
+    return pd.Categorical.from_codes(codes, categories=CATEGORY_LABELS[col])
+
+
+class TelcoGenerator:
+    """Samples raw Telco customers from fitted segment parameters
+
+    All columns are drawn with array operations: a (Contract, InternetService)
+    segment per customer, then every other column from that segment's rates.
+    Categorical columns come out as pandas Categoricals over the declared
+    schema labels, so chunks stay small and write as dictionary columns.
+    """
+
+    def __init__(self, params=None):
+        """
+        Args:
+            params: fit_params / default_params dict (defaults to the latter)
+        """
+        self.params = params or default_params()
+        segments = self.params['segments']
+        self.segment_p = np.array([s['p'] for s in segments]) / sum(s['p'] for s in segments)
+        self.contract = np.array([CONTRACTS.index(s['contract']) for s in segments])
+        self.internet = np.array([INTERNET.index(s['internet']) for s in segments])
+        self.tenure_quantiles = np.array([s['tenure_quantiles'] for s in segments], dtype=np.float64)
+        self.phone = np.array([s['phone'] for s in segments])
+        self.multiple_lines = np.array([s['multiple_lines'] for s in segments])
+        self.addons = np.array([s['addons'] for s in segments])
+        self.paperless = np.array([s['paperless'] for s in segments])
+        self.payment_cdf = np.cumsum([s['payment'] for s in segments], axis=1)
+        self.payment_cdf /= self.payment_cdf[:, -1:]
+        self.churn = np.array([s['churn'] for s in segments])
+
+    @classmethod
+    def fit(cls, df):
+        return cls(fit_params(df))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.params, f, indent=2)
+
+    def sample(self, n_rows, seed=0, start_id=0):
+        """n_rows raw customers; the same seed and start_id give the same rows"""
+        rng = np.random.default_rng(seed)
+        p = self.params
+        segment = rng.choice(len(self.segment_p), n_rows, p=self.segment_p)
+        internet = self.internet[segment]
+        no_internet = internet == INTERNET.index('No')
+
+        # Tenure: inverse CDF through the segment's quantiles
+        u = rng.random(n_rows)
+        tenure = np.empty(n_rows, dtype=np.int64)
+        for s, quantiles in enumerate(self.tenure_quantiles):
+            mask = segment == s
+            tenure[mask] = np.rint(np.interp(u[mask], TENURE_QUANTILES, quantiles))
+
+        phone = rng.random(n_rows) < self.phone[segment]
+        multiple = phone & (rng.random(n_rows) < self.multiple_lines[segment])
+        addons = rng.random((n_rows, len(ADDON_COLS))) < self.addons[segment]
+        partner = rng.random(n_rows) < p['partner']
+        dependents = rng.random(n_rows) < np.where(partner, p['dependents'][1], p['dependents'][0])
+        payment = (rng.random(n_rows)[:, None] > self.payment_cdf[segment]).sum(axis=1)
+        payment = np.minimum(payment, len(PAYMENTS) - 1)
+
+        charges = p['charges']
+        monthly = (np.array([charges['base'][i] for i in INTERNET])[internet] +
+                   charges['phone'] * phone + charges['multiple_lines'] * multiple +
+                   addons @ np.asarray(charges['addons']) +
+                   rng.normal(0, charges['noise'], n_rows))
+        monthly = np.round(np.clip(monthly, charges['min'], charges['max']), 2)
+        total = monthly * tenure * (1 + rng.normal(0, p['total_charges_noise'], n_rows))
+        # New customers have no bill yet: blank TotalCharges as in the export
+        total = np.where(tenure > 0, np.round(np.maximum(total, monthly), 2), np.nan)
+
+        bucket = np.digitize(tenure, CHURN_TENURE_EDGES, right=True)
+        churn = rng.random(n_rows) < self.churn[segment, bucket]
+
+        ids = pc.utf8_lpad(pa.array(np.arange(start_id, start_id + n_rows)).cast(pa.string()), 10, '0')
+        df = pd.DataFrame({
+            'customerID': ids.to_numpy(zero_copy_only=False),
+            'gender': categorical((rng.random(n_rows) < p['male']).astype(np.int8), 'gender'),
+            'SeniorCitizen': (rng.random(n_rows) < p['senior']).astype(np.int64),
+            'Partner': categorical(partner.astype(np.int8), 'Partner'),
+            'Dependents': categorical(dependents.astype(np.int8), 'Dependents'),
+            'tenure': tenure,
+            'PhoneService': categorical(phone.astype(np.int8), 'PhoneService'),
+            # No, No phone service, Yes
+            'MultipleLines': categorical(np.where(phone, 2 * multiple, 1).astype(np.int8),
+                                         'MultipleLines'),
+            'InternetService': categorical(internet.astype(np.int8), 'InternetService')
+        })
+        for i, col in enumerate(ADDON_COLS):
+            # No, No internet service, Yes
+            codes = np.where(no_internet, 1, 2 * addons[:, i]).astype(np.int8)
+            df[col] = categorical(codes, col)
+        df['Contract'] = categorical(self.contract[segment].astype(np.int8), 'Contract')
+        df['PaperlessBilling'] = categorical(
+            (rng.random(n_rows) < self.paperless[segment]).astype(np.int8), 'PaperlessBilling')
+        df['PaymentMethod'] = categorical(payment.astype(np.int8), 'PaymentMethod')
+        df['MonthlyCharges'] = monthly
+        df['TotalCharges'] = total
+        df['Churn'] = categorical(churn.astype(np.int8), 'Churn')
+        return df[COLUMNS]
+
+    def iter_chunks(self, n_rows, chunksize=1_000_000, seed=0):
+        """Yield n_rows customers in chunks, each from its own child seed"""
+        seeds = np.random.SeedSequence(seed)
+        for index, start in enumerate(range(0, n_rows, chunksize)):
+            child = np.random.SeedSequence(seeds.entropy, spawn_key=(index,))
+            yield self.sample(min(chunksize, n_rows - start), seed=child, start_id=start)
+
+    def write(self, path, n_rows, chunksize=1_000_000, seed=0):
+        """Stream n_rows customers to .csv or .parquet; memory stays one chunk"""
+        writer = None
+        try:
+            for chunk in self.iter_chunks(n_rows, chunksize, seed):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    if path.endswith('.parquet'):
+                        writer = pq.ParquetWriter(path, table.schema)
+                    else:
+                        writer = pcsv.CSVWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return n_rows
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic Telco customers")
+    parser.add_argument('-n', '--rows', type=int, default=1_000_000, help="Customers to generate")
+    parser.add_argument('-o', '--output', default='data/raw/synthetic_customers.csv',
+                        help="Output file (.csv or .parquet)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    parser.add_argument('--chunksize', type=int, default=1_000_000, help="Rows generated per chunk")
+    parser.add_argument('--fit', help="Fit the distributions from this Telco CSV first")
+    parser.add_argument('--params', help="Load generator parameters from JSON "
+                                         "(or, with --fit, save them there)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.fit:
+        generator = TelcoGenerator.fit(read_customers(args.fit))
+        print(f"✓ Fitted {len(generator.params['segments'])} segments from {args.fit}")
+        if args.params:
+            generator.save(args.params)
+            print(f"✓ Parameters saved to {args.params}")
+    elif args.params:
+        generator = TelcoGenerator.load(args.params)
+    else:
+        generator = TelcoGenerator()
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    start = time.perf_counter()
+    generator.write(args.output, args.rows, args.chunksize, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"✓ {args.rows:,} customers written to {args.output} "
+          f"({args.rows / elapsed:,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
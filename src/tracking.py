@@ -0,0 +1,143 @@
+"""
+Experiment Logging
+Batched MLflow writes on a background thread, with the model logged for the best run only
+"""
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import mlflow
+import mlflow.sklearn
+from mlflow import MlflowClient
+from mlflow.entities import Metric, Param
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def snapshot_artifacts(artifacts):
+    """Copy files to a fresh temporary directory; returns it (None if no files)
+
+    Training keeps rewriting models/best_model.pkl, so a queued write must
+    log the files as they were when the run finished, not when it runs.
+    """
+    if not artifacts:
+        return None
+    snapshot_dir = tempfile.mkdtemp(prefix='mlflow-artifacts-')
+    for path in artifacts:
+        shutil.copy2(path, os.path.join(snapshot_dir, os.path.basename(path)))
+    return snapshot_dir
+
+
+class RunLogger:
+    """Queues each run's MLflow writes for one writer thread
+
+    A run is created, filled with a single log_batch call and closed as
+    one job, so training never waits on the tracking store. Jobs run in
+    submission order. With log_models='best' the model and the local
+    artifacts are logged once, to the best run, when flush() is called
+    instead of after every run.
+    """
+
+    def __init__(self, experiment_name, synchronous=False, log_models='best'):
+        """
+        Args:
+            experiment_name: MLflow experiment the runs are logged to
+            synchronous: Write inline instead of on the background thread
+            log_models: 'best' (defer to flush, best run only) or 'all'
+                        (every run's model as it finishes)
+        """
+        if log_models not in ('best', 'all'):
+            raise ValueError(f"Unknown model logging mode: {log_models}")
+        self.experiment_id = mlflow.set_experiment(experiment_name).experiment_id
+        self.client = MlflowClient()
+        self.synchronous = synchronous
+        self.log_models = log_models
+        self.pool = None if synchronous else ThreadPoolExecutor(max_workers=1,
+                                                                thread_name_prefix='mlflow-log')
+        self.futures = []
+        self.best = None
+        self.runs_logged = 0
+        self.models_logged = 0
+
+    def submit(self, fn, *args):
+        """Run fn on the writer thread (or inline); a Future either way"""
+        if self.pool is not None:
+            future = self.pool.submit(fn, *args)
+        else:
+            future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as exc:
+                future.set_exception(exc)
+        self.futures.append(future)
+        return future
+
+    def write_run(self, run_name, params, metrics, start_time, end_time, tags):
+        run = self.client.create_run(self.experiment_id, start_time=start_time,
+                                     tags=tags, run_name=run_name)
+        run_id = run.info.run_id
+        self.client.log_batch(
+            run_id,
+            metrics=[Metric(key, float(value), end_time, 0) for key, value in metrics.items()],
+            params=[Param(key, str(value)) for key, value in params.items()]
+        )
+        self.client.set_terminated(run_id, end_time=end_time)
+        self.runs_logged += 1
+        return run_id
+
+    def log_run(self, run_name, params, metrics, start_time=None, tags=None):
+        """Queue one finished run; returns a Future of its run_id"""
+        return self.submit(self.write_run, run_name, params, metrics,
+                           start_time or now_ms(), now_ms(), tags)
+
+    def write_model(self, run, model, snapshot_dir):
+        try:
+            # Reopens the finished run on this thread (MLflow's active run is thread-local)
+            with mlflow.start_run(run_id=run.result()):
+                # cloudpickle: MLflow 3 defaults to skops, which rejects tree models
+                mlflow.sklearn.log_model(model, "model",
+                                         serialization_format=mlflow.sklearn.SERIALIZATION_FORMAT_CLOUDPICKLE)
+                if snapshot_dir is not None:
+                    mlflow.log_artifacts(snapshot_dir)
+        finally:
+            if snapshot_dir is not None:
+                shutil.rmtree(snapshot_dir, ignore_errors=True)
+        self.models_logged += 1
+
+    def log_model(self, run, model, artifacts=(), best=False):
+        """Log a run's model, or keep it for flush() if only the best is logged
+
+        Args:
+            run: Future from log_run
+            model: Fitted estimator
+            artifacts: Local files logged along with the model (best run only),
+                       copied now so later training writes cannot change them
+            best: Whether this run is the best so far
+        """
+        if self.log_models == 'all':
+            self.submit(self.write_model, run, model, snapshot_artifacts(artifacts) if best else None)
+        elif best:
+            if self.best is not None and self.best[2] is not None:
+                shutil.rmtree(self.best[2], ignore_errors=True)
+            self.best = (run, model, snapshot_artifacts(artifacts))
+
+    def flush(self):
+        """Write the deferred best model and wait for every queued write"""
+        if self.best is not None:
+            self.submit(self.write_model, *self.best)
+            self.best = None
+        futures, self.futures = self.futures, []
+        for future in futures:
+            future.result()
+
+    def close(self):
+        self.flush()
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def stats(self):
+        return {'runs_logged': self.runs_logged, 'models_logged': self.models_logged,
+                'pending': sum(not future.done() for future in self.futures)}
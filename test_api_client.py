@@ -0,0 +1,204 @@
+"""
+In-Process API Tests
+FastAPI endpoints through TestClient, with the lifespan startup and shutdown
+"""
+import sys
+sys.path.append('src')
+import io
+import json
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from bundle import load_bundle, save_bundle
+from cache import PredictionCache
+from inference import score_frame
+from serving import ModelServer
+from conftest import fit_engineer, make_customers, train_model
+
+
+@pytest.fixture
+def bundle_dir(tmp_path):
+    engineer, model, _, _ = train_model(make_customers(2000))
+    save_bundle(model, engineer, bundle_dir=tmp_path / 'bundle', bundle_version='v1')
+    return tmp_path / 'bundle'
+
+
+@pytest.fixture
+def client(bundle_dir, tmp_path, monkeypatch):
+    cache = PredictionCache()
+    monkeypatch.setattr(api, 'prediction_cache', cache)
+    monkeypatch.setattr(api, 'server', ModelServer(lambda: load_bundle(bundle_dir),
+                                                   bundle_dir=bundle_dir, cache=cache))
+    monkeypatch.setattr(api, 'JOBS_DIR', str(tmp_path / 'jobs'))
+    monkeypatch.setattr(api, 'JOB_WORKERS', 1)
+    monkeypatch.setattr(api, 'RELOAD_POLL_SECONDS', 0)
+    monkeypatch.setattr(api, 'ADMIN_TOKEN', None)
+    with TestClient(api.app) as client:
+        yield client
+    assert all(not worker.thread.is_alive() for worker in api.job_workers)
+
+
+def raw_customers(n, seed=1):
+    return make_customers(n, seed=seed).drop(columns=['Churn'])
+
+
+def csv_upload(df):
+    return {'file': ('customers.csv', df.to_csv(index=False).encode(), 'text/csv')}
+
+
+def customer_json(df):
+    return json.loads(df.drop(columns=['customerID']).head(1).to_json(orient='records'))[0]
+
+
+def test_startup_runs_in_lifespan_only(bundle_dir, tmp_path, monkeypatch):
+    """Importing the API starts nothing; the lifespan starts and stops the workers"""
+    jobs_dir = tmp_path / 'jobs'
+    monkeypatch.setattr(api, 'server', ModelServer(lambda: load_bundle(bundle_dir), bundle_dir=bundle_dir))
+    monkeypatch.setattr(api, 'JOBS_DIR', str(jobs_dir))
+    assert not jobs_dir.exists()
+
+    with TestClient(api.app) as client:
+        assert client.get('/health').json()['bundle_version'] == 'v1'
+        assert jobs_dir.exists()
+        workers = list(api.job_workers)
+        assert workers and all(worker.thread.is_alive() for worker in workers)
+    assert not any(worker.thread.is_alive() for worker in workers)
+
+
+def test_predict_is_cached(client):
+    """A repeated customer is answered from the cache with the same response"""
+    customer = customer_json(raw_customers(5))
+    first = client.post('/predict', json=customer)
+    second = client.post('/predict', json=customer)
+
+    assert first.status_code == 200 and second.json() == first.json()
+    cache = client.get('/metrics').json()['cache']
+    assert cache['hits'] == 1 and cache['misses'] == 1
+
+
+def test_saturated_executors_return_429(client):
+    """Requests past max_pending are refused with Retry-After instead of queueing"""
+    raw = raw_customers(50)
+    api.predict_executor.max_pending = 0
+    api.bulk_executor.max_pending = 0
+
+    response = client.post('/predict', json=customer_json(raw))
+    assert response.status_code == 429 and response.headers['Retry-After'] == '1'
+    assert client.post('/predict/bulk', files=csv_upload(raw)).status_code == 429
+    assert client.post('/predict/bulk/download', files=csv_upload(raw)).status_code == 429
+
+    executors = client.get('/metrics').json()['executors']
+    assert executors['predict']['rejected'] == 1 and executors['bulk']['rejected'] == 2
+
+
+def test_streamed_bulk_matches_in_memory(client):
+    """Chunked /predict/bulk gives the same report as scoring the upload at once"""
+    raw = raw_customers(1000)
+    in_memory = client.post('/predict/bulk', files=csv_upload(raw))
+    streamed = client.post('/predict/bulk?stream=true&chunksize=300', files=csv_upload(raw))
+
+    assert in_memory.status_code == 200 and streamed.status_code == 200
+    expected, report = in_memory.json(), streamed.json()
+    assert report['total_customers'] == 1000
+    for key in ['total_customers', 'high_risk_customers', 'medium_risk_customers',
+                'total_revenue_at_risk', 'intervention_plan']:
+        assert report[key] == expected[key]
+
+
+@pytest.mark.parametrize('fmt', ['ndjson', 'csv'])
+def test_bulk_download_streams_every_customer(client, bundle_dir, fmt):
+    """Every customer's probability comes back, in input order"""
+    raw = raw_customers(700)
+    response = client.post(f'/predict/bulk/download?format={fmt}&chunksize=250',
+                           files=csv_upload(raw))
+    assert response.status_code == 200
+
+    if fmt == 'csv':
+        results = pd.read_csv(io.StringIO(response.text))
+    else:
+        results = pd.read_json(io.StringIO(response.text), lines=True)
+    bundle = load_bundle(bundle_dir)
+    assert list(results['customerID']) == list(raw['customerID'])
+    assert np.allclose(results['churn_probability'], score_frame(bundle.pipeline, bundle.model, raw))
+    assert client.get('/metrics').json()['executors']['bulk']['pending'] == 0
+
+
+def test_bulk_download_rejects_bad_uploads(client):
+    """Bad input is a 400 before any body is streamed and frees the bulk slot"""
+    raw = raw_customers(300)
+    missing = client.post('/predict/bulk/download?format=csv',
+                          files=csv_upload(raw.drop(columns=['Contract'])))
+    assert missing.status_code == 400 and 'Bulk prediction error' in missing.json()['detail']
+    assert client.post('/predict/bulk/download?format=xml', files=csv_upload(raw)).status_code == 400
+
+    # An empty upload is still a valid, header-only download
+    empty = client.post('/predict/bulk/download?format=csv', files=csv_upload(raw.head(0)))
+    assert empty.status_code == 200
+    assert empty.text.strip().split(',') == api.RESULT_COLUMNS
+    assert client.get('/metrics').json()['executors']['bulk']['pending'] == 0
+
+
+def test_blank_total_charges_score_on_every_bulk_path(client, bundle_dir):
+    """Blank TotalCharges get the training median instead of NaN reaching the model"""
+    raw = raw_customers(400)
+    bundle = load_bundle(bundle_dir)
+    filled = raw.copy()
+    filled.loc[[0, 7], 'TotalCharges'] = bundle.pipeline.fill_values['TotalCharges']
+    blank = raw.astype({'TotalCharges': object})
+    blank.loc[[0, 7], 'TotalCharges'] = ' '
+
+    for url in ['/predict/bulk', '/predict/bulk?stream=true&chunksize=150']:
+        response = client.post(url, files=csv_upload(blank))
+        assert response.status_code == 200
+        expected = client.post(url, files=csv_upload(filled)).json()
+        for key in ['total_customers', 'high_risk_customers', 'medium_risk_customers']:
+            assert response.json()[key] == expected[key]
+        assert response.json()['total_revenue_at_risk'] == pytest.approx(expected['total_revenue_at_risk'])
+
+    response = client.post('/predict/bulk/download?format=csv', files=csv_upload(blank))
+    assert response.status_code == 200
+    results = pd.read_csv(io.StringIO(response.text))
+    assert np.allclose(results['churn_probability'],
+                       score_frame(bundle.pipeline, bundle.model, filled))
+
+
+def test_admin_reload_requires_token(client, bundle_dir, monkeypatch):
+    """Reload is disabled without CHURN_ADMIN_TOKEN and needs the matching header"""
+    assert client.post('/admin/reload').status_code == 403
+
+    monkeypatch.setattr(api, 'ADMIN_TOKEN', 'secret')
+    assert client.post('/admin/reload').status_code == 403
+    assert client.post('/admin/reload', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+
+    bundle = load_bundle(bundle_dir)
+    save_bundle(bundle.model, fit_engineer(make_customers(2000)), bundle_dir=bundle_dir,
+                bundle_version='v2')
+    response = client.post('/admin/reload', headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 200
+    assert response.json()['previous_version'] == 'v1' and response.json()['bundle_version'] == 'v2'
+    assert client.get('/health').json()['reloads'] == 1
+
+
+def test_job_lifecycle(client):
+    """A job is queued, scored in the background and its results downloaded"""
+    raw = raw_customers(900)
+    response = client.post('/jobs', files=csv_upload(raw))
+    assert response.status_code == 202
+    job_id = response.json()['job_id']
+
+    deadline = time.monotonic() + 30
+    job = client.get(f'/jobs/{job_id}').json()
+    while job['status'] in ('queued', 'running') and time.monotonic() < deadline:
+        time.sleep(0.05)
+        job = client.get(f'/jobs/{job_id}').json()
+
+    assert job['status'] == 'done' and job['rows_scored'] == 900
+    assert job['bundle_version'] == 'v1' and job['report']['total_customers'] == 900
+    results = pd.read_parquet(io.BytesIO(client.get(f'/jobs/{job_id}/results').content))
+    assert list(results['customerID']) == list(raw['customerID'])
+    assert client.get('/jobs/unknown').status_code == 404
+    assert client.get('/jobs/unknown/results').status_code == 404
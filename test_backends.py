@@ -0,0 +1,55 @@
+"""
+Scoring Backend Tests
+Raw booster and packed-tree scorers against the sklearn estimators
+"""
+import sys
+sys.path.append('src')
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+from xgboost import XGBClassifier
+from backends import TreeEnsembleScorer
+from bundle import load_bundle, save_bundle
+from inference import CompiledFeaturePipeline, predict_proba, score_frame
+from conftest import make_customers, train_model
+
+
+def test_booster_backend_matches_classifier(tmp_path):
+    """Bundled raw booster scores exactly like the XGBClassifier wrapper"""
+    customers = make_customers(500)
+    engineer, model, X, _ = train_model(
+        customers, XGBClassifier(n_estimators=20, max_depth=4, eval_metric='logloss'))
+
+    save_bundle(model, engineer, bundle_dir=tmp_path)
+    bundle = load_bundle(tmp_path, nthread=1)
+    assert bundle.backend == 'booster'
+
+    raw = customers.drop(columns=['Churn'])
+    expected = model.predict_proba(X)[:, 1]
+    assert np.array_equal(score_frame(bundle.pipeline, bundle.model, raw), expected)
+    assert load_bundle(tmp_path, backend='sklearn').backend == 'sklearn'
+
+
+@pytest.mark.parametrize("model", [
+    DecisionTreeClassifier(max_depth=10, min_samples_leaf=5, random_state=0),
+    RandomForestClassifier(n_estimators=30, max_depth=12, random_state=0)
+])
+def test_tree_compiler_matches_sklearn(model, tmp_path):
+    """Packed-node evaluator agrees with sklearn predict_proba"""
+    customers = make_customers(2000)
+    engineer, model, _, _ = train_model(customers, model)
+
+    save_bundle(model, engineer, bundle_dir=tmp_path)
+    bundle = load_bundle(tmp_path)
+    assert bundle.backend == 'trees'
+
+    X_new = CompiledFeaturePipeline.from_engineer(engineer).transform_frame(make_customers(3000, seed=1))
+    # Missing values follow each split's missing_go_to_left like sklearn
+    X_nan = X_new.copy()
+    X_nan[np.random.default_rng(0).random(X_nan.shape) < 0.1] = np.nan
+    for X in (X_new, X_nan):
+        expected = predict_proba(model, X)
+        assert np.allclose(predict_proba(bundle.model, X), expected, rtol=0, atol=1e-12)
+        assert np.allclose(predict_proba(TreeEnsembleScorer.from_model(model, batch_size=7), X),
+                           expected, rtol=0, atol=1e-12)
\ No newline at end of file
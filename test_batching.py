@@ -0,0 +1,71 @@
+"""
+Micro-Batching Tests
+Coalesced single-customer requests against one-by-one scoring
+"""
+import sys
+sys.path.append('src')
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from batching import MicroBatcher
+from inference import CompiledFeaturePipeline, predict_proba
+from conftest import make_customers, train_model
+
+
+def test_micro_batcher_matches_direct_scoring():
+    """Coalesced requests get the same probabilities as one-by-one scoring"""
+    customers = make_customers(300)
+    engineer, model, _, _ = train_model(customers)
+    pipeline = CompiledFeaturePipeline.from_engineer(engineer)
+
+    raw = customers.drop(columns=['customerID', 'Churn']).to_dict('records')
+    expected = [predict_proba(model, pipeline.transform_row(c))[0] for c in raw]
+
+    batcher = MicroBatcher(pipeline, model, max_batch_size=16, max_wait_ms=20)
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = list(pool.map(batcher.predict, raw))
+    batcher.close()
+
+    assert np.allclose(results, expected, rtol=0, atol=1e-12)
+    stats = batcher.stats()
+    assert stats['requests'] == len(raw)
+    assert stats['batches'] < len(raw)
+    assert max(stats['batch_size_histogram']) <= 16
+
+
+def test_micro_batcher_uses_one_frame_transform(monkeypatch):
+    """A batch is one transform_frame call; only a bad row falls back to transform_row"""
+    customers = make_customers(64, seed=1)
+    engineer, model, _, _ = train_model(customers)
+    pipeline = CompiledFeaturePipeline.from_engineer(engineer)
+
+    raw = customers.drop(columns=['customerID', 'Churn']).to_dict('records')
+    expected = [predict_proba(model, pipeline.transform_row(c))[0] for c in raw]
+    bad = dict(raw[0])
+    del bad['Contract']
+
+    calls = {'frame': 0, 'row': 0}
+    transform_frame, transform_row = pipeline.transform_frame, pipeline.transform_row
+
+    def count_frame(frame):
+        calls['frame'] += 1
+        return transform_frame(frame)
+
+    def count_row(customer):
+        calls['row'] += 1
+        return transform_row(customer)
+
+    monkeypatch.setattr(pipeline, 'transform_frame', count_frame)
+    monkeypatch.setattr(pipeline, 'transform_row', count_row)
+
+    # Everything is queued before the first request's wait runs out: one batch
+    batcher = MicroBatcher(pipeline, model, max_batch_size=len(raw) + 1, max_wait_ms=2000)
+    futures = [batcher.submit(c) for c in raw] + [batcher.submit(bad)]
+    results = [future.result() for future in futures[:-1]]
+    with pytest.raises(KeyError):
+        futures[-1].result()
+    batcher.close()
+
+    assert np.allclose(results, expected, rtol=0, atol=1e-12)
+    assert batcher.stats()['batches'] == 1
+    assert calls == {'frame': 1, 'row': 1}
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""
+Benchmark Suite Tests
+Stage coverage and regression detection of benchmark_suite.py
+"""
+import sys
+sys.path.append('src')
+import pytest
+from benchmark_suite import find_regressions, run_suite
+
+
+def timings(**stages):
+    return {'results': {'1000': {name: {'seconds': seconds, 'peak_mb': 1.0}
+                                 for name, seconds in stages.items()}}}
+
+
+def test_find_regressions_threshold_and_noise_floor():
+    baseline = timings(read_csv=0.100, model_predict=0.0010, fused_transform=0.050)
+    current = timings(read_csv=0.160, model_predict=0.0025, fused_transform=0.070,
+                      api_bulk=1.0)
+
+    regressions = find_regressions(current, baseline, threshold=1.5)
+
+    # model_predict is 2.5x slower but only by 1.5 ms; api_bulk has no baseline
+    assert [(r['stage'], r['size']) for r in regressions] == [('read_csv', 1000)]
+    assert regressions[0]['ratio'] == pytest.approx(1.6)
+    assert find_regressions(current, baseline, threshold=2.0) == []
+
+
+def test_run_suite_reports_every_stage():
+    results = run_suite(sizes=(1,), api=False)
+
+    stages = results['results']['1']
+    assert set(stages) == {'read_csv', 'business_features', 'encode_features', 'prepare_features',
+                           'fused_transform', 'model_predict', 'business_report'}
+    assert all(s['seconds'] > 0 and s['peak_mb'] >= 0 for s in stages.values())
+    assert find_regressions(results, results) == []
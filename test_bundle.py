@@ -0,0 +1,88 @@
+"""
+Model Bundle Tests
+Manifest round trips, schema hashes and format checks
+"""
+import sys
+sys.path.append('src')
+import json
+import numpy as np
+import pytest
+from bundle import BundleError, load_bundle, save_bundle
+from inference import CompiledFeaturePipeline
+from conftest import make_customers, train_model
+
+
+def test_bundle_round_trip(tmp_path):
+    """Bundles rebuild the same pipeline and reject tampered schemas"""
+    customers = make_customers(300)
+    engineer, model, X, y = train_model(customers)
+
+    save_bundle(model, engineer, bundle_dir=tmp_path, bundle_version="test")
+    bundle = load_bundle(tmp_path)
+    raw = customers.drop(columns=['Churn'])
+    assert bundle.version == "test"
+    assert np.array_equal(bundle.pipeline.transform_frame(raw),
+                          CompiledFeaturePipeline.from_engineer(engineer).transform_frame(raw))
+
+    manifest_path = tmp_path / 'manifest.json'
+    manifest = json.loads(manifest_path.read_text())
+    manifest['vocabularies']['Contract'].append("Three year")
+    manifest_path.write_text(json.dumps(manifest))
+    with pytest.raises(BundleError):
+        load_bundle(tmp_path)
+
+
+def test_bundle_format_requires_unknown_codes(tmp_path):
+    """Format 1 manifests and engineers without fallback codes are refused"""
+    customers = make_customers(300)
+    engineer, model, X, y = train_model(customers)
+    save_bundle(model, engineer, bundle_dir=tmp_path / 'bundle')
+
+    manifest_path = tmp_path / 'bundle' / 'manifest.json'
+    manifest = json.loads(manifest_path.read_text())
+    manifest['unknown_codes']['Contract'] = (manifest['unknown_codes']['Contract'] + 1) % 3
+    manifest_path.write_text(json.dumps(manifest))
+    with pytest.raises(BundleError, match="Schema hash mismatch"):
+        load_bundle(tmp_path / 'bundle')
+
+    del manifest['unknown_codes']
+    manifest['format_version'] = 1
+    manifest_path.write_text(json.dumps(manifest))
+    with pytest.raises(BundleError, match="predates unknown_codes"):
+        load_bundle(tmp_path / 'bundle')
+
+    # Engineers pickled before unknown_codes existed: recovered from the training data
+    expected = engineer.unknown_codes
+    del engineer.unknown_codes
+    with pytest.raises(BundleError, match="no unknown_codes"):
+        save_bundle(model, engineer, bundle_dir=tmp_path / 'bundle')
+    assert engineer.fit_unknown_codes(engineer.create_business_features(customers)) == expected
+    save_bundle(model, engineer, bundle_dir=tmp_path / 'bundle')
+    assert load_bundle(tmp_path / 'bundle').pipeline.unknown_codes == expected
+
+def test_bundle_format_requires_fill_values(tmp_path):
+    """Format 2 manifests and engineers without training medians are refused"""
+    customers = make_customers(300)
+    engineer, model, _, _ = train_model(customers)
+    manifest = save_bundle(model, engineer, bundle_dir=tmp_path / 'bundle')
+    assert manifest['fill_values'] == {'TotalCharges': customers['TotalCharges'].median()}
+
+    manifest_path = tmp_path / 'bundle' / 'manifest.json'
+    manifest['fill_values']['TotalCharges'] += 1
+    manifest_path.write_text(json.dumps(manifest))
+    with pytest.raises(BundleError, match="Schema hash mismatch"):
+        load_bundle(tmp_path / 'bundle')
+
+    del manifest['fill_values']
+    manifest['format_version'] = 2
+    manifest_path.write_text(json.dumps(manifest))
+    with pytest.raises(BundleError, match="predates fill_values"):
+        load_bundle(tmp_path / 'bundle')
+
+    del engineer.fill_values
+    with pytest.raises(BundleError, match="no fill_values"):
+        save_bundle(model, engineer, bundle_dir=tmp_path / 'bundle')
+    engineer.fit_fill_values(customers)
+    save_bundle(model, engineer, bundle_dir=tmp_path / 'bundle')
+    assert load_bundle(tmp_path / 'bundle').pipeline.fill_values == {
+        'TotalCharges': customers['TotalCharges'].median()}
@@ -0,0 +1,108 @@
+"""
+Business Impact Tests
+Streamed and vectorized report figures against the reference calculator
+"""
+import sys
+sys.path.append('src')
+import numpy as np
+import pandas as pd
+import pytest
+from business import BusinessImpactCalculator, BusinessReportAccumulator
+
+
+def make_scored(n, seed=0):
+    """Random scored customers with distinct churn probabilities"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'customerID': [f"{i:06d}-TEST" for i in range(n)],
+        'tenure': rng.integers(0, 73, n),
+        'MonthlyCharges': np.round(rng.uniform(18, 120, n), 2),
+        'churn_probability': rng.permutation(n) / n
+    })
+
+
+def reference_report(calc, df, top_n):
+    """Report figures computed with full sorts and repeated filters"""
+    df_sorted = df.sort_values('churn_probability', ascending=False)
+    targeted = df_sorted.head(top_n) if top_n else df_sorted[df_sorted['churn_probability'] >= 0.5]
+    probs = df['churn_probability']
+    return {
+        'total_customers': len(df),
+        'high_risk_customers': int((probs >= 0.7).sum()),
+        'medium_risk_customers': int(((probs >= 0.4) & (probs < 0.7)).sum()),
+        'total_revenue_at_risk': df.loc[probs >= 0.5, 'MonthlyCharges'].sum() * 12,
+        'intervention_plan': calc.intervention_metrics(len(targeted), targeted['MonthlyCharges'].sum()),
+        'tier_summary': calc.segment_customers(df)[1]
+    }
+
+
+def assert_reports_match(report, expected):
+    for key in ['total_customers', 'high_risk_customers', 'medium_risk_customers']:
+        assert report[key] == expected[key]
+    assert report['total_revenue_at_risk'] == pytest.approx(expected['total_revenue_at_risk'])
+    for key, value in expected['intervention_plan'].items():
+        assert report['intervention_plan'][key] == pytest.approx(value)
+    pd.testing.assert_frame_equal(report['tier_summary'], expected['tier_summary'],
+                                  check_dtype=False)
+
+
+@pytest.mark.parametrize("top_n", [500, None])
+def test_report_matches_reference(top_n):
+    """One-pass report gives the same figures as sorting and filtering"""
+    calc = BusinessImpactCalculator()
+    df = make_scored(5000)
+    report, df_segmented = calc.generate_business_report(df, top_n=top_n)
+
+    assert_reports_match(report, reference_report(calc, df, top_n))
+    assert calc.calculate_intervention_roi(df, top_n=top_n) == pytest.approx(
+        reference_report(calc, df, top_n)['intervention_plan'])
+    assert list(df_segmented['risk_tier']) == [calc.assign_risk_tier(p) for p in df['churn_probability']]
+
+
+@pytest.mark.parametrize("top_n", [500, None])
+def test_accumulator_matches_report(top_n):
+    """Chunked aggregates give the same report as the in-memory calculator"""
+    calc = BusinessImpactCalculator()
+    df = make_scored(5000)
+
+    accumulator = BusinessReportAccumulator(calc, top_n=top_n)
+    for start in range(0, len(df), 700):
+        accumulator.update(df.iloc[start:start + 700])
+
+    assert_reports_match(accumulator.result(), reference_report(calc, df, top_n))
+
+
+@pytest.mark.parametrize("top_n", [3, None])
+def test_blank_charges_count_as_zero(top_n):
+    """A missing MonthlyCharges does not turn the revenue figures into NaN"""
+    calc = BusinessImpactCalculator()
+    df = pd.DataFrame({'churn_probability': [0.9, 0.8, 0.2, 0.6],
+                       'MonthlyCharges': [50, np.nan, 30, 20], 'tenure': [1, 2, 3, 4]})
+
+    roi = calc.calculate_intervention_roi(df, top_n=top_n)
+    # The three targeted customers: (50 + 20) * 12 a year at risk, as pandas sums it
+    assert roi == pytest.approx(calc.intervention_metrics(3, df['MonthlyCharges'][[0, 1, 3]].sum()))
+    assert roi['expected_revenue_saved'] == pytest.approx(840.0 * calc.success_rate)
+
+    report, _ = calc.generate_business_report(df, top_n=top_n)
+    assert report['total_revenue_at_risk'] == pytest.approx(840.0)
+    assert_reports_match(report, reference_report(calc, df, top_n))
+
+
+def test_vectorized_methods_match_scalar():
+    """Array-native methods agree exactly with the scalar versions"""
+    calc = BusinessImpactCalculator()
+    df = make_scored(2000, seed=1)
+    probs = np.concatenate([df['churn_probability'].to_numpy(), [0.0, 0.4, 0.7, 1.0, 0.39999, 0.69999]])
+    tenure = np.resize(df['tenure'].to_numpy(), len(probs))
+    charges = np.resize(df['MonthlyCharges'].to_numpy(), len(probs))
+
+    values = calc.calculate_customer_lifetime_values(charges, tenure)
+    assert values.tolist() == [calc.calculate_customer_lifetime_value(m, t)
+                               for m, t in zip(charges, tenure)]
+    assert calc.calculate_risk_scores(probs).tolist() == [calc.calculate_risk_score(p) for p in probs]
+    assert calc.assign_risk_tiers(probs).tolist() == [calc.assign_risk_tier(p) for p in probs]
+    assert calc.recommend_actions(probs, values).tolist() == [
+        calc.recommend_action(p, v) for p, v in zip(probs, values)
+    ]
+    assert calc.recommend_actions(probs).tolist() == [calc.recommend_action(p) for p in probs]
@@ -0,0 +1,41 @@
+"""
+Prediction Cache Tests
+Key normalization, LRU eviction, expiry and invalidation
+"""
+import sys
+sys.path.append('src')
+import numpy as np
+import pytest
+from cache import PredictionCache, cache_key
+from inference import CompiledFeaturePipeline, predict_proba
+from conftest import make_customers, train_model
+
+
+def test_prediction_cache_lru_ttl_and_invalidation(monkeypatch):
+    """Normalized keys, LRU eviction, expiry and model-version invalidation"""
+    customer = make_customers(1).drop(columns=['customerID', 'Churn']).iloc[0].to_dict()
+    cache = PredictionCache(maxsize=2, ttl_seconds=60, model_version='v1')
+
+    cache.put(customer, 0.42)
+    variant = dict(customer, tenure=float(customer['tenure']))
+    assert cache.get(variant) == 0.42
+
+    cache.put(dict(customer, tenure=1), 0.1)
+    cache.put(dict(customer, tenure=2), 0.2)
+    assert cache.get(customer) is None
+    assert cache.get(dict(customer, tenure=1)) == 0.1
+    assert cache.stats()['evictions'] == 1
+
+    import cache as cache_module
+    now = cache_module.time.monotonic()
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now + 61)
+    assert cache.get(dict(customer, tenure=2)) is None
+    assert cache.stats()['expirations'] == 1
+    monkeypatch.undo()
+
+    cache.put(customer, 0.42)
+    cache.set_model_version('v2')
+    assert cache.get(customer) is None
+    stats = cache.stats()
+    assert stats['size'] == 0 and stats['invalidations'] == 1
+    assert stats['hits'] == 2 and stats['hit_rate'] == pytest.approx(2 / 5)
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Incremental Retraining Tests
+Online scaler update for linear models, continued training and the AUC gate
+"""
+import sys
+sys.path.append('src')
+import numpy as np
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+from inference import CompiledFeaturePipeline
+from incremental import model_size, prepare_update
+from model import ChurnModelTrainer
+from search import build_model
+from synthetic import TelcoGenerator
+from conftest import fit_engineer
+
+
+@pytest.fixture
+def months(tmp_path):
+    first = TelcoGenerator().sample(4000, seed=0)
+    second = TelcoGenerator().sample(3000, seed=1, start_id=4000)
+    # Prices went up: the scaler statistics move
+    second['MonthlyCharges'] *= 1.1
+    second['TotalCharges'] *= 1.1
+    path = str(tmp_path / 'month2.csv')
+    second.to_csv(path, index=False)
+    first['Churn'] = (first['Churn'] == 'Yes').astype(int)
+    return first, second, path
+
+
+@pytest.mark.parametrize('family', ['Logistic Regression', 'Random Forest', 'XGBoost'])
+def test_prepared_model_predicts_the_same(months, family):
+    """Before further training, the update scores held-out customers like the original"""
+    first, second, _ = months
+    engineer = fit_engineer(first)
+    X = CompiledFeaturePipeline.from_engineer(engineer).transform_frame(first)
+    model = build_model(family, {'n_estimators': 30} if family != 'Logistic Regression' else {})
+    model.fit(X, first['Churn'])
+
+    updated, updated_engineer = prepare_update(model, engineer, second)
+    if family == 'Logistic Regression':
+        # Coefficients move to the updated scaler: exact up to float32 feature rounding
+        assert not np.allclose(updated_engineer.scaler.mean_, engineer.scaler.mean_)
+        atol = 1e-6
+    else:
+        # Trees keep their scaler and thresholds: bit-identical
+        assert updated_engineer is engineer and updated is not model
+        atol = 0
+
+    held_out = TelcoGenerator().sample(3000, seed=2, start_id=7000)
+    held_out['MonthlyCharges'] *= 1.1
+    held_out['TotalCharges'] *= 1.1
+    before = model.predict_proba(CompiledFeaturePipeline.from_engineer(engineer).transform_frame(held_out))
+    after = updated.predict_proba(
+        CompiledFeaturePipeline.from_engineer(updated_engineer).transform_frame(held_out))
+    assert np.allclose(before, after, rtol=0, atol=atol)
+
+
+def test_incremental_xgboost_is_gated(months, tmp_path, monkeypatch):
+    """Rounds are added to the booster; the model is only saved when AUC holds up"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('MLFLOW_TRACKING_URI', f"sqlite:///{tmp_path / 'mlflow.db'}")
+    first, _, path = months
+    engineer = fit_engineer(first)
+    X = CompiledFeaturePipeline.from_engineer(engineer).transform_frame(first)
+    model = build_model('XGBoost', {'n_estimators': 40, 'max_depth': 4}).fit(X, first['Churn'])
+    trainer = ChurnModelTrainer(experiment_name='incremental-test')
+    trainer.best_score = 0.99
+
+    # A gate no update can pass leaves the saved artifacts alone
+    _, _, accepted = trainer.train_incremental(model, engineer, path, xgb_rounds=10,
+                                               max_auc_drop=-1)
+    assert not accepted and not (tmp_path / 'models' / 'best_model.pkl').exists()
+
+    metrics, updated, accepted = trainer.train_incremental(model, engineer, path, xgb_rounds=10,
+                                                           max_auc_drop=1)
+    assert accepted and metrics['roc_auc'] > 0.75
+    assert model_size(trainer.best_model) == 50 and model_size(model) == 40
+    # Trees keep the scaler they were trained with; the trainer's best AUC is untouched
+    assert updated is engineer and trainer.best_score == 0.99
+    assert (tmp_path / 'models' / 'best_model.pkl').exists()
+
+
+def test_incremental_logistic_regression_updates_scaler(months, tmp_path, monkeypatch):
+    """A linear model continues on the scaler updated with the new training rows"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('MLFLOW_TRACKING_URI', f"sqlite:///{tmp_path / 'mlflow.db'}")
+    first, _, path = months
+    engineer = fit_engineer(first)
+    X = CompiledFeaturePipeline.from_engineer(engineer).transform_frame(first)
+    model = build_model('Logistic Regression', {}).fit(X, first['Churn'])
+    trainer = ChurnModelTrainer(experiment_name='incremental-test')
+
+    metrics, updated, accepted = trainer.train_incremental(model, engineer, path, max_auc_drop=1)
+    assert accepted and metrics['roc_auc'] > 0.75
+    assert updated.scaler.n_samples_seen_ == 4000 + 2400
+    assert engineer.scaler.n_samples_seen_ == 4000
+
+
+def test_unsupported_model_fails_before_loading(months, tmp_path, monkeypatch):
+    """A model that cannot be extended is refused before the extract is read"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('MLFLOW_TRACKING_URI', f"sqlite:///{tmp_path / 'mlflow.db'}")
+    first, _, path = months
+    engineer = fit_engineer(first)
+    X = CompiledFeaturePipeline.from_engineer(engineer).transform_frame(first)
+    model = DecisionTreeClassifier(max_depth=4).fit(X, first['Churn'])
+    trainer = ChurnModelTrainer(experiment_name='incremental-test')
+
+    def no_loading(path):
+        raise AssertionError("extract loaded before the model type was checked")
+
+    monkeypatch.setattr(engineer, 'load_data', no_loading)
+    with pytest.raises(ValueError, match="DecisionTreeClassifier cannot be trained incrementally"):
+        trainer.train_incremental(model, engineer, path)
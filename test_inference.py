@@ -0,0 +1,140 @@
+"""
+Inference Path Tests
+Parity of the compiled single-row and frame paths with the DataFrame pipeline
+"""
+import sys
+sys.path.append('src')
+import numpy as np
+import pandas as pd
+from features import ChurnFeatureEngineer
+import inference
+from inference import CompiledFeaturePipeline
+from conftest import fit_engineer, make_customers
+
+
+def dataframe_features(engineer, customer):
+    """Reference single-row features via the DataFrame pipeline"""
+    df = pd.DataFrame([customer])
+    df = engineer.create_business_features(df)
+    df = engineer.encode_features(df, fit=False)
+    X, _ = engineer.prepare_features(df, target_col=None, fit=False)
+    return X.to_numpy(dtype=np.float64)
+
+
+def dataframe_frame(engineer, df):
+    """Reference feature matrix via the DataFrame pipeline"""
+    df = engineer.encode_features(engineer.create_business_features(df), fit=False)
+    X, _ = engineer.prepare_features(df, target_col=None, fit=False)
+    return X.to_numpy(dtype=np.float64)
+
+
+def test_compiled_row_matches_dataframe_path():
+    """Compiled features are bit-identical to the DataFrame pipeline"""
+    customers = make_customers(500)
+    engineer = fit_engineer(customers)
+    pipeline = CompiledFeaturePipeline.from_engineer(engineer)
+
+    raw = customers.drop(columns=['customerID', 'Churn'])
+    for customer in raw.to_dict('records'):
+        expected = dataframe_features(engineer, customer)
+        assert np.array_equal(pipeline.transform_row(customer), expected.astype(np.float32))
+
+
+def test_compiled_row_tenure_edges():
+    """Tenure bucket boundaries follow pd.cut semantics"""
+    customers = make_customers(200)
+    engineer = fit_engineer(customers)
+    pipeline = CompiledFeaturePipeline.from_engineer(engineer)
+
+    customer = customers.drop(columns=['customerID', 'Churn']).iloc[0].to_dict()
+    for tenure in [0, 1, 12, 13, 36, 37, 72]:
+        customer['tenure'] = tenure
+        expected = dataframe_features(engineer, customer)
+        assert np.array_equal(pipeline.transform_row(customer), expected.astype(np.float32))
+
+
+def test_unseen_labels_use_fallback_codes():
+    """Unseen categories get the most frequent training code on every path"""
+    customers = make_customers(200)
+    engineer = fit_engineer(customers)
+    pipeline = CompiledFeaturePipeline.from_engineer(engineer)
+    contract_idx = pipeline.feature_names.index('Contract')
+    gender_idx = pipeline.feature_names.index('gender')
+
+    raw = customers.drop(columns=['customerID', 'Churn'])
+    mode = pipeline.vocabularies['Contract'][engineer.unknown_codes['Contract']]
+    assert (raw['Contract'] == mode).sum() == raw['Contract'].value_counts().max()
+    gender_mode = ['Female', 'Male'][engineer.unknown_codes['gender']]
+    unseen = raw.head(3).assign(Contract="Three year", gender="Unknown")
+    expected = raw.head(3).assign(Contract=mode, gender=gender_mode)
+
+    X = pipeline.transform_frame(unseen)
+    assert np.array_equal(X, pipeline.transform_frame(expected))
+    assert np.array_equal(X[:1], pipeline.transform_row(unseen.iloc[0].to_dict()))
+    assert np.array_equal(X, dataframe_frame(engineer, unseen).astype(np.float32))
+    assert X[0, contract_idx] == engineer.unknown_codes['Contract']
+    assert X[0, gender_idx] == engineer.unknown_codes['gender']
+
+
+def test_encode_features_matches_label_encoder():
+    """Category-code encoding reproduces the per-column LabelEncoder loop"""
+    from sklearn.preprocessing import LabelEncoder
+    from schema import BINARY_COLS, BINARY_MAP, MULTI_COLS
+
+    customers = make_customers(1000)
+    engineer = ChurnFeatureEngineer()
+    df = engineer.create_business_features(customers)
+    encoded = engineer.encode_features(df, fit=True)
+
+    for col in BINARY_COLS:
+        assert np.array_equal(encoded[col], df[col].map(BINARY_MAP))
+    for col in MULTI_COLS:
+        reference = LabelEncoder().fit(df[col].astype(str))
+        assert list(engineer.label_encoders[col].classes_) == list(reference.classes_)
+        assert np.array_equal(encoded[col], reference.transform(df[col].astype(str)))
+
+
+def test_compiled_frame_matches_dataframe_path(monkeypatch):
+    """Fused frame transform equals the three-stage DataFrame pipeline"""
+    # Several row blocks, the last one partial
+    monkeypatch.setattr(inference, 'FRAME_BLOCK_ROWS', 300)
+    customers = make_customers(2000)
+    customers.loc[:9, 'tenure'] = [0, 1, 12, 13, 36, 37, 72, 0, 5, 72]
+    engineer = fit_engineer(customers)
+    pipeline = CompiledFeaturePipeline.from_engineer(engineer)
+
+    raw = customers.drop(columns=['Churn'])
+    df = engineer.encode_features(engineer.create_business_features(raw), fit=False)
+    expected, _ = engineer.prepare_features(df, target_col=None, fit=False)
+
+    expected = expected.to_numpy(dtype=np.float64)
+
+    # One contiguous float32 matrix, rounded once from the float64 values
+    X = pipeline.transform_frame(raw)
+    assert X.dtype == np.float32 and X.flags['C_CONTIGUOUS']
+    assert np.array_equal(X, expected.astype(np.float32))
+
+    # float64 output is bit-identical
+    exact = CompiledFeaturePipeline.from_engineer(engineer, dtype=np.float64)
+    assert np.array_equal(exact.transform_frame(raw), expected)
+    assert np.array_equal(exact.transform_row(raw.iloc[0].to_dict()), expected[:1])
+
+def test_blank_total_charges_use_training_median():
+    """Missing TotalCharges score as the training median on every path"""
+    customers = make_customers(500)
+    engineer = fit_engineer(customers)
+    pipeline = CompiledFeaturePipeline.from_engineer(engineer)
+    median = customers['TotalCharges'].median()
+    assert pipeline.fill_values == {'TotalCharges': median}
+
+    raw = customers.drop(columns=['customerID', 'Churn']).head(5)
+    blank = raw.assign(TotalCharges=[np.nan, None, 1.0, np.nan, 2.0])
+    filled = blank.assign(TotalCharges=blank['TotalCharges'].fillna(median))
+
+    X = pipeline.transform_frame(blank)
+    assert not np.isnan(X).any()
+    assert np.array_equal(X, pipeline.transform_frame(filled))
+    assert np.array_equal(X, dataframe_frame(engineer, blank).astype(np.float32))
+    for i, customer in enumerate(blank.to_dict('records')):
+        assert np.array_equal(pipeline.transform_row(customer), X[i:i + 1])
+    assert np.array_equal(pipeline.transform_row(dict(raw.iloc[0], TotalCharges=None)), X[:1])
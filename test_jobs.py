@@ -0,0 +1,121 @@
+"""
+Bulk Job Queue Tests
+Queued jobs produce the same summary as the in-memory business report
+"""
+import sys
+sys.path.append('src')
+import io
+import os
+import threading
+import time
+import pandas as pd
+import pytest
+import jobs
+from business import BusinessImpactCalculator
+from bundle import load_bundle, save_bundle
+from inference import predict_proba
+from jobs import JobStore, JobWorker, LeaseLost
+from schema import read_customers
+from serving import ModelServer
+from conftest import make_customers, train_model
+
+
+@pytest.fixture
+def server(tmp_path):
+    engineer, model, _, _ = train_model(make_customers(2000))
+    save_bundle(model, engineer, bundle_dir=tmp_path / 'bundle', bundle_version='v1')
+    server = ModelServer(lambda: load_bundle(tmp_path / 'bundle'))
+    server.load()
+    yield server
+    server.close()
+
+
+def test_job_summary_and_results_match_report(server, tmp_path):
+    """A queued job records progress, the business report and every result row"""
+    raw = make_customers(3000, seed=1).drop(columns=['Churn'])
+    calc = BusinessImpactCalculator()
+    store = JobStore(tmp_path / 'jobs')
+    worker = JobWorker(store, server, calc, chunksize=700)
+
+    csv = raw.to_csv(index=False).encode()
+    job_id = store.submit(io.BytesIO(csv))
+    assert store.get(job_id)['status'] == 'queued'
+    assert worker.run_once() == job_id
+    assert worker.run_once() is None
+
+    # Jobs ingest with the declared schema (float32 numerics)
+    state = server.state
+    raw = read_customers(io.BytesIO(csv), state.pipeline.vocabularies)
+    probs = predict_proba(state.model, state.pipeline.transform_frame(raw))
+    expected, _ = calc.generate_business_report(raw.assign(churn_probability=probs))
+
+    job = store.get(job_id)
+    assert job['status'] == 'done' and job['bundle_version'] == 'v1'
+    assert job['rows_scored'] == len(raw) and job['rows_per_sec'] > 0
+    report = job['report']
+    for key in ['total_customers', 'high_risk_customers', 'medium_risk_customers']:
+        assert report[key] == expected[key]
+    assert report['total_revenue_at_risk'] == pytest.approx(expected['total_revenue_at_risk'])
+    assert report['intervention_plan'] == pytest.approx(expected['intervention_plan'])
+
+    results = pd.read_parquet(store.results_path(job_id))
+    assert list(results['customerID']) == list(raw['customerID'])
+    assert results['churn_probability'].to_numpy() == pytest.approx(probs, abs=1e-12)
+
+
+def test_failed_jobs(server, tmp_path):
+    """Bad input fails only its own job"""
+    store = JobStore(tmp_path / 'jobs')
+    worker = JobWorker(store, server, BusinessImpactCalculator())
+
+    bad = store.submit(io.BytesIO(b"x,y\n1,2\n"))
+    assert worker.run_once() == bad
+    assert store.get(bad)['status'] == 'failed' and store.get(bad)['error']
+    # No results and no partial file left behind
+    assert os.listdir(store.job_dir(bad)) == ['input.csv']
+
+
+def test_only_stale_jobs_are_requeued(server, tmp_path, monkeypatch):
+    """Restarts leave leased jobs alone; an abandoned job is rerun and its old worker cut off"""
+    store = JobStore(tmp_path / 'jobs', lease_seconds=60)
+    raw = make_customers(500, seed=1).drop(columns=['Churn'])
+    job_id = store.submit(io.BytesIO(raw.to_csv(index=False).encode()))
+    assert store.claim('live-worker') == job_id
+
+    # Another API process starting up must not take over a live job
+    assert JobStore(tmp_path / 'jobs', lease_seconds=60).requeue_stale() == 0
+    assert store.get(job_id)['status'] == 'running'
+
+    # The worker stops heartbeating past its lease
+    now = time.time()
+    monkeypatch.setattr(jobs.time, 'time', lambda: now + 61)
+    assert store.requeue_stale() == 1
+    monkeypatch.undo()
+    with pytest.raises(LeaseLost):
+        store.update(job_id, worker_id='live-worker', rows_scored=1)
+
+    worker = JobWorker(store, server, BusinessImpactCalculator())
+    assert worker.run_once() == job_id
+    job = store.get(job_id)
+    assert job['status'] == 'done' and job['rows_scored'] == len(raw)
+    assert sorted(os.listdir(store.job_dir(job_id))) == ['input.csv', 'results.parquet']
+
+
+def test_heartbeats_keep_the_lease(server, tmp_path):
+    """A running job is renewed while its worker is alive and goes stale once it stops"""
+    store = JobStore(tmp_path / 'jobs', lease_seconds=0.3)
+    worker = JobWorker(store, server, BusinessImpactCalculator())
+    job_id = store.submit(io.BytesIO(b"x\n1\n"))
+    assert store.claim(worker.worker_id) == job_id
+
+    finished = threading.Event()
+    heartbeat = threading.Thread(target=worker.keep_leased, args=(job_id, finished))
+    heartbeat.start()
+    time.sleep(0.6)
+    assert store.requeue_stale() == 0
+    finished.set()
+    heartbeat.join()
+
+    time.sleep(0.4)
+    assert store.requeue_stale() == 1
+    assert store.get(job_id)['status'] == 'queued'
@@ -0,0 +1,88 @@
+"""
+Out-of-Core Training Tests
+Streamed engineer fit and chunked XGBoost training
+"""
+import sys
+sys.path.append('src')
+import joblib
+import numpy as np
+import pytest
+from sklearn.metrics import (accuracy_score, f1_score, precision_score, recall_score,
+                             roc_auc_score)
+from features import ChurnFeatureEngineer
+from model import ChurnModelTrainer
+from outofcore import StreamingMetrics, fit_engineer
+from schema import NUM_COLS
+from synthetic import TelcoGenerator
+
+
+@pytest.fixture
+def customers_csv(tmp_path):
+    raw = TelcoGenerator().sample(6000, seed=3)
+    # Blank TotalCharges for some new customers, filled with the median
+    raw.loc[::250, 'tenure'] = 0
+    raw.loc[::250, 'TotalCharges'] = np.nan
+    path = str(tmp_path / 'customers.csv')
+    raw.to_csv(path, index=False)
+    return path
+
+
+def test_streamed_fit_matches_in_memory_fit(customers_csv):
+    """Vocabularies, fallback and fill values, scaler and feature order as prepare_data_pipeline fits them"""
+    expected = ChurnFeatureEngineer()
+    df = expected.load_data(customers_csv)
+    expected.prepare_features(expected.encode_features(expected.create_business_features(df)))
+
+    engineer, fitter = fit_engineer(customers_csv, chunksize=1000)
+    assert fitter.n_rows == 6000 and fitter.n_missing == 24
+    assert engineer.feature_names == expected.feature_names
+    assert engineer.unknown_codes == expected.unknown_codes
+    assert engineer.fill_values == expected.fill_values
+    for col, encoder in expected.label_encoders.items():
+        assert list(engineer.label_encoders[col].classes_) == list(encoder.classes_)
+    assert np.allclose(engineer.scaler.mean_, expected.scaler.mean_)
+    assert np.allclose(engineer.scaler.scale_, expected.scaler.scale_)
+
+    # The scaler can keep learning online, like the in-memory one
+    features = engineer.create_business_features(df)[NUM_COLS]
+    engineer.scaler.partial_fit(features)
+    assert engineer.scaler.n_samples_seen_ == 2 * expected.scaler.n_samples_seen_
+
+
+def test_out_of_core_training_saves_artifacts(customers_csv, tmp_path, monkeypatch):
+    """External-memory and in-memory iterators train the same model; best_model.pkl is written"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('MLFLOW_TRACKING_URI', f"sqlite:///{tmp_path / 'mlflow.db'}")
+    trainer = ChurnModelTrainer(experiment_name='outofcore-test')
+
+    metrics, engineer = trainer.train_out_of_core(customers_csv, chunksize=1000)
+    paged, _ = trainer.train_out_of_core(customers_csv, chunksize=1000,
+                                         cache_dir=str(tmp_path / 'xgb-cache'))
+    assert metrics['roc_auc'] > 0.75
+    assert paged == pytest.approx(metrics)
+
+    model = joblib.load(tmp_path / 'models' / 'best_model.pkl')
+    assert (tmp_path / 'models' / 'best_model.ubj').exists()
+    X = np.zeros((2, len(engineer.feature_names)), dtype=np.float32)
+    assert model.predict_proba(X).shape == (2, 2)
+
+
+def test_streaming_metrics_match_sklearn():
+    """Confusion counts are exact; the histogram AUC is within its tie bound"""
+    rng = np.random.default_rng(0)
+    y = rng.random(50_000) < 0.3
+    proba = np.clip(rng.normal(0.35 + 0.3 * y, 0.2), 0, 1).astype(np.float32)
+
+    metrics = StreamingMetrics()
+    for start in range(0, len(y), 7000):
+        metrics.update(y[start:start + 7000], proba[start:start + 7000])
+    result = metrics.result()
+
+    y_pred = proba > 0.5
+    assert result['accuracy'] == pytest.approx(accuracy_score(y, y_pred))
+    assert result['precision'] == pytest.approx(precision_score(y, y_pred))
+    assert result['recall'] == pytest.approx(recall_score(y, y_pred))
+    assert result['f1_score'] == pytest.approx(f1_score(y, y_pred))
+    assert result['roc_auc'] == pytest.approx(roc_auc_score(y, proba), abs=1e-4)
+    # Memory is the two histograms, whatever the number of rows
+    assert metrics.positives.nbytes + metrics.negatives.nbytes == 2 * 8 * metrics.n_bins
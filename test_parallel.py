@@ -0,0 +1,34 @@
+"""
+Parallel Scoring Tests
+Sharded multi-process bulk scoring against the in-process report
+"""
+import sys
+sys.path.append('src')
+import pandas as pd
+import pytest
+from business import BusinessImpactCalculator
+from bundle import save_bundle
+from inference import predict_proba
+from parallel import ParallelBulkScorer
+from conftest import make_customers, train_model
+
+
+def test_parallel_scorer_matches_in_process_report(tmp_path):
+    """Sharded multi-process scoring merges into the in-memory report"""
+    customers = make_customers(3000)
+    engineer, model, X, _ = train_model(customers)
+    save_bundle(model, engineer, bundle_dir=tmp_path)
+
+    raw = customers.drop(columns=['Churn'])
+    calc = BusinessImpactCalculator()
+    expected, _ = calc.generate_business_report(raw.assign(churn_probability=predict_proba(model, X)))
+
+    shards = [raw.iloc[start:start + 400] for start in range(0, len(raw), 400)]
+    with ParallelBulkScorer(n_workers=2, bundle_dir=tmp_path, calculator=calc) as scorer:
+        report = scorer.score(shards)
+        results = pd.concat(r for _, r in scorer.map_shards(shards))
+
+    for key in ['total_customers', 'high_risk_customers', 'medium_risk_customers']:
+        assert report[key] == expected[key]
+    assert report['intervention_plan'] == pytest.approx(expected['intervention_plan'])
+    assert list(results['customerID']) == list(raw['customerID'])
\ No newline at end of file
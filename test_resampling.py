@@ -0,0 +1,62 @@
+"""
+SMOTE Resampling Tests
+Disk cache reuse and the batched approximate-neighbor mode
+"""
+import sys
+sys.path.append('src')
+import numpy as np
+import pytest
+from imblearn.over_sampling import SMOTE
+from resampling import SMOTECache, batched_smote
+
+
+@pytest.fixture
+def imbalanced():
+    rng = np.random.default_rng(0)
+    X = rng.random((3000, 6)).astype(np.float32)
+    y = (rng.random(3000) < 0.25).astype(np.int64)
+    return X, y
+
+
+def test_cache_reuses_resampled_set(imbalanced, tmp_path):
+    """Same data and parameters load from disk; any change resamples"""
+    X, y = imbalanced
+    cache = SMOTECache(tmp_path / 'smote', method='exact')
+
+    X_res, y_res = cache.fit_resample(X, y)
+    expected_X, expected_y = SMOTE(random_state=42).fit_resample(X, y)
+    assert np.array_equal(X_res, expected_X) and np.array_equal(y_res, expected_y)
+
+    # A second trainer (or rerun) sharing the directory hits the cache
+    again = SMOTECache(tmp_path / 'smote', method='exact')
+    X_hit, y_hit = again.fit_resample(X, y)
+    assert again.stats() == {'hits': 1, 'misses': 0}
+    assert np.array_equal(X_hit, X_res) and np.array_equal(y_hit, y_res)
+
+    changed = X.copy()
+    changed[0, 0] += 1
+    again.fit_resample(changed, y)
+    again.fit_resample(X, y, random_state=7)
+    SMOTECache(tmp_path / 'smote', method='batched').fit_resample(X, y)
+    assert again.stats() == {'hits': 1, 'misses': 2}
+    assert len(list((tmp_path / 'smote').iterdir())) == 4
+
+
+def test_batched_smote_interpolates_within_class(imbalanced):
+    """Balanced output; synthetic rows lie between two minority samples"""
+    X, y = imbalanced
+    X_res, y_res = batched_smote(X, y, k_neighbors=5, batch_size=200, random_state=1)
+
+    n_major = (y == 0).sum()
+    assert np.bincount(y_res).tolist() == [n_major, n_major]
+    assert np.array_equal(X_res[:len(X)], X) and X_res.dtype == np.float32
+
+    minority = X[y == 1]
+    synthetic = X_res[len(X):]
+    assert (synthetic >= minority.min(axis=0)).all() and (synthetic <= minority.max(axis=0)).all()
+    # Each synthetic row is on the segment from some minority sample towards a neighbor
+    nearest = np.abs(synthetic[:, None, :] - minority[None, :, :]).sum(axis=2).min(axis=1)
+    assert nearest.mean() < np.abs(minority[:, None] - minority[None]).sum(axis=2).mean() / 2
+
+    again_X, _ = batched_smote(X, y, k_neighbors=5, batch_size=200, random_state=1)
+    assert np.array_equal(again_X, X_res)
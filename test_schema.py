@@ -0,0 +1,35 @@
+"""
+Declared Schema Tests
+Pinned dtypes for uploaded customer files
+"""
+import sys
+sys.path.append('src')
+import io
+import numpy as np
+import pandas as pd
+from inference import CompiledFeaturePipeline
+from schema import read_customers
+from conftest import fit_engineer, make_customers
+
+
+def test_declared_schema_ingestion():
+    """Pinned dtypes: categoricals, float32 numerics, blanks and unknown labels as NA"""
+    customers = make_customers(500).drop(columns=['Churn'])
+    engineer = fit_engineer(make_customers(2000))
+    pipeline = CompiledFeaturePipeline.from_engineer(engineer)
+    customers['TotalCharges'] = customers['TotalCharges'].astype(object)
+    customers.loc[0, 'TotalCharges'] = ' '
+    customers.loc[1, 'Contract'] = 'Three year'
+    csv = customers.to_csv(index=False)
+
+    df = read_customers(io.StringIO(csv), pipeline.vocabularies)
+    assert df['Contract'].dtype == 'category' and df['gender'].dtype == 'category'
+    assert list(df['InternetService'].cat.categories) == pipeline.vocabularies['InternetService']
+    assert df['MonthlyCharges'].dtype == np.float32 and df['tenure'].dtype == np.float32
+    assert np.isnan(df.loc[0, 'TotalCharges']) and pd.isna(df.loc[1, 'Contract'])
+
+    # Same features as the inferred-dtype read, up to float32 input rounding
+    valid = df.iloc[2:]
+    inferred = pd.read_csv(io.StringIO(csv)).iloc[2:]
+    assert np.allclose(pipeline.transform_frame(valid), pipeline.transform_frame(inferred),
+                       rtol=1e-6, atol=1e-6)
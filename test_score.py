@@ -0,0 +1,56 @@
+"""
+Batch Scoring CLI Tests
+score.py over CSV and Parquet input, in-process and with worker processes
+"""
+import sys
+sys.path.append('src')
+import numpy as np
+import pandas as pd
+import pytest
+
+import score
+from bundle import load_bundle, save_bundle
+from inference import score_frame
+from scoring import RESULT_SCHEMA
+from conftest import make_customers, train_model
+
+
+@pytest.fixture
+def bundle_dir(tmp_path):
+    engineer, model, _, _ = train_model(make_customers(2000))
+    save_bundle(model, engineer, bundle_dir=tmp_path / 'bundle', bundle_version='v1')
+    return tmp_path / 'bundle'
+
+
+@pytest.mark.parametrize('suffix, workers', [('csv', 1), ('parquet', 1), ('csv', 2)])
+def test_score_cli_writes_every_customer(bundle_dir, tmp_path, suffix, workers):
+    """Every input row is scored once, in order, whatever the input format or worker count"""
+    raw = make_customers(1200, seed=1).drop(columns=['Churn'])
+    input_path = tmp_path / f'customers.{suffix}'
+    if suffix == 'csv':
+        raw.to_csv(input_path, index=False)
+    else:
+        raw.to_parquet(input_path, index=False)
+    output = tmp_path / 'out' / 'scores.parquet'
+
+    score.main([str(input_path), '-o', str(output), '--bundle', str(bundle_dir),
+                '--chunksize', '500', '--workers', str(workers)])
+
+    results = pd.read_parquet(output)
+    bundle = load_bundle(bundle_dir)
+    assert list(results['customerID']) == list(raw['customerID'])
+    assert np.allclose(results['churn_probability'], score_frame(bundle.pipeline, bundle.model, raw))
+
+
+@pytest.mark.parametrize('content', ['header', 'blank'])
+def test_score_cli_empty_input_writes_empty_output(bundle_dir, tmp_path, content):
+    """A header-only or 0-byte input still produces a schema-only results file"""
+    input_path = tmp_path / 'customers.csv'
+    header = make_customers(1).drop(columns=['Churn']).head(0).to_csv(index=False)
+    input_path.write_text(header if content == 'header' else '')
+    output = tmp_path / 'scores.arrow'
+
+    score.main([str(input_path), '-o', str(output), '--bundle', str(bundle_dir)])
+
+    results = pd.read_feather(output)
+    assert len(results) == 0 and list(results.columns) == RESULT_SCHEMA.names
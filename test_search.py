@@ -0,0 +1,54 @@
+"""
+Hyperparameter Search Tests
+Successive halving, early stopping and MLflow trial logging
+"""
+import sys
+sys.path.append('src')
+import mlflow
+import pytest
+from sklearn.model_selection import train_test_split
+from inference import CompiledFeaturePipeline
+from model import ChurnModelTrainer
+from search import XGB_MAX_ROUNDS, HyperparameterSearch
+from synthetic import TelcoGenerator
+from conftest import fit_engineer
+
+
+@pytest.fixture
+def data():
+    raw = TelcoGenerator().sample(4000, seed=0)
+    raw['Churn'] = (raw['Churn'] == 'Yes').astype(int)
+    engineer = fit_engineer(raw)
+    X = CompiledFeaturePipeline.from_engineer(engineer).transform_frame(raw)
+    return train_test_split(X, raw['Churn'], test_size=0.2, random_state=42, stratify=raw['Churn'])
+
+
+def test_halving_search_logs_every_trial(data, tmp_path, monkeypatch):
+    """Every trial is an MLflow run; XGBoost stops early; the best configs are refit"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('MLFLOW_TRACKING_URI', f"sqlite:///{tmp_path / 'mlflow.db'}")
+    X_train, X_test, y_train, y_test = data
+    trainer = ChurnModelTrainer(experiment_name='search-test')
+
+    families = ['Logistic Regression', 'XGBoost']
+    results = trainer.run_search(X_train, y_train, X_test, y_test, mode='halving', n_trials=6,
+                                 n_workers=2, target_auc=0.6, families=families)
+
+    # 6 configurations on a third of the rows, then the best 2 on all of them
+    n_fit = int(len(X_train) * 0.8)
+    assert HyperparameterSearch('halving', 6, min_samples=500).rungs(n_fit) == [(2, n_fit // 3), (1, n_fit)]
+    summary = trainer.search_summary
+    assert summary['n_trials'] == 2 * (6 + 2)
+    assert summary['time_to_target_auc'] is not None
+    assert summary['time_to_target_auc'] <= summary['search_seconds']
+
+    runs = mlflow.search_runs(experiment_names=['search-test'])
+    trials = runs[runs['tags.mlflow.runName'].str.endswith(' trial')]
+    assert len(trials) == summary['n_trials']
+    assert set(trials['params.n_samples'].astype(int)) == {n_fit // 3, n_fit}
+    xgb = trials[trials['params.max_depth'].notna() & trials['params.learning_rate'].notna()]
+    assert (xgb['metrics.best_iteration'] < XGB_MAX_ROUNDS - 1).all()
+
+    assert set(results) == set(families)
+    assert all(metrics['roc_auc'] > 0.7 for metrics in results.values())
+    assert trainer.best_model is not None and (tmp_path / 'models' / 'best_model.pkl').exists()
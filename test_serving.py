@@ -0,0 +1,81 @@
+"""
+Model Serving Tests
+Hot reloads, in-flight pinning and the bundle watcher
+"""
+import sys
+sys.path.append('src')
+import time
+from sklearn.linear_model import LogisticRegression
+from xgboost import XGBClassifier
+from bundle import load_bundle, save_bundle
+from cache import PredictionCache
+from inference import predict_proba
+from serving import ModelServer, model_version
+from conftest import fit_engineer, make_customers, training_data
+
+
+def test_model_server_hot_reload_keeps_inflight_state(tmp_path):
+    """Reload swaps models atomically; pinned requests finish on the old one"""
+    customers = make_customers(2000)
+    engineer = fit_engineer(customers)
+    X, y = training_data(engineer, customers)
+    save_bundle(LogisticRegression(max_iter=1000).fit(X, y), engineer,
+                bundle_dir=tmp_path, bundle_version='v1')
+
+    cache = PredictionCache()
+    server = ModelServer(lambda: load_bundle(tmp_path), bundle_dir=tmp_path, cache=cache,
+                         microbatch={'max_batch_size': 8, 'max_wait_ms': 1})
+    server.load()
+    customer = customers.drop(columns=['customerID', 'Churn']).iloc[0].to_dict()
+    cache.put(customer, 0.5, model_version(server.state.bundle))
+
+    old = server.acquire()
+    save_bundle(LogisticRegression(C=0.01, max_iter=1000).fit(X, y), engineer,
+                bundle_dir=tmp_path, bundle_version='v2')
+    new = server.reload()
+
+    assert server.state is new and new.version == 'v2'
+    assert cache.get(customer) is None and cache.model_version == model_version(new.bundle)
+    # In-flight request still scores on v1 and its result is not cached under v2
+    assert old.batcher.worker.is_alive()
+    expected = predict_proba(old.model, old.pipeline.transform_row(customer))[0]
+    assert old.batcher.predict(customer) == expected
+    cache.put(customer, expected, model_version(old.bundle))
+    assert cache.get(customer) is None
+
+    server.release(old)
+    assert not old.batcher.worker.is_alive()
+    server.close()
+    assert not new.batcher.worker.is_alive()
+
+
+def test_watcher_reloads_on_swapped_bundle_only(tmp_path, monkeypatch):
+    """Bundles are swapped in whole; the watcher ignores best_model.pkl and waits a poll"""
+    monkeypatch.chdir(tmp_path)
+    customers = make_customers(500)
+    engineer = fit_engineer(customers)
+    X, y = training_data(engineer, customers)
+    bundle_dir = tmp_path / 'bundle'
+    save_bundle(LogisticRegression(max_iter=1000).fit(X, y), engineer,
+                bundle_dir=bundle_dir, bundle_version='v1')
+
+    server = ModelServer(lambda: load_bundle(bundle_dir), bundle_dir=bundle_dir)
+    server.load()
+    server.watch(poll_seconds=0.05)
+
+    # Training rewrites best_model.pkl before any bundle exists
+    (tmp_path / 'models').mkdir()
+    (tmp_path / 'models' / 'best_model.pkl').write_bytes(b'partial')
+    time.sleep(0.3)
+    assert server.reloads == 0
+
+    save_bundle(XGBClassifier(n_estimators=5, max_depth=2).fit(X, y), engineer,
+                bundle_dir=bundle_dir, bundle_version='v2')
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['bundle', 'models']
+    assert sorted(p.name for p in bundle_dir.iterdir()) == ['booster.ubj', 'manifest.json',
+                                                            'model.joblib']
+    deadline = time.monotonic() + 5
+    while server.state.version != 'v2' and time.monotonic() < deadline:
+        time.sleep(0.05)
+    server.close()
+    assert server.state.version == 'v2' and server.reloads == 1
\ No newline at end of file
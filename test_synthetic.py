@@ -0,0 +1,70 @@
+"""
+Synthetic Data Tests
+Schema validity, reproducibility and refitting of the Telco generator
+"""
+import sys
+sys.path.append('src')
+import numpy as np
+import pandas as pd
+import pytest
+from scoring import read_chunks
+from synthetic import COLUMNS, TelcoGenerator
+
+
+def test_sample_matches_declared_schema():
+    """Every label is in the schema and service dependencies hold"""
+    df = TelcoGenerator().sample(20000, seed=3)
+
+    assert list(df.columns) == COLUMNS
+    assert df['customerID'].is_unique
+    for col in COLUMNS:
+        assert df[col].notna().all() or col == 'TotalCharges', col
+    assert (df.loc[df['InternetService'] == 'No', 'TechSupport'] == 'No internet service').all()
+    assert (df.loc[df['InternetService'] != 'No', 'StreamingTV'] != 'No internet service').all()
+    assert (df.loc[df['PhoneService'] == 'No', 'MultipleLines'] == 'No phone service').all()
+    assert df['tenure'].between(0, 72).all()
+    assert (df['TotalCharges'].isna() == (df['tenure'] == 0)).all()
+
+    # Roughly the original data's churn rate and contract mix
+    assert (df['Churn'] == 'Yes').mean() == pytest.approx(0.265, abs=0.02)
+    assert (df['Contract'] == 'Month-to-month').mean() == pytest.approx(0.55, abs=0.02)
+
+
+def test_chunks_are_reproducible(tmp_path):
+    """Same seed, same rows; CSV and Parquet output read back identically"""
+    generator = TelcoGenerator()
+    first = pd.concat(generator.iter_chunks(5000, chunksize=2000, seed=7), ignore_index=True)
+    again = pd.concat(generator.iter_chunks(5000, chunksize=2000, seed=7), ignore_index=True)
+    other = pd.concat(generator.iter_chunks(5000, chunksize=2000, seed=8), ignore_index=True)
+    assert first.equals(again) and not first.equals(other)
+    assert first['customerID'].is_unique
+
+    for name in ['customers.csv', 'customers.parquet']:
+        path = str(tmp_path / name)
+        generator.write(path, 5000, chunksize=2000, seed=7)
+        df = pd.concat(read_chunks(path, 1500), ignore_index=True)
+        assert len(df) == 5000
+        assert (df['customerID'] == first['customerID']).all()
+        assert (df['Contract'].astype(str) == first['Contract'].astype(str)).all()
+        assert np.allclose(df['MonthlyCharges'], first['MonthlyCharges'])
+
+
+def test_fit_recovers_generating_parameters(tmp_path):
+    """Parameters fitted from generated data reproduce its distributions"""
+    source = TelcoGenerator()
+    df = source.sample(100000, seed=1)
+
+    fitted = TelcoGenerator.fit(df)
+    fitted.save(tmp_path / 'params.json')
+    loaded = TelcoGenerator.load(tmp_path / 'params.json')
+
+    charges = loaded.params['charges']
+    assert charges['phone'] == pytest.approx(source.params['charges']['phone'], abs=0.2)
+    assert charges['addons'] == pytest.approx(source.params['charges']['addons'], abs=0.2)
+
+    resampled = loaded.sample(100000, seed=2)
+    for col in ['Churn', 'Contract', 'InternetService', 'PaymentMethod', 'TechSupport']:
+        expected = df[col].value_counts(normalize=True)
+        actual = resampled[col].value_counts(normalize=True)
+        assert np.allclose(actual[expected.index], expected, atol=0.01), col
+    assert resampled['tenure'].mean() == pytest.approx(df['tenure'].mean(), rel=0.02)
@@ -0,0 +1,89 @@
+"""
+Experiment Logging Tests
+Background batched MLflow writes and best-run-only model logging
+"""
+import sys
+sys.path.append('src')
+import os
+import tempfile
+import threading
+import mlflow
+import pytest
+from mlflow import MlflowClient
+from sklearn.dummy import DummyClassifier
+from sklearn.model_selection import train_test_split
+from inference import CompiledFeaturePipeline
+from model import ChurnModelTrainer
+from tracking import RunLogger
+from synthetic import TelcoGenerator
+from conftest import fit_engineer
+
+
+@pytest.fixture
+def data():
+    raw = TelcoGenerator().sample(2000, seed=5)
+    raw['Churn'] = (raw['Churn'] == 'Yes').astype(int)
+    X = CompiledFeaturePipeline.from_engineer(fit_engineer(raw)).transform_frame(raw)
+    return train_test_split(X, raw['Churn'], test_size=0.2, random_state=42, stratify=raw['Churn'])
+
+
+def model_run_ids(experiment_name):
+    """Source run of every model logged to the experiment"""
+    experiment_id = mlflow.get_experiment_by_name(experiment_name).experiment_id
+    return [m.source_run_id for m in mlflow.search_logged_models([experiment_id], output_format='list')]
+
+
+@pytest.mark.parametrize('async_logging, log_models', [(True, 'best'), (False, 'all')])
+def test_experiment_runs_logged(data, tmp_path, monkeypatch, async_logging, log_models):
+    """Every run gets its params and metrics; models go to the best run or to all of them"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('MLFLOW_TRACKING_URI', f"sqlite:///{tmp_path / 'mlflow.db'}")
+    X_train, X_test, y_train, y_test = data
+    trainer = ChurnModelTrainer(experiment_name='tracking-test', async_logging=async_logging,
+                                log_models=log_models)
+    results = trainer.run_all_experiments(X_train, y_train, X_test, y_test)
+    assert trainer.logger.stats() == {'runs_logged': 5, 'pending': 0,
+                                      'models_logged': 1 if log_models == 'best' else 5}
+
+    runs = mlflow.search_runs(experiment_names=['tracking-test'])
+    assert sorted(runs['tags.mlflow.runName']) == sorted(results)
+    assert (runs['status'] == 'FINISHED').all()
+    assert (runs['params.resampling'] == 'None').sum() == 4
+    assert runs['params.smote_method'].notna().sum() == 1
+    assert runs['metrics.fit_seconds'].notna().all()
+
+    best = runs.loc[runs['metrics.roc_auc'].idxmax()]
+    assert best['metrics.roc_auc'] == pytest.approx(trainer.best_score)
+    artifacts = [a.path for a in MlflowClient().list_artifacts(best['run_id'])]
+    assert 'best_model.pkl' in artifacts
+    expected = [best['run_id']] if log_models == 'best' else list(runs['run_id'])
+    assert sorted(model_run_ids('tracking-test')) == sorted(expected)
+
+
+def test_queued_artifacts_are_snapshotted(tmp_path, monkeypatch):
+    """A queued write logs the file as it was at log_model time, then drops its copy"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('MLFLOW_TRACKING_URI', f"sqlite:///{tmp_path / 'mlflow.db'}")
+    (tmp_path / 'tmp').mkdir()
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path / 'tmp'))
+    logger = RunLogger('snapshot-test', log_models='all')
+
+    # Hold the writer thread so every write is still queued while training continues
+    release = threading.Event()
+    logger.submit(release.wait)
+    path = tmp_path / 'best_model.pkl'
+    runs = []
+    for version in [b'first', b'second']:
+        path.write_bytes(version)
+        run = logger.log_run(version.decode(), {}, {'roc_auc': 0.5})
+        logger.log_model(run, DummyClassifier().fit([[0], [1]], [0, 1]), [str(path)], best=True)
+        runs.append(run)
+    path.write_bytes(b'overwritten')
+    release.set()
+    logger.close()
+
+    client = MlflowClient()
+    for run, version in zip(runs, [b'first', b'second']):
+        local = client.download_artifacts(run.result(), 'best_model.pkl', str(tmp_path))
+        assert open(local, 'rb').read() == version
+    assert os.listdir(tmp_path / 'tmp') == []
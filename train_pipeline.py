@@ -6,29 +6,92 @@ import sys
 sys.path.append('src')
 from features import prepare_data_pipeline, ChurnFeatureEngineer
 from model import ChurnModelTrainer
+from bundle import save_bundle, DEFAULT_BUNDLE_DIR
+from incremental import DEFAULT_MAX_AUC_DROP, DEFAULT_RF_TREES, DEFAULT_XGB_ROUNDS
+from outofcore import DEFAULT_CHUNKSIZE
+import argparse
 import joblib
 import os
 
-def main():
-    print("="*60)
-    print("TELECOM CHURN PREDICTION - TRAINING PIPELINE")
-    print("="*60)
-    
-    # Step 1: Prepare data
-    print("\n[1/3] Preparing data...")
-    X_train, X_test, y_train, y_test, engineer = prepare_data_pipeline(
-        'data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv'
-    )
-    
-    # Save feature engineer
+DATA_PATH = 'data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv'
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train churn models and save the bundle")
+    parser.add_argument('data', nargs='?', default=DATA_PATH,
+                        help="Telco CSV (e.g. a file from src/synthetic.py)")
+    parser.add_argument('--search', choices=['random', 'halving'],
+                        help="Hyperparameter search instead of the five fixed experiments")
+    parser.add_argument('--trials', type=int, default=20, help="Configurations per model family")
+    parser.add_argument('--workers', type=int, help="Trial processes (default: one per CPU)")
+    parser.add_argument('--target-auc', type=float, help="Report the time to reach this validation AUC")
+    parser.add_argument('--out-of-core', action='store_true',
+                        help="Stream the data in chunks and train XGBoost without loading it whole")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help="Rows per chunk with --out-of-core")
+    parser.add_argument('--external-memory', metavar='DIR',
+                        help="With --out-of-core, page XGBoost's training data to DIR")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Add the data (e.g. a new monthly extract) to the saved model")
+    parser.add_argument('--rounds', type=int, default=DEFAULT_XGB_ROUNDS,
+                        help="Boosting rounds added to an XGBoost model with --incremental")
+    parser.add_argument('--trees', type=int, default=DEFAULT_RF_TREES,
+                        help="Trees added to a RandomForest with --incremental")
+    parser.add_argument('--max-auc-drop', type=float, default=DEFAULT_MAX_AUC_DROP,
+                        help="With --incremental, largest holdout AUC drop that still saves the update")
+    return parser.parse_args(argv)
+
+def save_engineer(engineer):
     os.makedirs('models', exist_ok=True)
     joblib.dump(engineer, 'models/feature_engineer.pkl')
     print("✓ Feature engineer saved")
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("="*60)
+    print("TELECOM CHURN PREDICTION - TRAINING PIPELINE")
+    print("="*60)
     
-    # Step 2: Train models with MLflow
-    print("\n[2/3] Training models with MLflow...")
     trainer = ChurnModelTrainer()
-    results = trainer.run_all_experiments(X_train, y_train, X_test, y_test)
+    if args.incremental:
+        # Steps 1-2 on the new data only: update the saved model and engineer
+        print("\n[1/3] Updating the saved model with new data...")
+        model = joblib.load('models/best_model.pkl')
+        engineer = joblib.load('models/feature_engineer.pkl')
+        metrics, engineer, accepted = trainer.train_incremental(
+            model, engineer, args.data, xgb_rounds=args.rounds, rf_trees=args.trees,
+            max_auc_drop=args.max_auc_drop
+        )
+        if not accepted:
+            print("\n⚠ Saved model, feature engineer and bundle left unchanged")
+            return 1
+        results = {f"{type(model).__name__} (incremental)": metrics}
+        save_engineer(engineer)
+    elif args.out_of_core:
+        # Steps 1-2 as streaming passes: fit the engineer, then train XGBoost
+        print("\n[1/3] Fitting features and training XGBoost out of core...")
+        metrics, engineer = trainer.train_out_of_core(args.data, args.chunksize,
+                                                      cache_dir=args.external_memory)
+        results = {'XGBoost (out-of-core)': metrics}
+        save_engineer(engineer)
+    else:
+        # Step 1: Prepare data
+        print("\n[1/3] Preparing data...")
+        X_train, X_test, y_train, y_test, engineer = prepare_data_pipeline(args.data)
+        save_engineer(engineer)
+        
+        # Step 2: Train models with MLflow
+        print("\n[2/3] Training models with MLflow...")
+        if args.search:
+            results = trainer.run_search(X_train, y_train, X_test, y_test, mode=args.search,
+                                         n_trials=args.trials, n_workers=args.workers,
+                                         target_auc=args.target_auc)
+        else:
+            results = trainer.run_all_experiments(X_train, y_train, X_test, y_test)
+    
+    # Bundle best model with the compiled feature schema
+    manifest = save_bundle(trainer.best_model, engineer)
+    print(f"✓ Model bundle {manifest['bundle_version']} saved (schema {manifest['schema_hash'][:12]})")
     
     # Step 3: Summary
     print("\n[3/3] Training Summary")
@@ -39,6 +102,7 @@ def main():
     
     print(f"\n✓ Best model saved to: models/best_model.pkl")
     print(f"✓ Feature engineer saved to: models/feature_engineer.pkl")
+    print(f"✓ Model bundle saved to: {DEFAULT_BUNDLE_DIR}/")
     print("\n" + "="*60)
     print("NEXT STEPS:")
     print("="*60)
@@ -52,4 +116,4 @@ def main():
     print("="*60)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())